@@ -0,0 +1,302 @@
+import os
+import json
+import math
+import logging
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import streamlit as st
+from src.store import PipelineStore
+from src.ingredient_normalization import load_compact_ingredients
+from src.pitch_store import PitchStore
+from src.product_index import ProductIndex
+from src.venue_index import VenueIndex, paginate
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# (mtime in ns, size) of a file, or None when it does not exist
+Signature = Optional[Tuple[int, int]]
+
+# Product matches per page of a venue's two-column table
+MATCHES_PER_PAGE = 40
+
+
+def file_signature(path: str) -> Signature:
+    """
+    Get a cheap fingerprint of a file that changes whenever the file is rewritten.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        Signature: Modification time in nanoseconds and size, or None if the file is missing.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def store_signature(path: str) -> Tuple[Signature, Signature]:
+    """
+    Fingerprint a SQLite database, including writes still in its write-ahead log.
+
+    Args:
+        path (str): The database file.
+
+    Returns:
+        Tuple[Signature, Signature]: Signatures of the database and its -wal file.
+    """
+    return file_signature(path), file_signature(f"{path}-wal")
+
+
+def load_product_matches(file_path):
+    """
+    Load product matches from a JSON file.
+
+    :param file_path: Path to the JSON file containing product matches
+    :return: Dictionary of venue names and their product matches
+    """
+    with open(file_path, 'r') as f:
+        product_matches = json.load(f)
+
+    # Check if the loaded data is already in the correct format
+    if isinstance(product_matches, dict):
+        return product_matches
+
+    # If it's a list of dictionaries, convert it to the desired format
+    elif isinstance(product_matches, list):
+        return {venue.get('name', venue.get('venue_name', 'Unknown')): venue.get('product_matches', []) for venue in product_matches}
+
+    # If it's neither a dict nor a list, raise an error
+    else:
+        raise ValueError(f"Unexpected data structure in {file_path}")
+
+
+def create_two_column_table(matches):
+    """
+    Create a two-column table from the list of matches.
+
+    :param matches: List of product matches
+    :return: Pandas DataFrame with two columns
+    """
+    # Calculate the number of rows needed
+    num_rows = math.ceil(len(matches) / 2)
+
+    # Create two columns
+    col1 = matches[:num_rows]
+    col2 = matches[num_rows:] + [''] * (num_rows - len(matches[num_rows:]))
+
+    # Create DataFrame
+    df = pd.DataFrame({
+        "Product Matches 1": col1,
+        "Product Matches 2": col2
+    })
+
+    return df
+
+
+class VenueView:
+    """
+    Everything the app shows for one venue, built once per data file version.
+
+    The match table is split into pages of MATCHES_PER_PAGE products. The
+    first page is built up front; later pages are built when first shown.
+    """
+
+    def __init__(self, name: str, matches: List[str], ingredients: Optional[List[str]] = None):
+        self.name = name
+        self.matches = matches
+        self.ingredients = ingredients or []
+        self.page_count = paginate(matches, 1, MATCHES_PER_PAGE)[1]
+        self._pages: Dict[int, pd.DataFrame] = {}
+        self.page(1)
+
+    def page(self, number: int) -> pd.DataFrame:
+        """
+        Get one page of the match table.
+
+        Args:
+            number (int): Page number, starting at 1; clamped to the valid range.
+
+        Returns:
+            pd.DataFrame: Two-column table of the page's matches.
+        """
+        number = min(max(number, 1), self.page_count)
+        table = self._pages.get(number)
+        if table is None:
+            matches, _ = paginate(self.matches, number, MATCHES_PER_PAGE)
+            table = self._pages[number] = create_two_column_table(matches)
+        return table
+
+
+class AppData:
+    """
+    Venue views of the Streamlit app, read from product_matches.json or the pipeline store.
+
+    With a JSON file, every venue's view is built when the data is loaded, so
+    selecting a venue is a dictionary lookup. With the pipeline store, venue
+    names come from one query and each view is built on first selection.
+    Venue names are searchable through a VenueIndex, and the venues of a
+    product come from a ProductIndex, or the store's index of matches by
+    product.
+    """
+
+    def __init__(self, venue_names: List[str], views: Optional[Dict[str, VenueView]] = None,
+                 store: Optional[PipelineStore] = None,
+                 ingredients: Optional[Dict[str, List[str]]] = None,
+                 product_index: Optional[ProductIndex] = None):
+        self.venue_names = venue_names
+        self.store = store
+        self.index = VenueIndex(venue_names)
+        self._known = set(venue_names)
+        self._views = views if views is not None else {}
+        self._ingredients = ingredients or {}
+        if store is None:
+            self.product_index = product_index or ProductIndex.from_matches(
+                {name: view.matches for name, view in self._views.items()})
+            self.products = self.product_index.products()
+        else:
+            self.product_index = None
+            self.products = store.matched_products()
+
+    def venue_scores(self, product: str) -> List[Tuple[str, Optional[float]]]:
+        """
+        Get the venues a product was matched to, best first.
+
+        Args:
+            product (str): Product name.
+
+        Returns:
+            List[Tuple[str, Optional[float]]]: (venue name, score) pairs; the score
+            is None when the matching method gave none.
+        """
+        if self.store is not None:
+            return self.store.venues_for_product(product)
+        return [(venue, score) for venue, score, _ in self.product_index.venues_for(product)]
+
+    def venues_with_product(self, product: str) -> List[str]:
+        """
+        Get the venues a product was matched to.
+
+        Args:
+            product (str): Product name.
+
+        Returns:
+            List[str]: Venue names, best first.
+        """
+        return [venue for venue, _ in self.venue_scores(product)]
+
+    def view(self, name: str) -> Optional[VenueView]:
+        """
+        Get the view model of a venue.
+
+        Args:
+            name (str): Venue name.
+
+        Returns:
+            Optional[VenueView]: The view, or None for an unknown venue.
+        """
+        view = self._views.get(name)
+        if view is None and self.store is not None and name in self._known:
+            view = VenueView(name, self.store.get_matches(name), self._ingredients.get(name))
+            self._views[name] = view
+        return view
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _ingredient_lists(path: str, signature: Signature) -> Dict[str, List[str]]:
+    if signature is None:
+        return {}
+    try:
+        vocabulary, venue_ids = load_compact_ingredients(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable ingredients file {path}: {e}")
+        return {}
+    return {name: vocabulary.decode(ids) for name, ids in venue_ids.items()}
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _matches_file_data(matches_file: str, signature: Signature,
+                       ingredients_file: str, ingredients_signature: Signature,
+                       index_file: Optional[str], index_signature: Signature) -> AppData:
+    product_matches = load_product_matches(matches_file)
+    ingredients = _ingredient_lists(ingredients_file, ingredients_signature)
+    views = {name: VenueView(name, matches, ingredients.get(name))
+             for name, matches in product_matches.items()}
+    logger.info(f"Built views of {len(views)} venues from {matches_file}")
+
+    # The saved index carries match scores; use it unless it predates the matches
+    product_index = None
+    if index_signature is not None and signature is not None and index_signature[0] >= signature[0]:
+        try:
+            product_index = ProductIndex.load(index_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable product index {index_file}: {e}")
+    return AppData(list(product_matches), views, product_index=product_index)
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_store(db_path: str) -> PipelineStore:
+    return PipelineStore(db_path)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _store_data(db_path: str, signature: Tuple[Signature, Signature],
+                ingredients_file: str, ingredients_signature: Signature) -> AppData:
+    # One store per database for the app's lifetime; a write only rebuilds the venue list
+    store = _shared_store(db_path)
+    ingredients = _ingredient_lists(ingredients_file, ingredients_signature)
+    return AppData(store.matched_venues(), store=store, ingredients=ingredients)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _pitch_store(path: str, signature: Signature) -> PitchStore:
+    return PitchStore(path)
+
+
+def load_pitch_store(path: str) -> PitchStore:
+    """
+    Get the shared pitch store, reloading it when the file was rewritten.
+
+    Pitches saved by the pre-generation CLI show up on the next rerun, and
+    pitches generated in the app are saved to the same file.
+
+    Args:
+        path (str): The pitch store file.
+
+    Returns:
+        PitchStore: The store, shared by all sessions.
+    """
+    return _pitch_store(path, file_signature(path))
+
+
+def load_app_data(matches_file: str, ingredients_file: str,
+                  db_path: Optional[str] = None, index_file: Optional[str] = None) -> AppData:
+    """
+    Get the app's data, reloading it only when the underlying files changed.
+
+    The loaded data is kept with st.cache_resource, keyed by the modification
+    time and size of the files, so a rerun triggered by a widget only stats the
+    files instead of parsing them. The returned object is shared by all
+    sessions; callers must not modify it.
+
+    Args:
+        matches_file (str): product_matches.json.
+        ingredients_file (str): Compact ingredient file; optional.
+        db_path (Optional[str]): Pipeline store to read instead of matches_file.
+        index_file (Optional[str]): Product index saved by product matching; rebuilt
+            from matches_file when missing or older.
+
+    Returns:
+        AppData: The venue names and views.
+    """
+    ingredients_signature = file_signature(ingredients_file)
+    if db_path:
+        return _store_data(db_path, store_signature(db_path), ingredients_file, ingredients_signature)
+    return _matches_file_data(matches_file, file_signature(matches_file),
+                              ingredients_file, ingredients_signature,
+                              index_file, file_signature(index_file) if index_file else None)
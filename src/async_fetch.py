@@ -0,0 +1,343 @@
+import os
+import asyncio
+import logging
+import tempfile
+import hashlib
+import threading
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+import aiohttp
+from src.politeness import DomainThrottle, domain_of
+from src.http_cache import NOT_MODIFIED, FetchStore
+from src.llm_dispatcher import run_sync
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+# Menus are small; anything bigger than this is not a menu
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# Responses above this size are streamed to disk instead of held in memory
+DEFAULT_STREAM_THRESHOLD = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response is bigger than the fetcher's size limit."""
+
+
+class AsyncFetcher:
+    """
+    Concurrent HTTP client for menu pages and PDFs.
+
+    One connection pool is shared by all requests, capped per host so a single
+    site is never hit with more than limit_per_host parallel connections, and
+    connections are kept alive between requests to the same host. With a
+    FetchStore, requests are conditional and URLs the server reports as not
+    modified return NOT_MODIFIED instead of a body. Use as an async context
+    manager:
+
+        async with AsyncFetcher() as fetcher:
+            pages = await fetcher.fetch_many(urls)
+    """
+
+    def __init__(self, limit: int = 20, limit_per_host: int = 4, timeout: float = 30.0,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 stream_threshold: int = DEFAULT_STREAM_THRESHOLD,
+                 download_dir: Optional[str] = None,
+                 throttle: Optional[DomainThrottle] = None,
+                 store: Optional[FetchStore] = None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.stream_threshold = stream_threshold
+        self.download_dir = download_dir
+        self.throttle = throttle
+        self.store = store
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncFetcher':
+        connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                         keepalive_timeout=30, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': USER_AGENT})
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._session.close()
+        self._session = None
+
+    async def _wait_for_turn(self, url: str) -> None:
+        if self.throttle is not None:
+            # DomainThrottle blocks, so wait in a thread to keep other requests going
+            await asyncio.to_thread(self.throttle.wait, url)
+
+    def _check_size(self, url: str, size: Optional[int]) -> None:
+        if size is not None and size > self.max_bytes:
+            raise ResponseTooLarge(f"{url} is larger than {self.max_bytes} bytes")
+
+    async def fetch_text(self, url: str, throttled: bool = True) -> str:
+        """
+        Fetch a page as text.
+
+        Args:
+            url (str): The page URL.
+            throttled (bool): Whether to wait for the domain's politeness slot first.
+
+        Returns:
+            str: The response body, decoded with the charset of its Content-Type,
+            or UTF-8 when none is given.
+        """
+        data, charset = await self._read(url, spill_threshold=None, throttled=throttled)
+        if data is NOT_MODIFIED:
+            return data
+        try:
+            return data.decode(charset or 'utf-8', errors='replace')
+        except LookupError:
+            logger.warning(f"Unknown charset {charset!r} of {url}, decoding as UTF-8")
+            return data.decode('utf-8', errors='replace')
+
+    def _download_path(self, url: str) -> str:
+        directory = self.download_dir or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+        extension = os.path.splitext(urlparse(url).path)[1][:5]
+        return os.path.join(directory, f"{name}{extension}")
+
+    async def _read(self, url: str, spill_threshold: Optional[int],
+                    path: Optional[str] = None,
+                    throttled: bool = True) -> Tuple[Union[bytes, str], Optional[str]]:
+        """
+        Read a response body, moving it to a file once it grows past spill_threshold.
+
+        Returns the body, or the path of the file, with the charset of the
+        response's Content-Type, if it gives one.
+
+        The body is checked against the size limit as it arrives, since
+        Content-Length can be missing or wrong. A partially written file is
+        removed on error.
+        """
+        if throttled:
+            await self._wait_for_turn(url)
+        headers = self.store.conditional_headers(url) if self.store is not None else None
+        async with self._session.get(url, headers=headers) as response:
+            if response.status == 304:
+                return NOT_MODIFIED, None
+            response.raise_for_status()
+            if self.store is not None:
+                self.store.remember_validators(url, response.headers)
+            self._check_size(url, response.content_length)
+            buffer = bytearray()
+            f = None
+            received = 0
+            try:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    received += len(chunk)
+                    self._check_size(url, received)
+                    if f is None and spill_threshold is not None and received > spill_threshold:
+                        path = path or self._download_path(url)
+                        f = open(path, 'wb')
+                        f.write(buffer)
+                    if f is None:
+                        buffer.extend(chunk)
+                    else:
+                        f.write(chunk)
+                if f is None and spill_threshold == 0:
+                    # Empty body, still honour the request for a file
+                    path = path or self._download_path(url)
+                    f = open(path, 'wb')
+            except BaseException:
+                if f is not None:
+                    f.close()
+                    os.remove(path)
+                raise
+        if f is not None:
+            f.close()
+            return path, response.charset
+        return bytes(buffer), response.charset
+
+    async def fetch_bytes(self, url: str, throttled: bool = True) -> bytes:
+        """
+        Fetch a response body into memory, enforcing the size limit.
+
+        Args:
+            url (str): The URL to fetch.
+            throttled (bool): Whether to wait for the domain's politeness slot first.
+
+        Returns:
+            bytes: The response body.
+        """
+        data, _ = await self._read(url, spill_threshold=None, throttled=throttled)
+        return data
+
+    async def download(self, url: str, path: Optional[str] = None) -> str:
+        """
+        Stream a response body to a file, enforcing the size limit.
+
+        Args:
+            url (str): The URL to fetch.
+            path (Optional[str]): Destination file; defaults to a file in download_dir
+                named after the URL.
+
+        Returns:
+            str: Path of the downloaded file.
+        """
+        data, _ = await self._read(url, spill_threshold=0, path=path)
+        return data
+
+    async def fetch_pdf(self, url: str, throttled: bool = True) -> Union[bytes, str]:
+        """
+        Fetch a PDF, in memory when small and streamed to disk once it grows large.
+
+        Args:
+            url (str): The PDF URL.
+            throttled (bool): Whether to wait for the domain's politeness slot first.
+
+        Returns:
+            Union[bytes, str]: The PDF content, or the path of the downloaded file.
+            Either can be passed to pdf_extraction.extract_pdf_text.
+        """
+        data, _ = await self._read(url, spill_threshold=self.stream_threshold, throttled=throttled)
+        return data
+
+    async def fetch_many(self, urls: List[str], kind: str = 'text',
+                         burst: bool = False) -> List[Optional[Union[str, bytes]]]:
+        """
+        Fetch several URLs concurrently.
+
+        Args:
+            urls (List[str]): The URLs to fetch.
+            kind (str): "text" for pages, "bytes" for raw bodies or "pdf" for PDFs.
+            burst (bool): Take one politeness slot per domain for the whole batch
+                instead of one per URL, e.g. for the PDFs linked from one menu
+                page. limit_per_host still caps the parallel connections.
+
+        Returns:
+            List: Results in the order of urls; None for URLs that failed.
+        """
+        fetch = {'text': self.fetch_text, 'bytes': self.fetch_bytes, 'pdf': self.fetch_pdf}[kind]
+        if burst:
+            first_per_domain = {domain_of(url): url for url in reversed(urls)}
+            await asyncio.gather(*(self._wait_for_turn(url) for url in first_per_domain.values()))
+
+        async def guarded(url):
+            try:
+                return await fetch(url, throttled=not burst)
+            except Exception as e:
+                logger.error(f"Error fetching {url}: {e}")
+                return None
+
+        return await asyncio.gather(*(guarded(url) for url in urls))
+
+
+def fetch_pages(urls: List[str], **kwargs) -> Dict[str, Optional[str]]:
+    """
+    Fetch several pages concurrently from synchronous code.
+
+    Args:
+        urls (List[str]): The page URLs.
+        **kwargs: Options for AsyncFetcher.
+
+    Returns:
+        Dict[str, Optional[str]]: Page text per URL; None for pages that failed.
+    """
+    async def run():
+        async with AsyncFetcher(**kwargs) as fetcher:
+            return await fetcher.fetch_many(urls, kind='text')
+
+    return dict(zip(urls, run_sync(run))) if urls else {}
+
+
+def fetch_pdfs(urls: List[str], **kwargs) -> List[Optional[Union[bytes, str]]]:
+    """
+    Download several PDFs concurrently from synchronous code.
+
+    Large PDFs are streamed to disk; the caller owns, and should delete, the
+    returned files.
+
+    Args:
+        urls (List[str]): The PDF URLs.
+        **kwargs: Options for AsyncFetcher.
+
+    Returns:
+        List[Optional[Union[bytes, str]]]: PDF content or file path per URL, in
+        order; None for PDFs that failed or exceeded the size limit, and
+        NOT_MODIFIED for PDFs unchanged since they were stored, when a store is given.
+    """
+    async def run():
+        async with AsyncFetcher(**kwargs) as fetcher:
+            return await fetcher.fetch_many(urls, kind='pdf')
+
+    return run_sync(run) if urls else []
+
+
+class BackgroundFetcher:
+    """
+    AsyncFetcher kept open for a whole run, for synchronous code and several threads.
+
+    The fetcher and its event loop live in a daemon thread started on the
+    first request, so consecutive batches reuse one connection pool instead
+    of opening a session and event loop each. Call close when done; a closed
+    fetcher starts again on its next request.
+    """
+
+    def __init__(self, **kwargs):
+        # Options for AsyncFetcher
+        self.kwargs = kwargs
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._fetcher: Optional[AsyncFetcher] = None
+        self._lock = threading.Lock()
+
+    def _run(self, make_coroutine: Callable[[AsyncFetcher], Coroutine]) -> Any:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='background-fetcher', daemon=True)
+                thread.start()
+                fetcher = AsyncFetcher(**self.kwargs)
+                asyncio.run_coroutine_threadsafe(fetcher.__aenter__(), loop).result()
+                self._loop, self._thread, self._fetcher = loop, thread, fetcher
+            loop, fetcher = self._loop, self._fetcher
+        return asyncio.run_coroutine_threadsafe(make_coroutine(fetcher), loop).result()
+
+    def fetch_pdfs(self, urls: List[str], burst: bool = True) -> List[Optional[Union[bytes, str]]]:
+        """
+        Download several PDFs concurrently, as fetch_pdfs does.
+
+        Args:
+            urls (List[str]): The PDF URLs.
+            burst (bool): Take one politeness slot per domain for the batch
+                instead of one per PDF.
+
+        Returns:
+            List[Optional[Union[bytes, str]]]: PDF content or file path per URL, in
+            order; None for PDFs that failed.
+        """
+        if not urls:
+            return []
+        return self._run(lambda fetcher: fetcher.fetch_many(urls, kind='pdf', burst=burst))
+
+    def close(self) -> None:
+        """Close the connection pool and stop the event loop thread."""
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._fetcher.__aexit__(None, None, None), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = self._fetcher = None
+
+    def __enter__(self) -> 'BackgroundFetcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
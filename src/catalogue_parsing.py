@@ -1,9 +1,19 @@
+import os
 import re
 import json
-import PyPDF2
+import time
+import queue
+import hashlib
+import argparse
 import logging
-from typing import List, Dict
-from src.utils import parse_with_chatgpt
+import threading
+from typing import List, Dict, Iterator, Optional, Tuple
+from src.utils import load_json, save_json
+from src.llm_dispatcher import dispatch_chat_queue, run_sync, parse_many_with_chatgpt
+from src.pdf_extraction import iter_pdf_pages
+from src.chunking import iter_token_chunks
+from src.matching_index import normalize_text
+from src.store import open_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -14,6 +24,10 @@ logger = logging.getLogger(__name__)
 def chunk_text(text: str, max_chunk_size: int = 5000) -> List[str]:
     """
     Split the text into chunks of approximately max_chunk_size characters.
+
+    Kept for callers that chunk by characters; parse_pdf_catalogue uses the
+    token-based chunking.iter_token_chunks instead.
+
     Args:
         text (str): The input text to be chunked.
         max_chunk_size (int): The maximum size of each chunk.
@@ -21,34 +35,64 @@ def chunk_text(text: str, max_chunk_size: int = 5000) -> List[str]:
         List[str]: A list of text chunks.
     """
     chunks = []
-    current_chunk = ""
+    current_words = []
+    current_size = 0
 
     # Split text by whitespace and process each word
     for word in text.split():
         # If adding the next word would exceed max_chunk_size, store the current chunk
-        if len(current_chunk) + len(word) + 1 > max_chunk_size:  # +1 accounts for the space
-            chunks.append(current_chunk.strip())
-            current_chunk = word + " "
+        added = len(word) + (1 if current_words else 0)  # +1 accounts for the space
+        if current_words and current_size + added > max_chunk_size:
+            chunks.append(' '.join(current_words))
+            current_words = [word]
+            current_size = len(word)
         else:
-            current_chunk += word + " "
+            current_words.append(word)
+            current_size += added
 
-    # Append any remaining text in current_chunk
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    # Append any remaining words
+    if current_words:
+        chunks.append(' '.join(current_words))
 
     return chunks
 
 
-def extract_products_from_response(response: str) -> List[str]:
+def dedupe_products(products: List[str]) -> List[str]:
     """
-    Extract product names from the ChatGPT response, handling various formats.
+    Remove duplicate product names, e.g. products extracted twice from overlapping chunks.
+
+    Names are compared after case folding and punctuation normalization; the
+    first spelling seen is kept.
+
+    Args:
+        products (List[str]): Product names in extraction order.
+
+    Returns:
+        List[str]: Unique product names in first-seen order.
+    """
+    unique = {}
+    for product in products:
+        key = normalize_text(product)
+        if key and key not in unique:
+            unique[key] = product
+    return list(unique.values())
+
+
+def parse_products_response(response: str) -> Optional[List[str]]:
+    """
+    Parse the product names out of a ChatGPT response, telling failures apart from empty results.
 
     Args:
         response (str): The response from ChatGPT.
 
     Returns:
-        List[str]: A list of product names.
+        Optional[List[str]]: The product names; an empty list when the response is
+        a JSON list or object without products, and None when it is not a
+        product list at all, e.g. an error or a refusal.
     """
+    if not isinstance(response, str) or not response.strip():
+        return None
+
     # Remove any non-printable characters
     content = re.sub(r'[^\x20-\x7E]', '', response)
 
@@ -58,8 +102,6 @@ def extract_products_from_response(response: str) -> List[str]:
         if content.lower().startswith("json"):
             content = content[4:].strip()
 
-    products = []
-
     # Try parsing as JSON
     try:
         data = json.loads(content)
@@ -69,63 +111,244 @@ def extract_products_from_response(response: str) -> List[str]:
         elif isinstance(data, dict):
             products = [data.get('product name')
                         ] if 'product name' in data else []
+        else:
+            products = None
     except json.JSONDecodeError:
         # If JSON parsing fails, try to extract product names using regex
         logger.warning(
             "JSON parsing failed. Attempting to extract product names using regex.")
-        product_matches = re.findall(r'"product name":\s*"([^"]+)"', content)
-        products = product_matches
+        products = re.findall(r'"product name":\s*"([^"]+)"', content) or None
 
-    # If no products found, log the content for debugging
-    if not products:
-        logger.error(
-            f"No products extracted. Response content: {content[:500]}...")
+    if products is None:
+        logger.error(f"Response is not a product list: {content[:500]}...")
+        return None
 
     # Remove any None values and strip whitespace
-    products = [p.strip() for p in products if p]
-
-    return products
+    return [p.strip() for p in products if isinstance(p, str) and p.strip()]
 
 
-def parse_pdf_catalogue(pdf_file: str) -> List[str]:
+def extract_products_from_response(response: str) -> List[str]:
     """
-    Parse the PDF catalogue and extract product names.
+    Extract product names from the ChatGPT response, handling various formats.
 
     Args:
-        pdf_file (str): Path to the PDF catalogue file.
+        response (str): The response from ChatGPT.
 
     Returns:
         List[str]: A list of product names.
     """
-    with open(pdf_file, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        text = ' '.join(page.extract_text() for page in reader.pages)
+    products = parse_products_response(response)
 
-    chunks = chunk_text(text)
-    all_products = set()
+    # If no products found, log the content for debugging
+    if not products:
+        logger.error(
+            f"No products extracted. Response content: {str(response)[:500]}...")
+        return []
 
-    for i, chunk in enumerate(chunks):
-        prompt = f"""
+    return products
+
+
+def build_extraction_message(chunk: str) -> List[Dict[str, str]]:
+    """
+    Build the ChatGPT message that extracts product names from a catalogue chunk.
+
+    Args:
+        chunk (str): A chunk of catalogue text.
+
+    Returns:
+        List[Dict[str, str]]: The chat messages for the chunk.
+    """
+    prompt = f"""
         Extract product names from the following catalogue text. 
         Format the output as a JSON list of objects, each with a 'product name' key.
         
         Text for extraction:\n\n{chunk}
         """
-        message = [
-            {"role": "system", "content": "You are a helpful assistant that extracts product names from catalogues."},
-            {"role": "user", "content": prompt}
-        ]
+    return [
+        {"role": "system", "content": "You are a helpful assistant that extracts product names from catalogues."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _drain(source: "queue.Queue") -> Iterator[str]:
+    """Yield items from a queue until the None sentinel."""
+    while True:
+        item = source.get()
+        if item is None:
+            return
+        yield item
+
 
+def parse_pdf_catalogue(pdf_file: str, max_in_flight: int = 8,
+                        max_tokens: int = 1200, overlap_tokens: int = 100,
+                        queue_size: int = 16) -> List[str]:
+    """
+    Parse the PDF catalogue and extract product names.
+
+    Page extraction, chunking and ChatGPT extraction run as concurrent stages
+    connected by bounded queues: the first request is sent as soon as the
+    first chunk is ready, and up to max_in_flight requests await a response
+    at once. Pages are chunked by model tokens with overlapping chunk
+    boundaries, and products seen in more than one chunk are de-duplicated.
+
+    Args:
+        pdf_file (str): Path to the PDF catalogue file.
+        max_in_flight (int): Maximum number of concurrent ChatGPT requests.
+        max_tokens (int): Maximum number of tokens per chunk.
+        overlap_tokens (int): Number of tokens shared between consecutive chunks.
+        queue_size (int): Capacity of the queues between stages.
+
+    Returns:
+        List[str]: A list of product names.
+    """
+    page_queue = queue.Queue(maxsize=queue_size)
+    chunk_queue = queue.Queue(maxsize=queue_size)
+    chunks: List[str] = []
+    started = time.monotonic()
+
+    def extract_pages():
+        try:
+            for page in iter_pdf_pages(pdf_file):
+                page_queue.put(page)
+        except Exception as e:
+            logger.error(f"Error extracting pages from {pdf_file}: {e}")
+        finally:
+            page_queue.put(None)
+
+    pages_done = threading.Event()
+
+    def pages():
+        yield from _drain(page_queue)
+        pages_done.set()
+
+    def chunk_pages():
+        try:
+            for chunk in iter_token_chunks(pages(), max_tokens, overlap_tokens):
+                if not chunks:
+                    logger.info(f"First chunk ready after {time.monotonic() - started:.2f}s")
+                chunk_queue.put((len(chunks), build_extraction_message(chunk)))
+                chunks.append(chunk)
+        except Exception as e:
+            logger.error(f"Error chunking {pdf_file}: {e}")
+        finally:
+            # Unblock the page stage if chunking stopped early
+            if not pages_done.is_set():
+                while page_queue.get() is not None:
+                    pass
+            chunk_queue.put(None)
+
+    stages = [threading.Thread(target=extract_pages, daemon=True),
+              threading.Thread(target=chunk_pages, daemon=True)]
+    for stage in stages:
+        stage.start()
+    responses = run_sync(lambda: dispatch_chat_queue(chunk_queue, max_in_flight=max_in_flight))
+    for stage in stages:
+        stage.join()
+
+    all_products = []
+    for i, chunk in enumerate(chunks):
         try:
-            response = parse_with_chatgpt(message)
-            products = extract_products_from_response(response)
-            all_products.update(products)
+            products = extract_products_from_response(responses.get(i, []))
+            all_products.extend(products)
             logger.info(f"Extracted {len(products)} products from chunk {i+1}")
         except Exception as e:
             logger.error(f"Error processing chunk {i+1}: {e}")
             logger.error(f"Problematic chunk content: {chunk[:500]}...")
 
-    return sorted(list(all_products))
+    logger.info(f"Catalogue parsed in {time.monotonic() - started:.2f}s ({len(chunks)} chunks)")
+    return sorted(dedupe_products(all_products))
+
+
+def catalogue_index_path(output_file: str) -> str:
+    """
+    Get the path of the sidecar chunk index kept next to a catalogue CSV.
+
+    Args:
+        output_file (str): Path to the catalogue CSV file.
+
+    Returns:
+        str: Path to the index file, e.g. data/catalogue.index.json for data/catalogue.csv.
+    """
+    return f"{os.path.splitext(output_file)[0]}.index.json"
+
+
+def chunk_hash(chunk: str) -> str:
+    """
+    Hash a chunk together with the extraction prompt it is sent with.
+
+    Args:
+        chunk (str): A chunk of catalogue text.
+
+    Returns:
+        str: Hex SHA-256 digest identifying the chunk's extraction request.
+    """
+    message = build_extraction_message(chunk)
+    return hashlib.sha256(json.dumps(message, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def parse_pdf_catalogue_incremental(pdf_file: str, index_file: str, max_in_flight: int = 8,
+                                    max_tokens: int = 1200,
+                                    overlap_tokens: int = 100) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Re-parse a catalogue, sending only new or changed chunks to ChatGPT.
+
+    Each page is chunked on its own, so an edit to one page only changes that
+    page's chunks. Products extracted per chunk are stored by chunk hash in
+    index_file; chunks whose hash is already indexed reuse their stored
+    products. A chunk whose response is not a product list, such as an
+    error or a refusal, is not indexed and is sent again on the next run.
+    The index is rewritten with the current chunks only.
+
+    Args:
+        pdf_file (str): Path to the PDF catalogue file.
+        index_file (str): Path to the sidecar chunk index (see catalogue_index_path).
+        max_in_flight (int): Maximum number of concurrent ChatGPT requests.
+        max_tokens (int): Maximum number of tokens per chunk.
+        overlap_tokens (int): Number of tokens shared between consecutive chunks of a page.
+
+    Returns:
+        Tuple[List[str], Dict[str, List[str]]]: The product names and a diff with
+        the "added" and "removed" products compared to the previous run.
+    """
+    index = load_json(index_file) if os.path.exists(index_file) else {}
+    known_chunks = index.get('chunks', {})
+    previous_products = index.get('products', [])
+
+    chunks = [chunk for page in iter_pdf_pages(pdf_file)
+              for chunk in iter_token_chunks([page], max_tokens, overlap_tokens)]
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+
+    changed = {}
+    for digest, chunk in zip(hashes, chunks):
+        if digest not in known_chunks:
+            changed.setdefault(digest, chunk)
+    logger.info(f"{len(changed)} of {len(chunks)} chunks changed since the last run")
+
+    digests = list(changed)
+    responses = parse_many_with_chatgpt(
+        [build_extraction_message(changed[d]) for d in digests], max_in_flight=max_in_flight)
+    chunk_products = {d: known_chunks[d] for d in hashes if d in known_chunks}
+    for digest, response in zip(digests, responses):
+        products = parse_products_response(response)
+        if products is None:
+            # Left out of the index so the chunk is retried on the next run
+            logger.error(f"Chunk {digest[:12]} got no product list; it will be retried")
+            continue
+        chunk_products[digest] = products
+
+    products = sorted(dedupe_products(
+        [p for digest in hashes for p in chunk_products.get(digest, [])]))
+
+    previous_keys = {normalize_text(p) for p in previous_products}
+    current_keys = {normalize_text(p) for p in products}
+    diff = {
+        "added": [p for p in products if normalize_text(p) not in previous_keys],
+        "removed": [p for p in previous_products if normalize_text(p) not in current_keys],
+    }
+    logger.info(f"Catalogue diff: {len(diff['added'])} added, {len(diff['removed'])} removed")
+
+    save_json({"chunks": chunk_products, "products": products}, index_file)
+    return products, diff
 
 
 def save_catalogue(products: List[str], output_file: str):
@@ -142,8 +365,22 @@ def save_catalogue(products: List[str], output_file: str):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract product names from the catalogue PDF.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only send chunks changed since the last run to ChatGPT")
+    args = parser.parse_args()
+
     pdf_file = '../data/PremierQualityFoodsBrochure2021.pdf'
     output_file = '../data/catalogue.csv'
-    products = parse_pdf_catalogue(pdf_file)
+    if args.incremental:
+        products, diff = parse_pdf_catalogue_incremental(pdf_file, catalogue_index_path(output_file))
+        print(f"Added products: {diff['added']}")
+        print(f"Removed products: {diff['removed']}")
+    else:
+        products = parse_pdf_catalogue(pdf_file)
     save_catalogue(products, output_file)
+    db = open_store()
+    if db is not None:
+        db.replace_catalogue(products)
+        db.close()
     print(f"Catalogue parsing completed. Results saved to {output_file}")
@@ -0,0 +1,94 @@
+import logging
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, Tuple
+from src.utils import DEFAULT_MODEL, count_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 1200
+DEFAULT_OVERLAP_TOKENS = 100
+
+
+def _iter_units(pages: Iterable[str], max_tokens: int, model: str) -> Iterator[Tuple[str, int]]:
+    """
+    Split pages into lines with their token counts.
+
+    Lines are the natural boundary of catalogue entries and menu items, so they
+    are kept whole; only a line longer than the whole budget is split by words.
+    """
+    for page in pages:
+        for line in page.splitlines():
+            line = ' '.join(line.split())
+            if not line:
+                continue
+            tokens = count_tokens(line, model)
+            if tokens <= max_tokens:
+                yield line, tokens
+                continue
+
+            words: List[str] = []
+            used = 0
+            for word in line.split(' '):
+                word_tokens = count_tokens(f" {word}", model)
+                if words and used + word_tokens > max_tokens:
+                    yield ' '.join(words), used
+                    words, used = [], 0
+                words.append(word)
+                used += word_tokens
+            if words:
+                yield ' '.join(words), used
+
+
+def iter_token_chunks(pages: Iterable[str],
+                      max_tokens: int = DEFAULT_MAX_TOKENS,
+                      overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                      model: str = DEFAULT_MODEL) -> Iterator[str]:
+    """
+    Stream chunks of at most max_tokens model tokens from a stream of pages.
+
+    Chunks are built from whole lines and each chunk starts with the trailing
+    lines of the previous one, up to overlap_tokens, so an entry that straddles
+    a chunk boundary appears complete in at least one chunk. Each line is
+    tokenized once and only the current chunk is held in memory, so the work
+    is linear in the length of the input.
+
+    Args:
+        pages (Iterable[str]): Page texts, e.g. from pdf_extraction.iter_pdf_pages.
+        max_tokens (int): Maximum number of tokens per chunk.
+        overlap_tokens (int): Maximum number of tokens repeated from the previous chunk.
+        model (str): The model whose tokenizer measures chunk size.
+
+    Yields:
+        str: Chunks of text with lines separated by newlines.
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+
+    current: Deque[Tuple[str, int]] = deque()
+    used = 0
+    # Number of lines at the start of current carried over from the previous chunk
+    carried = 0
+
+    for line, tokens in _iter_units(pages, max_tokens - 1, model):
+        # Each line costs one extra token for its newline separator
+        tokens += 1
+        if current and used + tokens > max_tokens:
+            yield '\n'.join(text for text, _ in current)
+
+            overlap: Deque[Tuple[str, int]] = deque()
+            overlap_used = 0
+            for text, size in reversed(current):
+                if overlap_used + size > overlap_tokens or overlap_used + size + tokens > max_tokens:
+                    break
+                overlap.appendleft((text, size))
+                overlap_used += size
+            current, used, carried = overlap, overlap_used, len(overlap)
+
+        current.append((line, tokens))
+        used += tokens
+
+    if len(current) > carried:
+        yield '\n'.join(text for text, _ in current)
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Union
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_STORE = "../data/http_cache.json"
+
+# Returned by conditional fetches when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
+
+def content_hash(content: Union[str, bytes]) -> str:
+    """
+    Hash fetched content to detect changes when the server gives no validators.
+
+    Args:
+        content (Union[str, bytes]): Page text or raw response body.
+
+    Returns:
+        str: Hex SHA-256 digest of the content.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """
+    Hash a downloaded file without reading it into memory at once.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: Hex SHA-256 digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FetchStore:
+    """
+    Per-URL record of what was fetched and what was derived from it.
+
+    For each URL the store keeps the ETag and Last-Modified validators the
+    server sent, a hash of the content, its size and the result computed from
+    it (e.g. the extracted ingredients). Re-scrapes send conditional requests
+    with the validators; when the server answers 304, or the content hash is
+    unchanged, the stored result is reused and text extraction and the LLM
+    call are skipped. Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_FETCH_STORE):
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Validators of responses whose result has not been computed yet
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'not_modified': 0, 'unchanged': 0, 'changed': 0,
+                      'bytes_saved': 0, 'llm_calls_saved': 0}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable fetch store {path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored entry of a URL.
+
+        Args:
+            url (str): The fetched URL.
+
+        Returns:
+            Optional[Dict[str, Any]]: The entry, or None if the URL was never stored.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            return dict(entry) if entry is not None else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Build the headers of a conditional request for a URL.
+
+        Args:
+            url (str): The URL about to be fetched.
+
+        Returns:
+            Dict[str, str]: If-None-Match / If-Modified-Since headers, empty if unknown.
+        """
+        entry = self.get(url) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def remember_validators(self, url: str, response_headers) -> None:
+        """
+        Keep the validators of a fresh response until its result is stored.
+
+        Args:
+            url (str): The fetched URL.
+            response_headers: The response headers (any case-insensitive mapping).
+        """
+        validators = {'etag': response_headers.get('ETag'),
+                      'last_modified': response_headers.get('Last-Modified')}
+        with self._lock:
+            self._pending[url] = {k: v for k, v in validators.items() if v}
+
+    def unchanged(self, url: str, digest: str) -> Optional[Any]:
+        """
+        Look up the stored result of a URL whose content hashes to digest.
+
+        Args:
+            url (str): The fetched URL.
+            digest (str): Hash of the content just fetched.
+
+        Returns:
+            Optional[Any]: The stored result if the content is unchanged, otherwise None.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry.get('content_hash') != digest:
+                return None
+            # Keep validators the server may have started sending
+            entry.update(self._pending.pop(url, {}))
+            entry['checked_at'] = time.time()
+            self.stats['unchanged'] += 1
+            self.stats['llm_calls_saved'] += entry.get('llm_calls', 0)
+            return entry['result']
+
+    def not_modified(self, url: str) -> Optional[Any]:
+        """
+        Get the stored result of a URL the server reported as not modified.
+
+        Args:
+            url (str): The fetched URL.
+
+        Returns:
+            Optional[Any]: The stored result, or None if the URL was never stored.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            entry['checked_at'] = time.time()
+            self.stats['not_modified'] += 1
+            self.stats['bytes_saved'] += entry.get('size', 0)
+            self.stats['llm_calls_saved'] += entry.get('llm_calls', 0)
+            return entry['result']
+
+    def update(self, url: str, digest: str, size: int, result: Any, llm_calls: int = 1) -> None:
+        """
+        Store the result computed from freshly fetched content.
+
+        Args:
+            url (str): The fetched URL.
+            digest (str): Hash of the content.
+            size (int): Size of the content in bytes.
+            result (Any): JSON-serializable result derived from the content.
+            llm_calls (int): Number of LLM calls the result cost.
+        """
+        with self._lock:
+            entry = dict(self._pending.pop(url, {}))
+            entry.update({'content_hash': digest, 'size': size, 'result': result,
+                          'llm_calls': llm_calls, 'checked_at': time.time()})
+            self._entries[url] = entry
+            self.stats['changed'] += 1
+
+    def save(self) -> None:
+        """Write the store to disk atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._entries, indent=2, ensure_ascii=False)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save fetch store {self.path}: {e}")
+
+    def report(self) -> str:
+        """
+        Summarize how much work conditional fetching saved.
+
+        Returns:
+            str: Human-readable one-line report.
+        """
+        s = self.stats
+        return (f"{s['not_modified']} not modified, {s['unchanged']} unchanged, "
+                f"{s['changed']} new or changed; saved {s['bytes_saved'] / 1024:.0f} KB "
+                f"and {s['llm_calls_saved']} LLM calls")
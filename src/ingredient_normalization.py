@@ -0,0 +1,328 @@
+import os
+import re
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from src.matching_index import UNIT_PATTERN, normalize_text, stem
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+COMPACT_INGREDIENTS_FILE = "../data/ingredients.compact.json"
+COMPACT_FORMAT_VERSION = 1
+
+# Plurals the suffix rules of stem get wrong
+IRREGULAR_LEMMAS = {
+    'leaves': 'leaf', 'loaves': 'loaf', 'halves': 'half', 'calves': 'calf',
+    'knives': 'knife', 'geese': 'goose', 'mice': 'mouse', 'teeth': 'tooth',
+    'radishes': 'radish', 'anchovies': 'anchovy', 'cherries': 'cherry',
+}
+
+# Words that describe how an ingredient is sold or served, not what it is
+DESCRIPTORS = {
+    'fresh', 'organic', 'homemade', 'premium', 'artisan', 'artisanal', 'local',
+    'seasonal', 'select', 'selection', 'finest', 'famous', 'signature', 'classic',
+    'traditional', 'australian', 'imported',
+}
+
+# Descriptors that are only descriptors as a whole phrase
+DESCRIPTOR_PHRASES = ['free range', 'house made', 'locally sourced']
+_DESCRIPTOR_PHRASE_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(re.escape(p) for p in DESCRIPTOR_PHRASES) + r')\b')
+
+# "gluten free", "dairy-free": the word before "free" is what is left out, so
+# the phrase is kept as a single token such as 'gluten-free'
+_FREE_FROM_PATTERN = re.compile(r'\b([a-z]+) free\b')
+
+# Producers and brands that show up in menu ingredient lists
+BRANDS = [
+    'belvedere', 'absolut', 'smirnoff', 'grey goose', 'tanqueray', 'hendricks',
+    'bombay sapphire', 'bacardi', 'havana club', 'patron', 'jameson', 'johnnie walker',
+    'four pillars', 'aperol', 'campari', 'cointreau', 'baileys', 'kahlua', 'heineken',
+    'corona', 'peroni', 'asahi', 'stone and wood', 'coca cola', 'schweppes',
+    'fever tree', 'kiwami', 'blackmore', 'rangers valley', 'heinz', 'kraft',
+    'nutella', 'lurpak', 'maggi', 'kewpie',
+]
+_BRAND_PATTERN = re.compile(r'\b(?:' + '|'.join(re.escape(b) for b in BRANDS) + r')\b')
+
+# Quoted names, bracketed notes and trademark signs
+_QUOTED = re.compile(r"[‘“\"][^’”\"]*[’”\"]|\([^)]*\)|\[[^\]]*\]|[®™©]")
+_DIGIT = re.compile(r'\d')
+
+
+def lemmatize(word: str) -> str:
+    """
+    Reduce a normalized word to its singular form.
+
+    Args:
+        word (str): A lowercase word.
+
+    Returns:
+        str: The lemma, e.g. 'whites' -> 'white', 'leaves' -> 'leaf'.
+    """
+    return IRREGULAR_LEMMAS.get(word) or stem(word)
+
+
+def normalize_ingredient(text: str) -> str:
+    """
+    Normalize an ingredient name so spellings of the same ingredient compare equal.
+
+    Quoted names, bracketed notes, quantities, grades and codes containing
+    digits, brand names and descriptors are removed, the rest is case folded
+    and every word is lemmatized. "X free" phrases are kept as one 'X-free'
+    token, so 'Gluten free bread' stays 'gluten-free bread'. A name made only
+    of brand or descriptor words keeps those words rather than vanishing.
+
+    Args:
+        text (str): An ingredient as extracted from a menu.
+
+    Returns:
+        str: The canonical name, e.g. 'Egg whites' -> 'egg white', or '' if
+        nothing is left.
+    """
+    normalized = normalize_text(_QUOTED.sub(' ', text))
+    words = [w.strip('./') for w in normalized.split()]
+    words = [w for w in words if w and not _DIGIT.search(w) and not UNIT_PATTERN.match(w)]
+    text = _DESCRIPTOR_PHRASE_PATTERN.sub(' ', _BRAND_PATTERN.sub(' ', ' '.join(words)))
+    text = _FREE_FROM_PATTERN.sub(r'\1-free', text)
+    kept = [w for w in text.split() if w not in DESCRIPTORS]
+    return ' '.join(lemmatize(w) for w in (kept or words))
+
+
+def parse_ingredients(value: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Split the ingredients of a venue record into individual names.
+
+    Args:
+        value (Union[str, Iterable[str], None]): A comma-separated string, as in
+            ingredients.json, or a list of names.
+
+    Returns:
+        List[str]: The stripped, non-empty names.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [i.strip() for i in value if i and i.strip()]
+
+
+class IngredientVocabulary:
+    """
+    Interned canonical ingredient names, each with a stable integer ID.
+
+    Raw names are normalized with normalize_ingredient before interning, so
+    'Egg whites' and 'egg white' get the same ID. IDs are assigned in order of
+    first appearance and never change while the vocabulary is extended.
+    """
+
+    def __init__(self, terms: Optional[Iterable[str]] = None):
+        self.terms: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for term in terms or []:
+            self.intern(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.terms)
+
+    def intern(self, term: str) -> int:
+        """
+        Get the ID of a canonical name, assigning a new one if needed.
+
+        Args:
+            term (str): A name already normalized with normalize_ingredient.
+
+        Returns:
+            int: The ID.
+        """
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = self._ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def id_of(self, ingredient: str) -> Optional[int]:
+        """
+        Look up the ID of a raw ingredient name without extending the vocabulary.
+
+        Args:
+            ingredient (str): An ingredient as extracted from a menu.
+
+        Returns:
+            Optional[int]: The ID, or None if the ingredient is unknown.
+        """
+        return self._ids.get(normalize_ingredient(ingredient))
+
+    def encode(self, ingredients: Union[str, Iterable[str]]) -> List[int]:
+        """
+        Normalize and intern the ingredients of a venue.
+
+        Args:
+            ingredients (Union[str, Iterable[str]]): Comma-separated string or list of names.
+
+        Returns:
+            List[int]: Distinct IDs in order of first appearance.
+        """
+        ids = {}
+        for ingredient in parse_ingredients(ingredients):
+            term = normalize_ingredient(ingredient)
+            if term:
+                ids.setdefault(self.intern(term), None)
+        return list(ids)
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """
+        Get the canonical names of IDs.
+
+        Args:
+            ids (Iterable[int]): Ingredient IDs.
+
+        Returns:
+            List[str]: The names, in the same order.
+        """
+        return [self.terms[i] for i in ids]
+
+
+def build_compact_ingredients(records: Iterable[Dict[str, Any]],
+                              vocabulary: Optional[IngredientVocabulary] = None
+                              ) -> Tuple[IngredientVocabulary, Dict[str, List[int]]]:
+    """
+    Convert venue ingredient records to ID arrays over a shared vocabulary.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Records with 'name' and 'ingredients',
+            as in ingredients.json.
+        vocabulary (Optional[IngredientVocabulary]): Vocabulary to extend; a new
+            one by default.
+
+    Returns:
+        Tuple[IngredientVocabulary, Dict[str, List[int]]]: The vocabulary and the
+        ingredient IDs of each venue.
+    """
+    if vocabulary is None:
+        vocabulary = IngredientVocabulary()
+    venues = {}
+    for record in records:
+        venues[record.get('name', 'Unknown')] = vocabulary.encode(record.get('ingredients'))
+    return vocabulary, venues
+
+
+def save_compact_ingredients(path: str, vocabulary: IngredientVocabulary,
+                             venues: Dict[str, List[int]]) -> None:
+    """
+    Write the compact ingredient file atomically.
+
+    The file holds the vocabulary once and an array of IDs per venue, instead
+    of repeating every ingredient string in every venue.
+
+    Args:
+        path (str): Output file.
+        vocabulary (IngredientVocabulary): The vocabulary the IDs refer to.
+        venues (Dict[str, List[int]]): Ingredient IDs per venue name.
+    """
+    data = {
+        'version': COMPACT_FORMAT_VERSION,
+        'vocabulary': vocabulary.terms,
+        'venues': venues,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    logger.info(f"Saved {len(venues)} venues over {len(vocabulary)} ingredients to {path}")
+
+
+def load_compact_ingredients(path: str) -> Tuple[IngredientVocabulary, Dict[str, List[int]]]:
+    """
+    Read a file written by save_compact_ingredients.
+
+    Args:
+        path (str): The compact ingredient file.
+
+    Returns:
+        Tuple[IngredientVocabulary, Dict[str, List[int]]]: The vocabulary and the
+        ingredient IDs of each venue.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != COMPACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact ingredients version in {path}: {data.get('version')}")
+    return IngredientVocabulary(data['vocabulary']), data['venues']
+
+
+def write_compact_ingredients(ingredients_file: str, compact_file: str) -> None:
+    """
+    Convert ingredients.json to the compact format.
+
+    Args:
+        ingredients_file (str): JSON list of records with 'name' and 'ingredients'.
+        compact_file (str): Output file.
+    """
+    with open(ingredients_file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    vocabulary, venues = build_compact_ingredients(records)
+    save_compact_ingredients(compact_file, vocabulary, venues)
+
+
+def preferred_ingredients_file(ingredients_file: str, compact_file: str) -> str:
+    """
+    Choose the compact ingredient file when it is up to date with ingredients.json.
+
+    Args:
+        ingredients_file (str): ingredients.json.
+        compact_file (str): The compact file written from it.
+
+    Returns:
+        str: compact_file if it exists and is at least as new as ingredients_file,
+        else ingredients_file.
+    """
+    try:
+        compact_mtime = os.stat(compact_file).st_mtime_ns
+    except OSError:
+        return ingredients_file
+    try:
+        source_mtime = os.stat(ingredients_file).st_mtime_ns
+    except OSError:
+        return compact_file
+    if compact_mtime >= source_mtime:
+        return compact_file
+    logger.warning(f"Ignoring {compact_file}, which is older than {ingredients_file}")
+    return ingredients_file
+
+
+def load_venue_ingredients(path: str) -> List[Dict[str, Any]]:
+    """
+    Load venue ingredients from either ingredients.json or the compact format.
+
+    Args:
+        path (str): An ingredients.json style file or a compact ingredient file.
+
+    Returns:
+        List[Dict[str, Any]]: Records with 'name' and 'ingredients'; compact files
+        give normalized names in a list, the JSON file the strings as stored.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict) and 'vocabulary' in data:
+        vocabulary = IngredientVocabulary(data['vocabulary'])
+        return [{'name': name, 'ingredients': vocabulary.decode(ids)}
+                for name, ids in data['venues'].items()]
+    return data
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert ingredients.json to the compact ID format.")
+    parser.add_argument('--input', default="../data/ingredients.json", help="Ingredients JSON file")
+    parser.add_argument('--output', default=COMPACT_INGREDIENTS_FILE, help="Compact output file")
+    args = parser.parse_args()
+    write_compact_ingredients(args.input, args.output)
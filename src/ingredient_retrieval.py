@@ -1,21 +1,35 @@
 import json
 import os
 import logging
-import time
-from typing import List, Dict, Union
+import argparse
+from collections import Counter
+from typing import List, Dict, Union, Optional
 from urllib.parse import urljoin
 import requests
+import requests.adapters
 from bs4 import BeautifulSoup
-import PyPDF2
-import io
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from src.utils import parse_with_chatgpt, save_json, load_json
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from src.utils import parse_with_chatgpt, save_json, load_json, count_tokens
+from src.llm_dispatcher import parse_many_with_chatgpt
+from src.chunking import iter_token_chunks
+from src.matching_index import normalize_text
+from src.pdf_extraction import PageTextCache, default_page_cache, extract_pdf_text
+from src.async_fetch import BackgroundFetcher
+from src.menu_dedupe import MenuDeduplicator
+from src.menu_content import compact_text, compaction_report, extract_menu_text
+from src.journal import Journal, journal_path
+from src.store import open_store
+from src.ingredient_normalization import (COMPACT_INGREDIENTS_FILE, normalize_ingredient,
+                                          write_compact_ingredients)
+from src.http_cache import DEFAULT_FETCH_STORE, NOT_MODIFIED, FetchStore, content_hash, file_hash
+from src.politeness import DomainThrottle, domain_of
+from src.page_readiness import AdaptiveTimeout, RetryPolicy, wait_for_page_ready
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -25,58 +39,185 @@ logging.basicConfig(level=logging.INFO,
 logger = logging.getLogger(__name__)
 
 
+CHROMEDRIVER_PATH = os.getenv(
+    'CHROMEDRIVER_PATH', 'C:\\Windows\\chromedriver-win64\\chromedriver.exe')
+
+INGREDIENTS_FILE = "../data/ingredients.json"
+
+# Fetch tiers, cheapest first
+STATIC_TIER = "static"
+BROWSER_TIER = "browser"
+
+# Signs that a page only renders its content with JavaScript
+SPA_MARKERS = [
+    'enable javascript', 'javascript is required', 'javascript is disabled',
+    '<div id="root"></div>', '<div id="app"></div>', '<div id="__next"></div>',
+    'ng-app', 'data-reactroot', '__nuxt',
+]
+MIN_STATIC_TEXT_LENGTH = 300
+
+# Menu text above this many tokens is extracted in chunks
+DEFAULT_MAX_PROMPT_TOKENS = 3000
+CHUNK_OVERLAP_TOKENS = 50
+
+
+def create_session(pool_size: int = 20) -> requests.Session:
+    """
+    Create an HTTP session with a connection pool sized for concurrent scraping.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+    return session
+
+
+def needs_javascript(html: str, min_text_length: int = MIN_STATIC_TEXT_LENGTH) -> bool:
+    """
+    Guess whether a statically fetched page needs a browser to render its content.
+
+    Args:
+        html (str): The HTML returned by a plain HTTP request.
+        min_text_length (int): Minimum visible text length of a fully rendered page.
+
+    Returns:
+        bool: True if the page is empty, is an SPA shell or has too little text.
+    """
+    if not html or not html.strip():
+        return True
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript', 'template']):
+        tag.decompose()
+    text = soup.get_text(separator=' ', strip=True)
+    if len(text) < min_text_length:
+        return True
+    lowered = html.lower()
+    # A short page carrying SPA markers is a shell; a long one is server-rendered
+    return len(text) < 4 * min_text_length and any(marker in lowered for marker in SPA_MARKERS)
+
+
+def merge_ingredients(ingredients: List[str]) -> List[str]:
+    """
+    Merge ingredient lists, dropping duplicates that differ only in case, plurals or punctuation.
+
+    Args:
+        ingredients (List[str]): Ingredient names, possibly repeated across chunks.
+
+    Returns:
+        List[str]: The first spelling of each distinct ingredient, in order.
+    """
+    merged = {}
+    for ingredient in ingredients:
+        ingredient = ' '.join(ingredient.split()).strip(' .;:-')
+        if not ingredient:
+            continue
+        key = normalize_ingredient(ingredient) or normalize_text(ingredient)
+        merged.setdefault(key, ingredient)
+    return list(merged.values())
+
+
 class Scraper:
-    def __init__(self):
-        self.session = requests.Session()
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-software-rasterizer")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        service = Service('C:\\Windows\\chromedriver-win64\\chromedriver.exe')
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.existing_ingredients = self.load_existing_ingredients()
-
-    def load_existing_ingredients(self) -> Dict[str, str]:
+    def __init__(self, use_browser: bool = True, throttle: Optional[DomainThrottle] = None,
+                 existing_ingredients: Optional[Dict[str, str]] = None,
+                 domain_tiers: Optional[Dict[str, str]] = None,
+                 session: Optional[requests.Session] = None,
+                 readiness_timeout: Optional[AdaptiveTimeout] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 fetch_store: Optional[FetchStore] = None,
+                 deduplicator: Optional[MenuDeduplicator] = None,
+                 pdf_fetcher: Optional[BackgroundFetcher] = None,
+                 page_cache: Optional[PageTextCache] = default_page_cache,
+                 max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS,
+                 max_chunks_in_flight: int = 4):
+        self.session = session or create_session()
+        # Render time learned per domain; may be shared between scrapers
+        self.readiness_timeout = readiness_timeout or AdaptiveTimeout()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Conditional re-fetch store; None fetches and processes everything
+        self.fetch_store = fetch_store
+        # Menus already sent to the LLM in this run; may be shared between scrapers
+        self.deduplicator = deduplicator or MenuDeduplicator()
+        # PDF downloader kept open for the run; may be shared between scrapers, which then
+        # leave closing it to their owner
+        self._owns_pdf_fetcher = pdf_fetcher is None
+        self.pdf_fetcher = pdf_fetcher or BackgroundFetcher(throttle=throttle, store=fetch_store)
+        # Text of PDF pages by file hash; None extracts every PDF again
+        self.page_cache = page_cache
+        # Long menus are split into chunks of this many tokens, extracted concurrently
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_chunks_in_flight = max_chunks_in_flight
+        self.use_browser = use_browser
+        self.throttle = throttle
+        # Which fetch tier worked for each domain; may be shared between scrapers
+        self.domain_tiers = {} if domain_tiers is None else domain_tiers
+        self.tier_counts = Counter()
+        # Prompt tokens of page text before and after boilerplate stripping
+        self.prompt_tokens = Counter()
+        self._driver = None
+        self.existing_ingredients = (self.load_existing_ingredients()
+                                     if existing_ingredients is None else existing_ingredients)
+
+    @property
+    def driver(self):
+        """Start headless Chrome on first use, so requests-only scraping never launches it."""
+        if self._driver is None:
+            chrome_options = Options()
+            chrome_options.add_argument("--headless")
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-software-rasterizer")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            # Fall back to Selenium Manager when the configured chromedriver is absent
+            service = Service(CHROMEDRIVER_PATH) if os.path.exists(CHROMEDRIVER_PATH) else Service()
+            self._driver = webdriver.Chrome(service=service, options=chrome_options)
+        return self._driver
+
+    @staticmethod
+    def load_existing_ingredients() -> Dict[str, str]:
         """Load existing ingredients from the JSON file."""
-        filename = "../data/ingredients.json"
+        filename = INGREDIENTS_FILE
         if os.path.exists(filename):
             data = load_json(filename)
             return {item['name']: item['ingredients'] for item in data}
         return {}
 
+    def close(self):
+        """Quit the browser if one was started, and close the PDF downloader this scraper owns."""
+        if getattr(self, '_driver', None) is not None:
+            self._driver.quit()
+            self._driver = None
+        if getattr(self, '_owns_pdf_fetcher', False):
+            self.pdf_fetcher.close()
+
     def __del__(self):
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        self.close()
+
+    def wait_for_turn(self, url: str):
+        """Respect the per-domain politeness limit, if one is configured."""
+        if self.throttle is not None:
+            self.throttle.wait(url)
 
     def handle_popup(self):
+        # Called once the page has settled, so a popup is either there already or not coming
         try:
-            WebDriverWait(self.driver, 5).until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR,
-                 "button[class*='close'], div[class*='popup'] button, div[id*='popup'] button")
-            ))
             close_button = self.driver.find_element(
                 By.CSS_SELECTOR, "button[class*='close'], div[class*='popup'] button, div[id*='popup'] button")
             close_button.click()
             logger.info("Popup closed successfully.")
-        except (TimeoutException, NoSuchElementException):
+        except (NoSuchElementException, WebDriverException):
             logger.info("No popup found or unable to close popup.")
 
-    def extract_text_from_pdf(self, pdf_content: bytes) -> str:
-        try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        except PyPDF2.PdfReadError as e:
-            logger.error(f"Error reading PDF: {e}")
-            return ""
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF: {e}")
-            return ""
+    def extract_text_from_pdf(self, pdf_content: Union[bytes, str]) -> str:
+        return extract_pdf_text(pdf_content, cache=self.page_cache)
 
     def extract_text_from_html(self, html: str) -> str:
         soup = BeautifulSoup(html, 'html.parser')
@@ -92,7 +233,8 @@ class Scraper:
                 pdf_links.append(full_url)
         return pdf_links
 
-    def extract_ingredients(self, text: str) -> List[str]:
+    @staticmethod
+    def build_extraction_message(text: str) -> List[Dict[str, str]]:
         prompt = f"""
         Extract all unique ingredients from the provided restaurant menu text. 
         Return them as a comma-separated list, without duplicates. 
@@ -104,58 +246,227 @@ class Scraper:
 
         content = "You are a helpful assistant that extracts ingredients from restaurant menu text."
 
-        message = [
+        return [
             {"role": "system", "content": content},
             {"role": "user", "content": prompt}
         ]
 
+    def extract_ingredients(self, text: str) -> List[str]:
+        """
+        Extract the ingredients of menu text with the LLM.
+
+        Text longer than max_prompt_tokens is split into overlapping chunks of
+        whole lines that are extracted in parallel, at most
+        max_chunks_in_flight at a time, and the ingredient lists are merged.
+
+        Args:
+            text (str): Menu text.
+
+        Returns:
+            List[str]: Unique ingredients, in order of first mention.
+        """
         try:
-            content = parse_with_chatgpt(message)
-            # Extract ingredients directly
-            ingredients = [ingredient.strip()
-                           for ingredient in content.split(',') if ingredient.strip()]
+            if count_tokens(text) <= self.max_prompt_tokens:
+                responses = [parse_with_chatgpt(self.build_extraction_message(text))]
+            else:
+                chunks = list(iter_token_chunks([text], max_tokens=self.max_prompt_tokens,
+                                                overlap_tokens=CHUNK_OVERLAP_TOKENS))
+                logger.info(f"Extracting ingredients from {len(chunks)} chunks of a long menu")
+                responses = parse_many_with_chatgpt(
+                    [self.build_extraction_message(chunk) for chunk in chunks],
+                    max_in_flight=self.max_chunks_in_flight)
+            # Failed chunks come back as empty lists and contribute nothing
+            ingredients = merge_ingredients(
+                [ingredient for response in responses if isinstance(response, str)
+                 for ingredient in response.split(',')])
             logger.info(f"Raw ingredients response: {ingredients}")
             return ingredients
         except Exception as e:
             logger.error(f"Error extracting ingredients: {e}")
             return []
 
+    def ingredients_for_text(self, text: str) -> List[str]:
+        """
+        Extract the ingredients of menu text, reusing the result of a duplicate menu.
+
+        Args:
+            text (str): Text of a menu page or PDF.
+
+        Returns:
+            List[str]: The ingredients of the menu.
+        """
+        return self.deduplicator.get_or_compute(text, self.extract_ingredients)
+
     def scrape_pdf(self, url: str) -> List[str]:
         try:
+            self.wait_for_turn(url)
             response = self.session.get(url)
             response.raise_for_status()
-            text = self.extract_text_from_pdf(response.content)
-            return self.extract_ingredients(text)
+            text = compact_text(self.extract_text_from_pdf(response.content))
+            return self.ingredients_for_text(text)
         except Exception as e:
             logger.error(f"Error scraping PDF {url}: {e}")
             return []
 
+    def scrape_pdfs(self, urls: List[str]) -> List[str]:
+        """
+        Download a venue's PDF menus concurrently and extract their ingredients.
+
+        The PDFs of one menu page are fetched as a burst, taking one politeness
+        slot per domain rather than one per PDF.
+
+        Args:
+            urls (List[str]): The PDF URLs.
+
+        Returns:
+            List[str]: The ingredients found in all PDFs.
+        """
+        ingredients = []
+        store = self.fetch_store
+        # The same PDF is often linked several times from one page
+        urls = list(dict.fromkeys(urls))
+        for url, pdf in zip(urls, self.pdf_fetcher.fetch_pdfs(urls)):
+            if pdf is None:
+                continue
+            try:
+                if pdf is NOT_MODIFIED:
+                    ingredients.extend(store.not_modified(url) or [])
+                    continue
+                digest = file_hash(pdf) if isinstance(pdf, str) else content_hash(pdf)
+                cached = store.unchanged(url, digest) if store is not None else None
+                if cached is not None:
+                    ingredients.extend(cached)
+                    continue
+                text = compact_text(self.extract_text_from_pdf(pdf))
+                pdf_ingredients = self.ingredients_for_text(text)
+                ingredients.extend(pdf_ingredients)
+                if store is not None and pdf_ingredients:
+                    size = os.path.getsize(pdf) if isinstance(pdf, str) else len(pdf)
+                    store.update(url, digest, size, pdf_ingredients)
+            except Exception as e:
+                logger.error(f"Error scraping PDF {url}: {e}")
+            finally:
+                if isinstance(pdf, str) and os.path.exists(pdf):
+                    os.remove(pdf)
+        return ingredients
+
+    def fetch_static(self, url: str) -> str:
+        headers = self.fetch_store.conditional_headers(url) if self.fetch_store is not None else None
+        response = self.session.get(url, timeout=15, headers=headers)
+        if response.status_code == 304:
+            return NOT_MODIFIED
+        response.raise_for_status()
+        if self.fetch_store is not None:
+            self.fetch_store.remember_validators(url, response.headers)
+        return response.text
+
+    def fetch_with_browser(self, url: str) -> str:
+        timeout = self.readiness_timeout.timeout_for(url)
+        self.driver.get(url)
+        WebDriverWait(self.driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "body"))
+        )
+        elapsed = wait_for_page_ready(self.driver, timeout=timeout)
+        self.handle_popup()
+        self.driver.execute_script(
+            "window.scrollTo(0, document.body.scrollHeight);")
+        # Wait for content lazily loaded by the scroll
+        elapsed += wait_for_page_ready(self.driver, timeout=timeout)
+        self.readiness_timeout.record(url, elapsed)
+        logger.info(f"{url} rendered in {elapsed:.1f}s")
+        return self.driver.page_source
+
+    def fetch_html(self, url: str) -> str:
+        """
+        Fetch a page with the cheapest tier that renders it.
+
+        A plain HTTP request is tried first; the browser is only used when the
+        static page looks like it needs JavaScript, or when the browser was
+        needed for the same domain before. Returns NOT_MODIFIED when the page
+        has not changed since it was stored in the fetch store.
+
+        The page takes one politeness slot, even when it is fetched by both tiers.
+        """
+        self.wait_for_turn(url)
+        domain = domain_of(url)
+        if not self.use_browser:
+            tier = STATIC_TIER
+        else:
+            tier = self.domain_tiers.get(domain)
+
+        if tier != BROWSER_TIER:
+            try:
+                html = self.fetch_static(url)
+                if html is NOT_MODIFIED or not self.use_browser or not needs_javascript(html):
+                    self.domain_tiers[domain] = STATIC_TIER
+                    self.tier_counts[STATIC_TIER] += 1
+                    return html
+                logger.info(f"{url} needs JavaScript, escalating to the browser")
+            except requests.RequestException as e:
+                if not self.use_browser:
+                    raise
+                logger.info(f"Static fetch of {url} failed ({e}), escalating to the browser")
+
+        html = self.fetch_with_browser(url)
+        self.domain_tiers[domain] = BROWSER_TIER
+        self.tier_counts[BROWSER_TIER] += 1
+        return html
+
+    def scrape_page(self, url: str, html: Union[str, object]) -> Dict[str, List[str]]:
+        """
+        Extract the ingredients and PDF links of a fetched menu page.
+
+        Only the menu content of the page is sent to the LLM; navigation,
+        banners and other boilerplate are stripped first.
+
+        Pages the fetch store knows to be unchanged, because the server answered
+        304 or the page text hashes the same, reuse the stored result without
+        calling the LLM.
+
+        Args:
+            url (str): The page URL.
+            html (Union[str, object]): The page HTML, or NOT_MODIFIED.
+
+        Returns:
+            Dict[str, List[str]]: "ingredients" and "pdf_links" of the page.
+        """
+        store = self.fetch_store
+        if html is NOT_MODIFIED:
+            cached = store.not_modified(url)
+            if cached is None:
+                raise ValueError(f"{url} reported as not modified but is not stored")
+            return cached
+
+        text = extract_menu_text(html)
+        digest = content_hash(text)
+        cached = store.unchanged(url, digest) if store is not None else None
+        if cached is not None:
+            return cached
+
+        report = compaction_report(self.extract_text_from_html(html), text)
+        self.prompt_tokens.update({'before': report['tokens_before'], 'after': report['tokens_after']})
+        logger.info(f"Menu text of {url}: {report['tokens_before']} -> {report['tokens_after']} "
+                    f"tokens ({report['reduction_pct']}% less)")
+
+        page = {"ingredients": self.ingredients_for_text(text),
+                "pdf_links": self.find_pdf_links(html, url)}
+        # An empty result may be an LLM failure, so it is never stored
+        if store is not None and page['ingredients']:
+            store.update(url, digest, len(html.encode('utf-8')), page)
+        return page
+
     def scrape_menu(self, url: str) -> List[str]:
-        max_retries = 3
+        max_retries = self.retry_policy.max_attempts
         all_ingredients = set()
 
         for attempt in range(max_retries):
             try:
-                self.driver.get(url)
-                self.handle_popup()
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "body"))
-                )
-                self.driver.execute_script(
-                    "window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(5)
-                html = self.driver.page_source
-
-                # Extract ingredients from HTML
-                text = self.extract_text_from_html(html)
-                html_ingredients = set(self.extract_ingredients(text))
-                all_ingredients.update(html_ingredients)
-
-                # Find and scrape PDF links
-                pdf_links = self.find_pdf_links(html, url)
-                for pdf_link in pdf_links:
-                    pdf_ingredients = set(self.scrape_pdf(pdf_link))
-                    all_ingredients.update(pdf_ingredients)
+                html = self.fetch_html(url)
+                page = self.scrape_page(url, html)
+                all_ingredients.update(page['ingredients'])
+
+                # Scrape the linked PDFs, downloading them concurrently
+                all_ingredients.update(self.scrape_pdfs(page['pdf_links']))
 
                 return list(all_ingredients)
             except Exception as e:
@@ -163,38 +474,47 @@ class Scraper:
                 if attempt < max_retries - 1:
                     logger.warning(
                         f"Attempt {attempt + 1} failed. Retrying...")
-                    time.sleep(5)
+                    self.retry_policy.backoff(attempt)
                 else:
                     logger.error(f"Error scraping {url}: {e}")
                     return list(all_ingredients)
 
-    def scrape_venue_ingredients(self, venues: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    def scrape_venue(self, venue: Dict[str, str]) -> Optional[Dict[str, str]]:
+        name = venue['name']
+        url = venue['website']
+        logger.info(f"Scraping ingredients for {name}...")
+        try:
+            ingredients = self.scrape_menu(url)
+            if ingredients:
+                logger.info(
+                    f"Ingredients extracted for {name}: {ingredients}")
+                return {"name": name, "ingredients": ", ".join(ingredients)}
+            logger.warning(f"No ingredients found for {name}")
+        except Exception as e:
+            logger.error(f"Failed to scrape ingredients for {name}: {e}")
+        return None
+
+    def scrape_venue_ingredients(self, venues: List[Dict[str, str]],
+                                 journal: Optional[Journal] = None) -> List[Dict[str, str]]:
         new_ingredients = []
         for venue in venues:
             name = venue['name']
-            url = venue['website']
             if name in self.existing_ingredients:
                 logger.info(
                     f"Skipping {name} as it already exists in ingredients.json")
                 continue
+            if journal is not None and name in journal:
+                logger.info(f"Skipping {name} as it was scraped by an interrupted run")
+                continue
 
-            logger.info(f"Scraping ingredients for {name}...")
-            try:
-                ingredients = self.scrape_menu(url)
-                if ingredients:
-                    new_ingredients.append({
-                        "name": name,
-                        "ingredients": ", ".join(ingredients)
-                    })
-                    self.existing_ingredients[name] = ", ".join(
-                        ingredients)  # Update existing_ingredients
-                    logger.info(
-                        f"Ingredients extracted for {name}: {ingredients}")
-                else:
-                    logger.warning(f"No ingredients found for {name}")
-            except Exception as e:
-                logger.error(f"Failed to scrape ingredients for {name}: {e}")
-            time.sleep(5)
+            result = self.scrape_venue(venue)
+            if result:
+                new_ingredients.append(result)
+                # Checkpoint right away so a crash loses at most this venue
+                if journal is not None:
+                    journal.append(result)
+                # Update existing_ingredients
+                self.existing_ingredients[name] = result['ingredients']
         return new_ingredients
 
 
@@ -207,35 +527,61 @@ def load_venues(filename: str) -> List[Dict[str, str]]:
         return []
 
 
-def save_ingredients_to_file(new_ingredients: List[Dict[str, str]], filename: str):
-    try:
-        # Load existing data
-        existing_data = load_json(filename) if os.path.exists(filename) else []
-
-        # Create a set of existing restaurant names
-        existing_names = {item['name'] for item in existing_data}
-
-        # Append new ingredients
-        for item in new_ingredients:
-            if item['name'] not in existing_names:
-                existing_data.append(item)
-                existing_names.add(item['name'])
-
-        # Save merged data
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Ingredients saved to {filename}")
-    except Exception as e:
-        logger.error(f"Error saving ingredients to {filename}: {e}")
-
-
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape venue menus and extract ingredients.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of venues scraped concurrently, each worker with its own browser")
+    parser.add_argument('--no-browser', action='store_true',
+                        help="Fetch pages with requests only, without launching Chrome")
+    parser.add_argument('--domain-interval', type=float, default=5.0,
+                        help="Minimum seconds between requests to the same domain")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Re-scrape venues already in ingredients.json; unchanged menus are not re-processed")
+    parser.add_argument('--http-cache', default=DEFAULT_FETCH_STORE,
+                        help="File of ETags, content hashes and results of previously fetched pages")
+    parser.add_argument('--no-http-cache', action='store_true',
+                        help="Fetch and process every page, ignoring the HTTP cache")
+    args = parser.parse_args()
+
     venues = load_venues("../data/venues_with_menu_urls.json")
     if not venues:
         logger.error("No venues loaded. Exiting.")
         exit(1)
 
-    scraper = Scraper()
-    new_ingredients = scraper.scrape_venue_ingredients(venues)
-    save_ingredients_to_file(new_ingredients, "../data/ingredients.json")
-    print(f"New ingredients saved to ../data/ingredients.json")
+    throttle = DomainThrottle(args.domain_interval)
+    fetch_store = None if args.no_http_cache else FetchStore(args.http_cache)
+    journal = Journal(journal_path(INGREDIENTS_FILE))
+    db = open_store()
+    if db is not None and not args.refresh:
+        # Skip venues whose ingredients are already in the pipeline store
+        stored = db.venues_with_ingredients()
+        venues = [venue for venue in venues if venue['name'] not in stored]
+    try:
+        if args.workers > 1:
+            from src.scraping_pool import ScraperPool
+
+            pool = ScraperPool(workers=args.workers, use_browser=not args.no_browser,
+                               throttle=throttle, fetch_store=fetch_store)
+            new_ingredients = pool.scrape_venue_ingredients(
+                venues, existing_names=set() if args.refresh else None, journal=journal)
+            print(pool.progress.report())
+        else:
+            scraper = Scraper(use_browser=not args.no_browser, throttle=throttle,
+                              existing_ingredients={} if args.refresh else None,
+                              fetch_store=fetch_store)
+            try:
+                new_ingredients = scraper.scrape_venue_ingredients(venues, journal=journal)
+            finally:
+                scraper.close()
+    finally:
+        if fetch_store is not None:
+            fetch_store.save()
+            print(f"HTTP cache: {fetch_store.report()}")
+    scraped = journal.records()
+    journal.compact(INGREDIENTS_FILE, replace=args.refresh)
+    journal.close()
+    write_compact_ingredients(INGREDIENTS_FILE, COMPACT_INGREDIENTS_FILE)
+    if db is not None:
+        db.upsert_ingredients(scraped)
+        db.close()
+    print(f"New ingredients saved to {INGREDIENTS_FILE}")
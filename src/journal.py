@@ -0,0 +1,189 @@
+import os
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def journal_path(output_file: str) -> str:
+    """
+    Get the journal file that checkpoints a JSON output file.
+
+    Args:
+        output_file (str): Path of the JSON file the journal is compacted into.
+
+    Returns:
+        str: Path of the journal, next to the output file.
+    """
+    base, _ = os.path.splitext(str(output_file))
+    return f"{base}.journal.jsonl"
+
+
+class Journal:
+    """
+    Append-only JSON Lines checkpoint of processed records, keyed by one field.
+
+    Each record is written as a single line and flushed (and fsynced) before
+    append returns, so a checkpoint costs one small write however many records
+    came before it. The latest record of every key is kept in memory for O(1)
+    membership checks. On open, a torn last line left by a crash is dropped,
+    so a run can always resume from the journal, and complete lines that are
+    not records with the key field are skipped. compact() materializes the
+    records into the regular JSON list format and empties the journal. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path: str, key_field: str = 'name', fsync: bool = True):
+        self.path = str(path)
+        self.key_field = key_field
+        self.fsync = fsync
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        good_offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_offset += len(line)
+                if not isinstance(record, dict) or self.key_field not in record:
+                    logger.warning(f"Skipping journal line without a {self.key_field!r} field in {self.path}")
+                    continue
+                self._records[record[self.key_field]] = record
+            torn = f.seek(0, os.SEEK_END) > good_offset
+        if torn:
+            # Everything after the last complete record was cut short by a crash
+            logger.warning(f"Dropping incomplete tail of journal {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_offset)
+        if self._records:
+            logger.info(f"Resuming from {len(self._records)} records in {self.path}")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest record of a key.
+
+        Args:
+            key (str): The record key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the key was never written.
+        """
+        return self._records.get(key)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """
+        Get the latest record of every key, in order of first write.
+
+        Returns:
+            List[Dict[str, Any]]: The records.
+        """
+        with self._lock:
+            return list(self._records.values())
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Durably write a record, replacing any earlier record with the same key.
+
+        Args:
+            record (Dict[str, Any]): JSON-serializable record containing key_field.
+
+        Raises:
+            ValueError: If the record has no key_field.
+        """
+        if self.key_field not in record:
+            raise ValueError(f"Journal record has no {self.key_field!r} field")
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._records[record[self.key_field]] = record
+
+    def compact(self, output_file: str, replace: bool = True) -> List[Dict[str, Any]]:
+        """
+        Merge the journal into a JSON list file and empty the journal.
+
+        Records of keys already in the output file replace them in place when
+        replace is set and are ignored otherwise; new keys are appended. The
+        output file is replaced atomically. An output file that is not a JSON
+        list, e.g. one cut short by a crash, is moved aside to <file>.corrupt
+        first instead of being overwritten.
+
+        Args:
+            output_file (str): JSON file holding a list of records.
+            replace (bool): Whether journal records overwrite existing ones.
+
+        Returns:
+            List[Dict[str, Any]]: The records written to the output file.
+        """
+        existing: List[Dict[str, Any]] = []
+        if os.path.exists(output_file):
+            try:
+                with open(output_file, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+                if not isinstance(existing, list):
+                    raise ValueError(f"expected a JSON list, got {type(existing).__name__}")
+            except ValueError as e:
+                corrupt_path = f"{output_file}.corrupt"
+                os.replace(output_file, corrupt_path)
+                logger.error(f"Moved unreadable {output_file} to {corrupt_path}: {e}")
+                existing = []
+
+        with self._lock:
+            positions = {item[self.key_field]: i for i, item in enumerate(existing)
+                         if isinstance(item, dict) and self.key_field in item}
+            merged = list(existing)
+            for key, record in self._records.items():
+                if key not in positions:
+                    positions[key] = len(merged)
+                    merged.append(record)
+                elif replace:
+                    merged[positions[key]] = record
+
+            tmp_path = f"{output_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, output_file)
+
+            # The output file now holds everything; start an empty journal
+            self._file.close()
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._records.clear()
+        logger.info(f"Compacted journal into {output_file} ({len(merged)} records)")
+        return merged
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_CACHE_DIR = os.getenv(
+    'LLM_CACHE_DIR', os.path.join(PROJECT_ROOT, '.llm_cache'))
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+
+def cache_disabled_by_env() -> bool:
+    """
+    Check whether the response cache has been switched off via the environment.
+
+    Returns:
+        bool: True if LLM_CACHE_DISABLED is set to a truthy value.
+    """
+    return os.getenv('LLM_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes')
+
+
+class ResponseCache:
+    """
+    On-disk, content-addressed cache of chat completion responses.
+
+    Entries are keyed by a SHA-256 hash of the model name and the full message
+    list, stored one JSON file per entry, and evicted least-recently-used first
+    once the cache grows past max_entries or max_bytes. Entries older than
+    max_age_seconds are treated as misses and removed.
+    """
+
+    def __init__(self,
+                 cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_seconds: Optional[float] = DEFAULT_MAX_AGE_SECONDS,
+                 enabled: Optional[bool] = None):
+        self.cache_dir = str(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.enabled = (not cache_disabled_by_env()) if enabled is None else enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last access time); built lazily from disk
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model (str): The model name.
+            messages (List[Dict[str, str]]): The chat messages.
+
+        Returns:
+            str: Hex digest identifying the request.
+        """
+        payload = json.dumps({"model": model, "messages": messages},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        if self._index is not None:
+            return self._index
+
+        self._index = {}
+        self._total_bytes = 0
+        if os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith('.json'):
+                        continue
+                    stat = os.stat(os.path.join(root, name))
+                    self._index[name[:-5]] = (stat.st_size, stat.st_mtime)
+                    self._total_bytes += stat.st_size
+        return self._index
+
+    def _remove(self, key: str) -> None:
+        index = self._load_index()
+        size, _ = index.pop(key, (0, 0.0))
+        self._total_bytes -= size
+        try:
+            os.remove(self._path_for(key))
+        except FileNotFoundError:
+            pass
+
+    def get(self, model: str, messages: List[Dict[str, str]]) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            model (str): The model name.
+            messages (List[Dict[str, str]]): The chat messages.
+
+        Returns:
+            Optional[str]: The cached response, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(model, messages)
+        path = self._path_for(key)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.misses += 1
+                return None
+
+            if (self.max_age_seconds is not None
+                    and time.time() - entry.get('created', 0) > self.max_age_seconds):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # Touch the entry so eviction is least-recently-used
+            now = time.time()
+            os.utime(path, (now, now))
+            index = self._load_index()
+            if key in index:
+                index[key] = (index[key][0], now)
+
+            self.hits += 1
+            return entry.get('response')
+
+    def set(self, model: str, messages: List[Dict[str, str]], response: str) -> None:
+        """
+        Store a response in the cache and evict old entries if needed.
+
+        Args:
+            model (str): The model name.
+            messages (List[Dict[str, str]]): The chat messages.
+            response (str): The response content to cache.
+        """
+        if not self.enabled:
+            return
+
+        key = self.make_key(model, messages)
+        path = self._path_for(key)
+        entry = {"model": model, "created": time.time(), "response": response}
+        data = json.dumps(entry, ensure_ascii=False)
+
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.error(f"Failed to write cache entry {key}: {e}")
+                return
+
+            index = self._load_index()
+            size = os.path.getsize(path)
+            old_size, _ = index.get(key, (0, 0.0))
+            index[key] = (size, time.time())
+            self._total_bytes += size - old_size
+            self._evict()
+
+    def _evict(self) -> None:
+        index = self._load_index()
+        if len(index) <= self.max_entries and self._total_bytes <= self.max_bytes:
+            return
+
+        for key, _ in sorted(index.items(), key=lambda item: item[1][1]):
+            if len(index) <= self.max_entries and self._total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, evictions, entry count and size in bytes.
+        """
+        with self._lock:
+            index = self._load_index()
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(index),
+                "bytes": self._total_bytes,
+            }
+
+
+# Shared cache used by parse_with_chatgpt
+default_cache = ResponseCache()
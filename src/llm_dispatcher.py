@@ -0,0 +1,342 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import queue
+import threading
+from typing import Dict, List, Any, Optional, Callable, Coroutine
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, APIStatusError
+from src.utils import DEFAULT_MODEL, count_message_tokens
+from src.llm_cache import default_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200000
+DEFAULT_COMPLETION_TOKENS = 512
+DEFAULT_MAX_RETRIES = 5
+
+
+def create_async_client() -> AsyncOpenAI:
+    """
+    Create an asynchronous OpenAI client.
+
+    A client is bound to the event loop it is first used on, so each dispatch
+    run creates its own.
+
+    Returns:
+        AsyncOpenAI: A new client.
+    """
+    return AsyncOpenAI(api_key=os.getenv('openai_api_key'))
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter enforcing requests-per-minute and tokens-per-minute budgets.
+
+    Both buckets start full and refill continuously. A rate-limit response from
+    the API pauses every waiter until the suggested cool-down has passed.
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+                 clock=time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._request_allowance = min(
+            self.requests_per_minute,
+            self._request_allowance + elapsed * self.requests_per_minute / 60)
+        self._token_allowance = min(
+            self.tokens_per_minute,
+            self._token_allowance + elapsed * self.tokens_per_minute / 60)
+
+    def _wait_time(self, tokens: int) -> float:
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        request_wait = (1 - self._request_allowance) * 60 / self.requests_per_minute
+        token_wait = (tokens - self._token_allowance) * 60 / self.tokens_per_minute
+        return max(0.0, request_wait, token_wait)
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until one request of the given token cost fits in both budgets.
+
+        Args:
+            tokens (int): Estimated total tokens (prompt plus completion) of the request.
+        """
+        # A request larger than the whole budget would otherwise wait forever
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    self._request_allowance -= 1
+                    self._token_allowance -= tokens
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back all further requests for a number of seconds.
+
+        Args:
+            seconds (float): Length of the cool-down.
+        """
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+def _retry_after(error: APIStatusError) -> Optional[float]:
+    """Read the Retry-After header of a rate-limit response, if present."""
+    try:
+        value = error.response.headers.get('retry-after')
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def _complete(client: AsyncOpenAI, limiter: RateLimiter, semaphore: asyncio.Semaphore,
+                    message: List[Dict[str, str]], model: str, completion_tokens: int,
+                    max_retries: int) -> Any:
+    tokens = count_message_tokens(message, model) + completion_tokens
+
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            await limiter.acquire(tokens)
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=message
+                )
+                if not response.choices or not response.choices[0].message.content:
+                    logger.error("Empty response from API")
+                    return []
+                return response.choices[0].message.content
+            except RateLimitError as e:
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = _backoff_delay(attempt)
+                limiter.pause(delay)
+                error = e
+            except APIConnectionError as e:
+                delay = _backoff_delay(attempt)
+                error = e
+            except APIStatusError as e:
+                if e.status_code < 500:
+                    logger.error(f"Error in dispatched request: {str(e)}")
+                    return []
+                delay = _backoff_delay(attempt)
+                error = e
+            except Exception as e:
+                logger.error(f"Error in dispatched request: {str(e)}")
+                return []
+
+        if attempt < max_retries:
+            logger.warning(
+                f"Request failed ({error}). Retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
+
+    logger.error(f"Request failed after {max_retries} retries: {error}")
+    return []
+
+
+async def dispatch_chat_requests(messages: List[List[Dict[str, str]]],
+                                 model: str = DEFAULT_MODEL,
+                                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                                 requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+                                 completion_tokens: int = DEFAULT_COMPLETION_TOKENS,
+                                 max_retries: int = DEFAULT_MAX_RETRIES,
+                                 use_cache: bool = True,
+                                 client: Optional[AsyncOpenAI] = None) -> List[Any]:
+    """
+    Send many chat requests concurrently within rate limits.
+
+    Args:
+        messages (List[List[Dict[str, str]]]): One message list per request.
+        model (str): The model to use for every request.
+        max_in_flight (int): Maximum number of requests awaiting a response at once.
+        requests_per_minute (float): Request budget per minute.
+        tokens_per_minute (float): Token budget per minute.
+        completion_tokens (int): Completion tokens reserved per request in the token budget.
+        max_retries (int): Retries per request on rate limits, connection and server errors.
+        use_cache (bool): Whether to read from and write to the response cache.
+        client (Optional[AsyncOpenAI]): Client to use instead of a new default one.
+
+    Returns:
+        List[Any]: The response content of each request, in the same order as the
+        input; an empty list marks a request that failed.
+    """
+    own_client = client is None
+    client = client or create_async_client()
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(max_in_flight)
+    results: List[Any] = [None] * len(messages)
+
+    pending = []
+    for i, message in enumerate(messages):
+        cached = default_cache.get(model, message) if use_cache else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append(i)
+
+    try:
+        responses = await asyncio.gather(*(
+            _complete(client, limiter, semaphore, messages[i], model, completion_tokens, max_retries)
+            for i in pending
+        ))
+    finally:
+        if own_client:
+            await client.close()
+
+    for i, content in zip(pending, responses):
+        results[i] = content
+        if use_cache and content:
+            default_cache.set(model, messages[i], content)
+
+    logger.info(
+        f"Dispatched {len(pending)} requests ({len(messages) - len(pending)} served from cache)")
+    return results
+
+
+async def dispatch_chat_queue(requests: "queue.Queue",
+                              model: str = DEFAULT_MODEL,
+                              max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                              requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                              tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+                              completion_tokens: int = DEFAULT_COMPLETION_TOKENS,
+                              max_retries: int = DEFAULT_MAX_RETRIES,
+                              use_cache: bool = True,
+                              client: Optional[AsyncOpenAI] = None) -> Dict[Any, Any]:
+    """
+    Send chat requests as they arrive on a queue fed by other threads.
+
+    Each item is a (key, message) pair and None marks the end of the stream.
+    A request is sent as soon as it is read, so the first response can arrive
+    before the producer has finished. The queue is only read while fewer than
+    max_in_flight requests are outstanding, so a bounded queue applies
+    backpressure to its producer.
+
+    Args:
+        requests (queue.Queue): Queue of (key, message) pairs terminated by None.
+        model (str): The model to use for every request.
+        max_in_flight (int): Maximum number of requests awaiting a response at once.
+        requests_per_minute (float): Request budget per minute.
+        tokens_per_minute (float): Token budget per minute.
+        completion_tokens (int): Completion tokens reserved per request in the token budget.
+        max_retries (int): Retries per request on rate limits, connection and server errors.
+        use_cache (bool): Whether to read from and write to the response cache.
+        client (Optional[AsyncOpenAI]): Client to use instead of a new default one.
+
+    Returns:
+        Dict[Any, Any]: Response content per key; an empty list marks a request that failed.
+    """
+    own_client = client is None
+    client = client or create_async_client()
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(max_in_flight)
+    slots = asyncio.Semaphore(max_in_flight)
+    loop = asyncio.get_running_loop()
+    results: Dict[Any, Any] = {}
+    tasks = []
+
+    async def run(key, message):
+        try:
+            content = await _complete(client, limiter, semaphore, message, model,
+                                      completion_tokens, max_retries)
+            results[key] = content
+            if use_cache and content:
+                default_cache.set(model, message, content)
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            item = await loop.run_in_executor(None, requests.get)
+            if item is None:
+                slots.release()
+                break
+            key, message = item
+            cached = default_cache.get(model, message) if use_cache else None
+            if cached is not None:
+                results[key] = cached
+                slots.release()
+                continue
+            tasks.append(asyncio.create_task(run(key, message)))
+        await asyncio.gather(*tasks)
+    finally:
+        if own_client:
+            await client.close()
+
+    logger.info(f"Dispatched {len(tasks)} queued requests ({len(results) - len(tasks)} served from cache)")
+    return results
+
+
+def run_sync(make_coroutine: Callable[[], Coroutine]) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Args:
+        make_coroutine (Callable[[], Coroutine]): Function creating the coroutine to run.
+
+    Returns:
+        Any: The coroutine's result.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(make_coroutine())
+
+    # Already inside an event loop (e.g. Streamlit, notebooks): run in a worker thread
+    result: Dict[str, Any] = {}
+
+    def runner():
+        try:
+            result['value'] = asyncio.run(make_coroutine())
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+
+def parse_many_with_chatgpt(messages: List[List[Dict[str, str]]], **kwargs) -> List[Any]:
+    """
+    Synchronous wrapper around dispatch_chat_requests.
+
+    Args:
+        messages (List[List[Dict[str, str]]]): One message list per request.
+        **kwargs: Options passed through to dispatch_chat_requests.
+
+    Returns:
+        List[Any]: The response content of each request, in input order.
+    """
+    return run_sync(lambda: dispatch_chat_requests(messages, **kwargs))
@@ -0,0 +1,353 @@
+import re
+import math
+import logging
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple, Optional, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Words that carry no meaning when matching ingredients to products
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'of', 'with', 'in', 'on', 'for', 'to', 'or', 'by',
+    'style', 'pack', 'packs', 'pk', 'box', 'case', 'cases', 'x', 'mix', 'range',
+    'fresh', 'frozen', 'house', 'homemade', 'original', 'premium', 'selection',
+}
+
+# Quantities and units such as 500g, 10.5cm, 6oz, 1/4, 32s
+UNIT_PATTERN = re.compile(
+    r'^\d+([./]\d+)*(g|kg|mg|ml|l|ltr|cl|oz|lb|lbs|cm|mm|m|s|pk|pc|pcs|x)?$')
+
+# Singulars ending in -ie, whose plurals would otherwise stem to -y like "berries"
+IE_SINGULARS = {'cookie', 'brownie', 'pie', 'smoothie', 'veggie', 'hoagie', 'calorie', 'birdie'}
+
+# Bidirectional culinary synonyms, including common AU/UK/US naming differences
+SYNONYMS: Dict[str, List[str]] = {
+    'prawn': ['shrimp'],
+    'coriander': ['cilantro'],
+    'capsicum': ['bell pepper', 'sweet pepper'],
+    'eggplant': ['aubergine'],
+    'zucchini': ['courgette'],
+    'rocket': ['arugula'],
+    'chip': ['fry'],
+    'beef mince': ['ground beef'],
+    'pork mince': ['ground pork'],
+    'lamb mince': ['ground lamb'],
+    'chicken mince': ['ground chicken'],
+    'scallion': ['spring onion'],
+    'haloumi': ['halloumi'],
+    'yoghurt': ['yogurt'],
+    'chilli': ['chili', 'chile'],
+    'beetroot': ['beet'],
+    'icing sugar': ['powdered sugar'],
+    'cornflour': ['cornstarch'],
+    'biscuit': ['cookie'],
+    'bun': ['roll'],
+    'mayonnaise': ['mayo'],
+    'barbecue': ['bbq'],
+    'sausage': ['banger'],
+    'whitener': ['creamer'],
+    'soda': ['soft drink'],
+    'bacon': ['rasher'],
+}
+
+# One-way matches from a specific ingredient to the broader product it is a kind of:
+# wagyu may be served by a beef product, but beef is not wagyu
+HYPONYMS: Dict[str, List[str]] = {
+    'wagyu': ['beef'],
+}
+
+# A query phrase as stemmed tokens
+Phrase = Tuple[str, ...]
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for matching: strip accents, case fold and drop punctuation.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: Lowercase text containing only letters, digits, '.', '/' and single spaces.
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = text.casefold().replace('&', ' and ')
+    text = re.sub(r"[^a-z0-9./]+", ' ', text)
+    return ' '.join(text.split())
+
+
+def stem(word: str) -> str:
+    """
+    Reduce an English word to a crude singular stem.
+
+    Args:
+        word (str): A normalized word.
+
+    Returns:
+        str: The stemmed word.
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies'):
+        return word[:-1] if word[:-1] in IE_SINGULARS else word[:-3] + 'y'
+    if word.endswith(('oes', 'ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into stemmed content words, dropping stopwords, quantities and units.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[str]: The tokens in order of appearance.
+    """
+    tokens = []
+    for word in normalize_text(text).split():
+        word = word.strip('./')
+        if not word or word in STOPWORDS or UNIT_PATTERN.match(word):
+            continue
+        tokens.append(stem(word))
+    return tokens
+
+
+def char_ngrams(tokens: Iterable[str], n: int = 3) -> List[str]:
+    """
+    Build boundary-marked character n-grams for each token.
+
+    Args:
+        tokens (Iterable[str]): Tokens produced by tokenize.
+        n (int): The n-gram length.
+
+    Returns:
+        List[str]: The character n-grams of all tokens.
+    """
+    grams = []
+    for token in tokens:
+        padded = f"#{token}#"
+        grams.extend(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
+
+
+def build_synonym_map(synonyms: Dict[str, List[str]],
+                      hyponyms: Optional[Dict[str, List[str]]] = None) -> Dict[Phrase, List[Phrase]]:
+    """
+    Turn synonym and hyponym tables into a phrase-level lookup.
+
+    Terms are matched and substituted as whole phrases, so "scallion" may match
+    "spring onion" without making "spring" and "onion" synonyms of anything.
+    Synonyms apply both ways; hyponyms only from the specific term to the
+    broader one.
+
+    Args:
+        synonyms (Dict[str, List[str]]): Term to list of synonymous terms.
+        hyponyms (Optional[Dict[str, List[str]]]): Term to list of broader terms.
+
+    Returns:
+        Dict[Phrase, List[Phrase]]: Stemmed phrase to the stemmed phrases it may also match.
+    """
+    groups = defaultdict(set)
+
+    def link(term: str, alternative: str) -> None:
+        left, right = tuple(tokenize(term)), tuple(tokenize(alternative))
+        if left and right and left != right:
+            groups[left].add(right)
+
+    for term, alternatives in synonyms.items():
+        for alternative in alternatives:
+            link(term, alternative)
+            link(alternative, term)
+    for term, broader in (hyponyms or {}).items():
+        for alternative in broader:
+            link(term, alternative)
+    return {phrase: sorted(others) for phrase, others in groups.items()}
+
+
+def expand_tokens(tokens: List[str], synonyms: Dict[Phrase, List[Phrase]]) -> List[List[Phrase]]:
+    """
+    Group query tokens into phrases, each with the phrases it may be matched through.
+
+    The longest phrase of the synonym map starting at each position is taken;
+    tokens outside any phrase form a group of their own.
+
+    Args:
+        tokens (List[str]): Tokens produced by tokenize.
+        synonyms (Dict[Phrase, List[Phrase]]): Lookup built by build_synonym_map.
+
+    Returns:
+        List[List[Phrase]]: One group per query phrase, its own wording first.
+    """
+    longest = max((len(phrase) for phrase in synonyms), default=1)
+    groups = []
+    i = 0
+    while i < len(tokens):
+        for n in range(min(longest, len(tokens) - i), 0, -1):
+            phrase = tuple(tokens[i:i + n])
+            if n == 1 or phrase in synonyms:
+                break
+        groups.append([phrase] + synonyms.get(phrase, []))
+        i += n
+    return groups
+
+
+class _BM25Field:
+    """BM25 statistics over one representation (words or n-grams) of the documents."""
+
+    def __init__(self, documents: List[List[str]], k1: float, b: float):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        for doc_id, doc in enumerate(documents):
+            for term, tf in Counter(doc).items():
+                self.postings[term][doc_id] = tf
+        # Length normalization term k1 * (1 - b + b * |d| / avgdl) of each document
+        self.norms = [k1 * (1 - b + b * length / self.avg_length) if self.avg_length else k1
+                      for length in self.lengths]
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def score(self, query: List[List[Phrase]]) -> Tuple[Dict[int, float], float]:
+        """
+        Score documents against a query.
+
+        Args:
+            query (List[List[Phrase]]): One group of interchangeable phrases per query
+                phrase; a document scores the best of the alternatives in each group.
+                The first phrase is the query's own wording and counts the words a
+                document contains; the others only count when it contains them all.
+
+        Returns:
+            Tuple[Dict[int, float], float]: Raw scores per document and the score a
+            document of average length containing every query term once would get,
+            used to normalize scores into [0, 1].
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        unseen_idf = math.log(1 + (len(self.lengths) + 0.5) / 0.5)
+        ceiling = 0.0
+        for group in query:
+            # Unknown terms still count towards what a perfect match would cover
+            known = [sum(self.idf[term] for term in phrase) for phrase in group
+                     if all(term in self.idf for term in phrase)]
+            ceiling += max(known) if known else sum(self.idf.get(term, unseen_idf) for term in group[0])
+            best: Dict[int, float] = {}
+            for position, phrase in enumerate(group):
+                if position and not all(term in self.idf for term in phrase):
+                    continue
+                values: Dict[int, float] = defaultdict(float)
+                matched: Counter = Counter()
+                for term in phrase:
+                    idf = self.idf.get(term)
+                    if idf is None:
+                        continue
+                    weight = idf * (self.k1 + 1)
+                    for doc_id, tf in self.postings[term].items():
+                        values[doc_id] += weight * tf / (tf + self.norms[doc_id])
+                        matched[doc_id] += 1
+                for doc_id, value in values.items():
+                    if position and matched[doc_id] < len(phrase):
+                        continue
+                    if value > best.get(doc_id, 0.0):
+                        best[doc_id] = value
+            for doc_id, value in best.items():
+                scores[doc_id] += value
+        return scores, ceiling
+
+
+class CatalogueIndex:
+    """
+    Inverted index over catalogue product names scored with BM25.
+
+    Each product is indexed by its stemmed words and by character trigrams of
+    those words, so exact, synonymous and slightly misspelled ingredient names
+    all retrieve the right products. Scores are normalized to [0, 1]: a score
+    of 1 means every query word was found in the product and the query also
+    accounts for everything the product name says, so "lemon" scores higher
+    against "Lemons" than against "Fanta Lemon Cans".
+    """
+
+    def __init__(self, products: List[str],
+                 synonyms: Optional[Dict[str, List[str]]] = None,
+                 hyponyms: Optional[Dict[str, List[str]]] = None,
+                 k1: float = 1.2, b: float = 0.5,
+                 ngram_weight: float = 0.3, coverage_weight: float = 0.5):
+        # Catalogues can list the same product twice; keep the first occurrence
+        self.products = list(dict.fromkeys(p.strip() for p in products if p and p.strip()))
+        self.synonyms = build_synonym_map(SYNONYMS if synonyms is None else synonyms,
+                                          HYPONYMS if hyponyms is None else hyponyms)
+        self.ngram_weight = ngram_weight
+        self.product_tokens = [tokenize(p) for p in self.products]
+        self.words = _BM25Field(self.product_tokens, k1, b)
+        self.product_ngrams = [set(char_ngrams(t)) for t in self.product_tokens]
+        self.ngrams = _BM25Field([char_ngrams(t) for t in self.product_tokens], k1, b)
+        self.coverage_weight = coverage_weight
+        self._word_totals = [sum(self.words.idf[t] for t in set(tokens))
+                             for tokens in self.product_tokens]
+        self._gram_totals = [sum(self.ngrams.idf[g] for g in grams)
+                             for grams in self.product_ngrams]
+
+    def _expand(self, tokens: List[str]) -> List[List[Phrase]]:
+        """Pair each query phrase with the synonyms it may be matched through."""
+        return expand_tokens(tokens, self.synonyms)
+
+    def _product_coverage(self, doc_id: int, words: set, grams: set) -> float:
+        """Share of a product's idf mass, by words or by n-grams, that the query accounts for."""
+        word_total = self._word_totals[doc_id]
+        word_covered = sum(self.words.idf[t] for t in words.intersection(self.product_tokens[doc_id]))
+        gram_total = self._gram_totals[doc_id]
+        gram_covered = sum(self.ngrams.idf[g] for g in self.product_ngrams[doc_id] & grams)
+        return max(word_covered / word_total if word_total else 0.0,
+                   gram_covered / gram_total if gram_total else 0.0)
+
+    def search(self, query: str, top_k: int = 5, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Find the products that best match a query.
+
+        Args:
+            query (str): An ingredient or free-text description.
+            top_k (int): Maximum number of products to return.
+            min_score (float): Minimum normalized score of returned products.
+
+        Returns:
+            List[Tuple[str, float]]: (product name, score) pairs, best first.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self.products:
+            return []
+
+        groups = self._expand(tokens)
+        grams = char_ngrams(tokens)
+        word_scores, word_ceiling = self.words.score(groups)
+        ngram_scores, ngram_ceiling = self.ngrams.score([[(g,)] for g in grams])
+        query_words = {term for group in groups for phrase in group for term in phrase}
+        query_grams = set(grams)
+
+        results = []
+        for doc_id in set(word_scores) | set(ngram_scores):
+            word_part = word_scores.get(doc_id, 0.0) / word_ceiling if word_ceiling else 0.0
+            ngram_part = ngram_scores.get(doc_id, 0.0) / ngram_ceiling if ngram_ceiling else 0.0
+            relevance = min(1.0, (1 - self.ngram_weight) * word_part + self.ngram_weight * ngram_part)
+            if relevance < min_score or relevance == 0.0:
+                # Coverage can only lower the score
+                continue
+            coverage = self._product_coverage(doc_id, query_words, query_grams)
+            score = relevance * (1 - self.coverage_weight + self.coverage_weight * coverage)
+            if score >= min_score:
+                results.append((self.products[doc_id], round(score, 4)))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:top_k]
@@ -0,0 +1,205 @@
+import re
+import logging
+from typing import Dict, List, Tuple
+from bs4 import BeautifulSoup
+from bs4.element import PreformattedString, Tag
+from src.matching_index import stem, tokenize
+from src.utils import DEFAULT_MODEL, count_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Elements that never hold menu content
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form',
+                    'button', 'select', 'input']
+
+# Page chrome, stripped only at page level: a <header> inside a menu <section>
+# holds the section's heading
+PAGE_CHROME_TAGS = ['nav', 'header', 'footer', 'aside']
+PAGE_LEVEL_PARENTS = {'html', 'body', 'main'}
+
+# Class or id words of navigation, cookie banners, booking widgets and the like.
+# Only whole words delimited by '-', '_' or spaces match, so "a-la-carte" is not a cart
+BOILERPLATE_PATTERN = re.compile(
+    r'(?:^|[-_\s])(?:cookies?|consent|gdpr|newsletter|subscribe|signup|bookings?|'
+    r'reservations?|opentable|social|breadcrumbs?|modal|popup|navbar|topbar|footer|'
+    r'copyright|instagram|facebook|login|account|cart|checkout|gift|giftcards?)(?:$|[-_\s])',
+    re.IGNORECASE)
+
+# Elements whose text forms one block of content
+BLOCK_TAGS = ['p', 'li', 'dt', 'dd', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'div', 'section', 'article', 'tr']
+_BLOCK_TAG_SET = set(BLOCK_TAGS)
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dt', 'th'}
+
+# Words that mark text as menu content: ingredients, cooking methods and menu sections
+FOOD_TERMS = {stem(word) for word in """
+    menu breakfast brunch lunch dinner entree entrees starter starters main mains side sides
+    dessert desserts snack snacks share plates small large salad salads soup soups pizza pasta
+    burger burgers sandwich sandwiches wrap bowl bowls drink drinks wine wines beer beers
+    cocktail cocktails coffee tea juice smoothie spritz gin vodka rum whisky tequila soda
+    beef wagyu lamb pork chicken duck turkey veal venison bacon ham prosciutto chorizo salami
+    sausage mince steak rib ribs brisket fish salmon tuna barramundi snapper cod kingfish
+    prawn prawns shrimp calamari squid octopus oyster oysters mussel mussels scallop crab
+    lobster anchovy sardine egg eggs tofu tempeh halloumi haloumi cheese cheddar parmesan
+    mozzarella burrata feta ricotta goat brie butter cream milk yoghurt yogurt mascarpone
+    tomato potato potatoes chips fries onion garlic mushroom mushrooms spinach kale rocket
+    lettuce cabbage slaw carrot beetroot pumpkin zucchini eggplant capsicum corn pea peas
+    bean beans lentil chickpea avocado cucumber olive olives pickle pickles jalapeno chilli
+    lemon lime orange apple pear berry berries strawberry raspberry mango passionfruit banana
+    coconut pineapple fig date dates herb herbs basil coriander parsley mint rosemary thyme
+    sage dill chive chives ginger sesame peanut almond pistachio walnut hazelnut cashew
+    rice noodle noodles bread sourdough brioche bun buns roll toast focaccia flatbread
+    tortilla taco tacos dumpling dumplings bao gnocchi risotto linguine spaghetti penne
+    sauce aioli mayo mayonnaise dressing salsa pesto gravy jus vinaigrette relish chutney
+    honey maple syrup caramel chocolate vanilla custard jam sugar salt pepper spice spiced
+    curry miso soy teriyaki hoisin tahini hummus harissa sriracha balsamic truffle
+    grilled roasted fried baked smoked braised poached seared charred crispy pickled
+    slow cooked confit glazed marinated stuffed whipped toasted sauteed
+    vegan vegetarian gluten dairy free gf vg
+""".split()}
+
+PRICE_PATTERN = re.compile(r'[$£€]\s?\d+(?:[.,]\d{1,2})?|\b\d{1,3}[.,]\d{2}\b')
+
+# Blocks at or above this share of food terms are menu content
+DEFAULT_MIN_DENSITY = 0.2
+# Below this many characters the extracted menu is not trusted
+MIN_MENU_CHARS = 200
+
+
+def compact_text(text: str) -> str:
+    """
+    Collapse whitespace and drop blank and repeated lines.
+
+    Args:
+        text (str): Text extracted from a page or PDF.
+
+    Returns:
+        str: The text with each distinct line once, in order of first appearance.
+    """
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        key = line.casefold()
+        if not line or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def food_density(text: str) -> float:
+    """
+    Score how much a piece of text reads like a menu.
+
+    Args:
+        text (str): A block of text.
+
+    Returns:
+        float: Share of the content words that are food terms, plus 0.5 if
+        the text carries a price.
+    """
+    tokens = tokenize(text)
+    density = sum(token in FOOD_TERMS for token in tokens) / len(tokens) if tokens else 0.0
+    if PRICE_PATTERN.search(text):
+        density += 0.5
+    return density
+
+
+def _is_boilerplate(element: Tag) -> bool:
+    attributes = ' '.join([element.get('id') or ''] + list(element.get('class') or []))
+    return bool(attributes) and bool(BOILERPLATE_PATTERN.search(attributes))
+
+
+def _text_blocks(soup: BeautifulSoup) -> List[Tuple[Tag, str]]:
+    """
+    Block elements with their own text, in document order.
+
+    A block's own text is the text it holds outside its child blocks, so in
+    <div><span>Dish</span><span>$18</span><p>Description</p></div> the name
+    and price form the div's block and the description the p's.
+    """
+    elements = soup.find_all(BLOCK_TAGS)
+    own_text: Dict[int, List[str]] = {id(element): [] for element in elements}
+    for string in soup.find_all(string=True):
+        # Comments, doctypes and CDATA are not page text
+        if isinstance(string, PreformattedString) or not string.strip():
+            continue
+        block = string.parent
+        while block is not None and block.name not in _BLOCK_TAG_SET:
+            block = block.parent
+        if block is not None:
+            own_text[id(block)].append(string.strip())
+    return [(element, ' '.join(own_text[id(element)])) for element in elements
+            if own_text[id(element)]]
+
+
+def extract_menu_text(html: str, min_density: float = DEFAULT_MIN_DENSITY) -> str:
+    """
+    Extract the menu content of a page, without navigation and other boilerplate.
+
+    Boilerplate elements (forms, cookie banners, booking widgets, and the
+    page-level navigation, header and footer) are removed, then every remaining
+    block is scored on its own text, outside its child blocks, by its density
+    of food terms and prices. Dense blocks are kept, together with
+    headings directly followed by a dense block, such as section names. When
+    too little survives, for instance on a page of dish names the food terms do
+    not cover, the whole remaining text is used instead.
+
+    Args:
+        html (str): The page HTML.
+        min_density (float): Minimum food_density of a kept block.
+
+    Returns:
+        str: Compacted menu text, one block per line.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in soup(PAGE_CHROME_TAGS):
+        if tag.parent is not None and tag.parent.name in PAGE_LEVEL_PARENTS:
+            tag.decompose()
+    for element in soup.find_all(_is_boilerplate):
+        # Never strip the document itself
+        if element.name not in ('html', 'body'):
+            element.decompose()
+
+    blocks = [(element.name, text, food_density(text) >= min_density)
+              for element, text in _text_blocks(soup)]
+
+    kept = []
+    for i, (name, text, dense) in enumerate(blocks):
+        next_dense = i + 1 < len(blocks) and blocks[i + 1][2]
+        if dense or (name in HEADING_TAGS and next_dense):
+            kept.append(text)
+
+    menu_text = compact_text('\n'.join(kept))
+    if len(menu_text) < MIN_MENU_CHARS:
+        fallback = compact_text(soup.get_text(separator='\n', strip=True))
+        if len(fallback) > len(menu_text):
+            return fallback
+    return menu_text
+
+
+def compaction_report(original: str, compacted: str, model: str = DEFAULT_MODEL) -> Dict[str, float]:
+    """
+    Measure how many prompt tokens compaction saved.
+
+    Args:
+        original (str): The text that would have been sent before.
+        compacted (str): The text sent instead.
+        model (str): The model whose tokenizer is used.
+
+    Returns:
+        Dict[str, float]: Tokens before and after, and the percentage saved.
+    """
+    before = count_tokens(original, model)
+    after = count_tokens(compacted, model)
+    return {
+        'tokens_before': before,
+        'tokens_after': after,
+        'reduction_pct': round(100 * (before - after) / before, 1) if before else 0.0,
+    }
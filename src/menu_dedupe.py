@@ -0,0 +1,186 @@
+import re
+import zlib
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Mersenne prime modulus of the MinHash permutations; shingle hashes are taken
+# below it so a * x + b stays within 64 bits
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalize_menu_text(text: str) -> str:
+    """
+    Normalize menu text so copies that differ only in layout or prices compare equal.
+
+    Args:
+        text (str): Menu text from a page or PDF.
+
+    Returns:
+        str: Lowercase words separated by single spaces, without numbers or punctuation.
+    """
+    text = re.sub(r"[^a-z]+", ' ', text.casefold())
+    return ' '.join(text.split())
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """
+    Hash the overlapping word sequences of a normalized text.
+
+    Args:
+        text (str): Normalized menu text.
+        size (int): Number of words per shingle.
+
+    Returns:
+        np.ndarray: Unique shingle hashes, below MERSENNE_PRIME.
+    """
+    words = text.split()
+    if len(words) <= size:
+        grams = [' '.join(words)]
+    else:
+        grams = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    hashes = {zlib.crc32(g.encode('utf-8')) % MERSENNE_PRIME for g in grams}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+class MenuDeduplicator:
+    """
+    Reuse ingredient results across identical and near-identical menus.
+
+    Chains, group websites and shared PDF menus serve the same menu text,
+    often with different prices or branding. Each menu is keyed by a hash of
+    its normalized text for exact matches, and by a MinHash signature of its
+    word shingles, bucketed with locality-sensitive hashing, for near
+    duplicates: a menu whose estimated Jaccard similarity to a known menu is at
+    least threshold reuses that menu's result. Safe to share between threads.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._exact: Dict[str, Any] = {}
+        self._signatures: List[np.ndarray] = []
+        self._results: List[Any] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.stats = {'exact': 0, 'near': 0, 'unique': 0}
+
+    def signature(self, normalized: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a normalized text.
+
+        Args:
+            normalized (str): Text from normalize_menu_text.
+
+        Returns:
+            np.ndarray: num_perm minimum hash values.
+        """
+        hashes = shingles(normalized, self.shingle_size)
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+
+    def _find(self, key: str, signature: np.ndarray) -> Tuple[Optional[str], Any]:
+        """Find a stored result for a menu; must be called with the lock held."""
+        if key in self._exact:
+            return 'exact', self._exact[key]
+        best, best_similarity = None, self.threshold
+        for band_key in self._band_keys(signature):
+            for candidate in self._buckets.get(band_key, ()):
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+        if best is None:
+            return None, None
+        return 'near', self._results[best]
+
+    def lookup(self, text: str) -> Optional[Any]:
+        """
+        Find the result of an identical or near-identical menu seen before.
+
+        Args:
+            text (str): Menu text.
+
+        Returns:
+            Optional[Any]: The stored result, or None if no similar menu is known.
+        """
+        normalized = normalize_menu_text(text)
+        key = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        signature = self.signature(normalized)
+        with self._lock:
+            return self._find(key, signature)[1]
+
+    def add(self, text: str, result: Any) -> None:
+        """
+        Remember the result computed for a menu.
+
+        Args:
+            text (str): Menu text.
+            result (Any): The result to reuse for duplicates of this menu.
+        """
+        normalized = normalize_menu_text(text)
+        key = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        signature = self.signature(normalized)
+        with self._lock:
+            self._add(key, signature, result)
+
+    def _add(self, key: str, signature: np.ndarray, result: Any) -> None:
+        self._exact[key] = result
+        index = len(self._results)
+        self._signatures.append(signature)
+        self._results.append(result)
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].append(index)
+
+    def get_or_compute(self, text: str, compute: Callable[[str], Any]) -> Any:
+        """
+        Get the result for a menu, computing it only if no duplicate has been seen.
+
+        Empty results are returned but not remembered, since they usually mean
+        the computation failed.
+
+        Args:
+            text (str): Menu text.
+            compute (Callable[[str], Any]): Computes the result from the text,
+                e.g. Scraper.extract_ingredients.
+
+        Returns:
+            Any: The stored or computed result.
+        """
+        normalized = normalize_menu_text(text)
+        if not normalized:
+            return compute(text)
+        key = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        signature = self.signature(normalized)
+        with self._lock:
+            kind, result = self._find(key, signature)
+            if kind is not None:
+                self.stats[kind] += 1
+                logger.info(f"Reusing the result of a duplicate menu ({kind} match)")
+                return result
+
+        result = compute(text)
+        if result:
+            with self._lock:
+                self.stats['unique'] += 1
+                self._add(key, signature, result)
+        return result
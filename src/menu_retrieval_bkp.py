@@ -1,6 +1,5 @@
 # Import necessary libraries
 from tenacity import retry, stop_after_attempt, wait_exponential
-import time
 import json
 import os
 from typing import List, Dict, Optional, Union
@@ -18,6 +17,8 @@ import PyPDF2
 from bs4 import BeautifulSoup
 import requests
 from utils import parse_with_chatgpt
+from politeness import DomainThrottle
+from page_readiness import AdaptiveTimeout, RetryPolicy, wait_for_page_ready
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -41,6 +42,11 @@ class Scraper:
         service = Service('C:\\Windows\\chromedriver-win64\\chromedriver.exe')
         # Create Chrome webdriver instance
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Learn how long each site takes to render and back off between retries
+        self.readiness_timeout = AdaptiveTimeout()
+        self.retry_policy = RetryPolicy()
+        # Space out requests to the same site instead of sleeping after every venue
+        self.throttle = DomainThrottle(min_interval=5.0)
 
     def __del__(self):
         # Quit the webdriver if it exists
@@ -50,11 +56,7 @@ class Scraper:
     def handle_popup(self):
         # Try to find and close any popups on the page
         try:
-            WebDriverWait(self.driver, 5).until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR,
-                 "button[class*='close'], div[class*='popup'] button, div[id*='popup'] button")
-            ))
-
+            # The page has settled already, so a popup is either there or not coming
             close_button = self.driver.find_element(
                 By.CSS_SELECTOR, "button[class*='close'], div[class*='popup'] button, div[id*='popup'] button")
             close_button.click()
@@ -113,7 +115,7 @@ class Scraper:
 
     def scrape_menu(self, url: str) -> Dict:
         # Implement retry logic (max 3 attempts)
-        max_retries = 3
+        max_retries = self.retry_policy.max_attempts
         # For each attempt:
         for attempt in range(max_retries):
             try:
@@ -124,20 +126,24 @@ class Scraper:
                     text = self.extract_text_from_pdf(response.content)
                 else:
                     # Else, use Selenium to load page and extract HTML
+                    timeout = self.readiness_timeout.timeout_for(url)
                     self.driver.get(url)
-                    # Handle popups
-                    self.handle_popup()
 
                     # Wait for the menu element to be present
-                    WebDriverWait(self.driver, 20).until(
+                    WebDriverWait(self.driver, timeout).until(
                         EC.presence_of_element_located(
                             (By.CSS_SELECTOR, "body"))
                     )
+                    elapsed = wait_for_page_ready(self.driver, timeout=timeout)
+                    # Handle popups
+                    self.handle_popup()
 
                     # Scroll to load dynamic content
                     self.driver.execute_script(
                         "window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(5)  # Increased wait time for content to load
+                    # Wait until the DOM and network settle instead of a fixed delay
+                    elapsed += wait_for_page_ready(self.driver, timeout=timeout)
+                    self.readiness_timeout.record(url, elapsed)
 
                     # Extract text from HTML
                     html = self.driver.page_source
@@ -188,7 +194,7 @@ class Scraper:
                 if attempt < max_retries - 1:
                     logger.warning(
                         f"Attempt {attempt + 1} failed. Retrying...")
-                    time.sleep(5)
+                    self.retry_policy.backoff(attempt)
                 else:
                     logger.error(f"Error scraping {url}: {e}")
                     return {"error": f"Failed to scrape menu: {str(e)}"}
@@ -204,6 +210,7 @@ class Scraper:
             logger.info(f"Scraping menu for {name}...")
             # Try to scrape menu for venue
             try:
+                self.throttle.wait(url)
                 menu = self.scrape_menu(url)
                 # If successful, add to all_menus dict
                 all_menus[name] = menu
@@ -213,8 +220,6 @@ class Scraper:
                 logger.error(f"Failed to scrape menu for {name}: {e}")
                 # all_menus[name] = {"error": f"Failed to scrape menu: {str(e)}"}
 
-            # Wait 5 seconds before next venue
-            time.sleep(5)
         # Return all_menus dict
         return all_menus
 
@@ -263,6 +268,7 @@ if __name__ == "__main__":
         if name not in menus:
             logger.info(f"Scraping menu for {name}...")
             try:
+                scraper.throttle.wait(url)
                 menu = scraper.scrape_menu(url)
                 menus[name] = menu
 
@@ -270,7 +276,6 @@ if __name__ == "__main__":
             except Exception as e:
                 logger.error(f"Failed to scrape menu for {name}: {e}")
                 # menus[name] = {"error": f"Failed to scrape menu: {str(e)}"}
-            time.sleep(5)  # Add a delay between requests to avoid overloading
         else:
             logger.info(f"Menu for {name} already exists, skipping.")
 
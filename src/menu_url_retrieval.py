@@ -6,11 +6,24 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import os
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from src.async_fetch import fetch_pages
+from src.http_cache import NOT_MODIFIED, FetchStore, content_hash
+from src.journal import Journal, journal_path
+from src.store import open_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Menu links found per site, kept apart from the ingredient scraper's store
+# because a venue page can be both a site and its own menu page
+MENU_URL_STORE = "../data/menu_url_cache.json"
+
+# Common menu-related keywords, most specific first
+MENU_KEYWORDS = ['menu', 'food', 'drink', 'dining', 'eat', 'cuisine']
+
 def setup_selenium():
     # Set up Selenium WebDriver with headless Chrome
     chrome_options = Options()
@@ -24,11 +37,8 @@ def find_menu_link(url, driver):
         # Wait for the body tag to be present
         WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
 
-        # Define common menu-related keywords
-        menu_keywords = ['menu', 'food', 'drink', 'dining', 'eat', 'cuisine']
-        
         # Search for links containing these keywords
-        for keyword in menu_keywords:
+        for keyword in MENU_KEYWORDS:
             elements = driver.find_elements(By.XPATH, f"//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{keyword}')]")
             if elements:
                 # Return the first matching link
@@ -41,6 +51,17 @@ def find_menu_link(url, driver):
         logger.error(f"Error finding menu link for {url}: {e}")
         return url
 
+def find_menu_link_in_html(html, url):
+    # Same search as find_menu_link, on HTML fetched without a browser
+    soup = BeautifulSoup(html, 'html.parser')
+    links = [(a.get_text().lower(), a['href']) for a in soup.find_all('a', href=True)]
+    for keyword in MENU_KEYWORDS:
+        for text, href in links:
+            if keyword in text:
+                return urljoin(url, href)
+    # None means the page has to be checked in a browser
+    return None
+
 def load_processed_venues(file_path):
     # Load already processed venues from a JSON file
     if os.path.exists(file_path):
@@ -51,36 +72,28 @@ def load_processed_venues(file_path):
             logger.warning(f"Error reading {file_path}. File might be empty or contain invalid JSON. Starting with an empty list.")
     return []
 
-def save_processed_venue(venue, file_path):
-    # Load existing processed venues
-    processed_venues = load_processed_venues(file_path)
-    
-    # Check if the venue already exists in the list
-    existing_venue = next((v for v in processed_venues if v['name'] == venue['name']), None)
-    if existing_venue:
-        # Update the existing venue
-        existing_venue.update(venue)
-    else:
-        # Add the new venue
-        processed_venues.append(venue)
-    
-    # Save the updated list back to the file
-    with open(file_path, 'a') as f:
-        json.dump(processed_venues, f, indent=2)
-
-def update_venues_with_menu_urls(input_file, output_file):
+def update_venues_with_menu_urls(input_file, output_file, store=None, db=None):
     # Load existing venues
     with open(input_file, 'r') as f:
         venues = json.load(f)
 
-    # Set up Selenium WebDriver
-    driver = setup_selenium()
+    # Selenium is only started for pages that cannot be read without a browser
+    driver = None
 
-    # Load already processed venues
+    # Load already processed venues, including those checkpointed by an interrupted run
     processed_venues = load_processed_venues(output_file)
-    processed_names = {venue['name'] for venue in processed_venues}
+    journal = Journal(journal_path(output_file))
+    processed_names = {venue['name'] for venue in processed_venues} | {v['name'] for v in journal}
+    if db is not None:
+        # Venues whose menu URL is already in the pipeline store
+        processed_names |= {v['name'] for v in db.list_venues(with_menu_url=True)}
 
     try:
+        # Fetch all pending venue pages concurrently over pooled connections
+        pending_urls = [v['website'] for v in venues if v['name'] not in processed_names]
+        # With a store the requests are conditional and unchanged sites are not searched again
+        pages = fetch_pages(pending_urls, store=store)
+
         for venue in venues:
             # Skip if the venue has already been processed
             if venue['name'] in processed_names:
@@ -90,8 +103,26 @@ def update_venues_with_menu_urls(input_file, output_file):
             original_url = venue['website']
             logger.info(f"Processing {venue['name']} - {original_url}")
 
-            # Find the menu link
-            menu_url = find_menu_link(original_url, driver)
+            # Find the menu link, falling back to the browser for JavaScript-rendered pages
+            html = pages.get(original_url)
+            menu_url = None
+            digest = None
+            if html is NOT_MODIFIED:
+                menu_url = store.not_modified(original_url)
+            elif html:
+                digest = content_hash(html)
+                if store is not None:
+                    menu_url = store.unchanged(original_url, digest)
+                if menu_url is None:
+                    menu_url = find_menu_link_in_html(html, original_url)
+                    if menu_url is not None and store is not None:
+                        store.update(original_url, digest, len(html.encode('utf-8')), menu_url, llm_calls=0)
+            if menu_url is None:
+                if driver is None:
+                    driver = setup_selenium()
+                menu_url = find_menu_link(original_url, driver)
+                if digest is not None and store is not None:
+                    store.update(original_url, digest, len(html.encode('utf-8')), menu_url, llm_calls=0)
 
             # Update the venue's website if a menu link was found
             if menu_url != original_url:
@@ -100,17 +131,28 @@ def update_venues_with_menu_urls(input_file, output_file):
             else:
                 logger.info("No specific menu page found. Keeping original URL.")
 
-            # Save the processed venue
-            save_processed_venue(venue, output_file)
+            # Checkpoint the processed venue with a single appended line
+            journal.append(venue)
+            if db is not None:
+                db.set_menu_url(venue['name'], menu_url)
             logger.info(f"Saved processed venue: {venue['name']}")
 
     finally:
         # Ensure the WebDriver is closed even if an exception occurs
-        driver.quit()
+        if driver is not None:
+            driver.quit()
+        # Write the checkpointed venues into the output file in its usual format
+        journal.compact(output_file)
+        journal.close()
+        # Keep what was learned even if the run was interrupted
+        if store is not None:
+            store.save()
+            logger.info(f"HTTP cache: {store.report()}")
 
     logger.info(f"All venues processed. Results saved to {output_file}")
 
 if __name__ == "__main__":
     input_file = "../data/venues.json"
     output_file = "../data/venues_with_menu_urls.json"
-    update_venues_with_menu_urls(input_file, output_file)
\ No newline at end of file
+    update_venues_with_menu_urls(input_file, output_file, store=FetchStore(MENU_URL_STORE),
+                                 db=open_store())
\ No newline at end of file
@@ -0,0 +1,161 @@
+import time
+import random
+import logging
+import threading
+from typing import Dict, Optional
+from src.politeness import domain_of
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Snapshot of the signals that change while a page is still rendering:
+# the document state, the size of the DOM and the number of network requests made
+READINESS_SCRIPT = """
+return [
+    document.readyState,
+    document.getElementsByTagName('*').length,
+    document.body ? document.body.innerText.length : 0,
+    window.performance && performance.getEntriesByType
+        ? performance.getEntriesByType('resource').length : 0
+];
+"""
+
+
+def wait_for_page_ready(driver, timeout: float = 20.0, quiet_period: float = 0.75,
+                        poll_interval: float = 0.25, clock=time.monotonic,
+                        sleep=time.sleep) -> float:
+    """
+    Wait until a page has finished rendering, instead of sleeping a fixed time.
+
+    A page is ready once the document has loaded and neither the DOM nor the
+    number of network requests has changed for quiet_period seconds, i.e. the
+    DOM is stable and the network is idle. Lazy content triggered by scrolling
+    is covered because scrolling starts new requests, which resets the quiet
+    period.
+
+    Args:
+        driver: A Selenium WebDriver with a page loaded.
+        timeout (float): Maximum number of seconds to wait.
+        quiet_period (float): Seconds without changes that mark the page as ready.
+        poll_interval (float): Seconds between checks.
+
+    Returns:
+        float: Seconds waited. Equal to or above timeout when the page never settled,
+        in which case the page is used as it is.
+    """
+    start = clock()
+    last_snapshot = None
+    last_change = start
+    while True:
+        now = clock()
+        try:
+            snapshot = tuple(driver.execute_script(READINESS_SCRIPT))
+        except Exception as e:
+            logger.debug(f"Readiness check failed: {e}")
+            snapshot = None
+
+        if snapshot != last_snapshot:
+            last_snapshot = snapshot
+            last_change = now
+        elif snapshot is not None and snapshot[0] == 'complete' and now - last_change >= quiet_period:
+            return now - start
+
+        if now - start >= timeout:
+            logger.warning(f"Page not settled after {timeout:.1f}s, using it as is")
+            return now - start
+        sleep(poll_interval)
+
+
+class AdaptiveTimeout:
+    """
+    Per-domain page readiness timeout that follows observed render times.
+
+    Each domain starts at the initial timeout; once pages from it have been
+    rendered the timeout becomes a multiple of the moving average render time,
+    so slow sites get more time and fast sites fail fast. Safe to share between
+    threads.
+    """
+
+    def __init__(self, initial: float = 20.0, minimum: float = 3.0, maximum: float = 30.0,
+                 multiplier: float = 3.0, smoothing: float = 0.3):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.smoothing = smoothing
+        self._averages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def timeout_for(self, url: str) -> float:
+        """
+        Get the readiness timeout for a URL.
+
+        Args:
+            url (str): The page URL.
+
+        Returns:
+            float: Seconds to wait for the page.
+        """
+        with self._lock:
+            average = self._averages.get(domain_of(url))
+        if average is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, average * self.multiplier))
+
+    def record(self, url: str, seconds: float) -> None:
+        """
+        Record how long a page took to render.
+
+        Args:
+            url (str): The page URL.
+            seconds (float): Observed render time.
+        """
+        domain = domain_of(url)
+        with self._lock:
+            average = self._averages.get(domain)
+            self._averages[domain] = (seconds if average is None
+                                      else (1 - self.smoothing) * average + self.smoothing * seconds)
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter between attempts of a failing operation."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 multiplier: float = 2.0, jitter: float = 0.1, sleep=time.sleep,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """
+        Get the delay before retrying after a failed attempt.
+
+        Args:
+            attempt (int): Zero-based index of the attempt that failed.
+
+        Returns:
+            float: Seconds to wait before the next attempt.
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+        return delay * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Sleep before retrying after a failed attempt.
+
+        Args:
+            attempt (int): Zero-based index of the attempt that failed.
+
+        Returns:
+            float: Seconds slept.
+        """
+        delay = self.delay(attempt)
+        self._sleep(delay)
+        return delay
@@ -0,0 +1,187 @@
+import io
+import os
+import json
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Union
+import PyPDF2
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_PAGE_CACHE_DIR = os.getenv(
+    'PDF_CACHE_DIR', os.path.join(PROJECT_ROOT, '.pdf_cache'))
+
+# Below this many pages a process pool costs more than it saves
+MIN_PAGES_FOR_POOL = 16
+PAGES_PER_TASK = 8
+
+PdfSource = Union[str, bytes]
+
+
+def _read_source(source: PdfSource) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def pdf_hash(data: bytes) -> str:
+    """
+    Hash the raw bytes of a PDF file.
+
+    Args:
+        data (bytes): The PDF content.
+
+    Returns:
+        str: Hex SHA-256 digest of the content.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop); runs in worker processes."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+class PageTextCache:
+    """
+    On-disk cache of extracted page text, keyed by the hash of the PDF file.
+
+    Each PDF gets a directory holding one text file per page and a small
+    metadata file with the page count, written once all pages are extracted.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_PAGE_CACHE_DIR):
+        self.cache_dir = str(cache_dir)
+
+    def _dir_for(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest)
+
+    def get(self, digest: str) -> Optional[List[str]]:
+        """
+        Load every page of a cached PDF.
+
+        Args:
+            digest (str): Hash of the PDF content.
+
+        Returns:
+            Optional[List[str]]: Page texts, or None if the PDF is not fully cached.
+        """
+        directory = self._dir_for(digest)
+        try:
+            with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+                page_count = json.load(f)['pages']
+            pages = []
+            for i in range(page_count):
+                with open(os.path.join(directory, f"{i:05d}.txt"), 'r', encoding='utf-8') as f:
+                    pages.append(f.read())
+            return pages
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, digest: str, pages: List[str]) -> None:
+        """
+        Store the page texts of a PDF.
+
+        Args:
+            digest (str): Hash of the PDF content.
+            pages (List[str]): Text of every page, in order.
+        """
+        directory = self._dir_for(digest)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for i, text in enumerate(pages):
+                with open(os.path.join(directory, f"{i:05d}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(text)
+            # Written last so a partially stored PDF is never read back
+            with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'pages': len(pages)}, f)
+        except OSError as e:
+            logger.error(f"Failed to cache PDF pages for {digest}: {e}")
+
+
+default_page_cache = PageTextCache()
+
+
+def iter_pdf_pages(source: PdfSource, workers: Optional[int] = None,
+                   cache: Optional[PageTextCache] = default_page_cache) -> Iterator[str]:
+    """
+    Stream the text of each page of a PDF, in page order.
+
+    Large PDFs are split into page ranges extracted across a process pool;
+    pages are yielded as soon as their range (and every range before it) is
+    done. Extracted text is cached by file hash, so an unchanged PDF is never
+    parsed twice.
+
+    Args:
+        source (Union[str, bytes]): Path to the PDF file or its raw content.
+        workers (Optional[int]): Number of worker processes; defaults to the CPU count.
+            Use 1 to extract in the calling process.
+        cache (Optional[PageTextCache]): Page text cache, or None to disable caching.
+
+    Yields:
+        str: The text of each page.
+    """
+    data = _read_source(source)
+    digest = pdf_hash(data)
+
+    if cache is not None:
+        cached = cache.get(digest)
+        if cached is not None:
+            logger.info(f"Loaded {len(cached)} cached pages for PDF {digest[:12]}")
+            yield from cached
+            return
+
+    try:
+        page_count = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+    except Exception as e:
+        logger.error(f"Error reading PDF: {e}")
+        return
+
+    workers = workers or os.cpu_count() or 1
+    ranges = [(start, min(start + PAGES_PER_TASK, page_count))
+              for start in range(0, page_count, PAGES_PER_TASK)]
+    pages: List[str] = []
+
+    try:
+        if workers == 1 or page_count < MIN_PAGES_FOR_POOL:
+            for start, stop in ranges:
+                for text in _extract_page_range(data, start, stop):
+                    pages.append(text)
+                    yield text
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+                futures = [executor.submit(_extract_page_range, data, start, stop)
+                           for start, stop in ranges]
+                for future in futures:
+                    for text in future.result():
+                        pages.append(text)
+                        yield text
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {e}")
+        return
+
+    if cache is not None:
+        cache.set(digest, pages)
+
+
+def extract_pdf_text(source: PdfSource, workers: Optional[int] = None,
+                     cache: Optional[PageTextCache] = default_page_cache) -> str:
+    """
+    Extract the text of a whole PDF, one line break after each page.
+
+    Args:
+        source (Union[str, bytes]): Path to the PDF file or its raw content.
+        workers (Optional[int]): Number of worker processes; defaults to the CPU count.
+        cache (Optional[PageTextCache]): Page text cache, or None to disable caching.
+
+    Returns:
+        str: The text of all pages, or an empty string if the PDF cannot be read.
+    """
+    return ''.join(f"{text}\n" for text in iter_pdf_pages(source, workers, cache))
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from src.llm_dispatcher import parse_many_with_chatgpt
+from src.store import open_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PITCH_STORE_FILE = "../data/pitches.json"
+
+# Bump whenever build_pitch_message changes, so pitches written with the old
+# prompt are no longer served
+PROMPT_VERSION = 1
+
+
+def build_pitch_message(venue_name: str, product_matches: Sequence[str]) -> List[Dict[str, str]]:
+    """
+    Build the ChatGPT message asking for a sales pitch.
+
+    Args:
+        venue_name (str): Name of the venue.
+        product_matches (Sequence[str]): Products matched to the venue.
+
+    Returns:
+        List[Dict[str, str]]: The chat message.
+    """
+    prompt = f"Create a short sales pitch to a restaurant,bar or cafe such as {venue_name} to sell the following product :\n\n{json.dumps(list(product_matches), indent=2)}\n\nProvide a conversational suggestion in a professional manner, on which products to pitch and why they would be suitable for this venue."
+    return [
+        {"role": "system", "content": "You are a helpful sales assistant providing product sales pitch for food distributors."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def pitch_key(venue_name: str, product_matches: Sequence[str],
+              prompt_version: int = PROMPT_VERSION) -> str:
+    """
+    Key a pitch by everything that determines it.
+
+    Args:
+        venue_name (str): Name of the venue.
+        product_matches (Sequence[str]): Products matched to the venue; order does not matter.
+        prompt_version (int): Version of the pitch prompt.
+
+    Returns:
+        str: Hex SHA-256 digest of the venue, the sorted matches and the prompt version.
+    """
+    payload = json.dumps([venue_name, sorted(product_matches), prompt_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PitchStore:
+    """
+    Generated sales pitches, keyed by venue, matched products and prompt version.
+
+    A venue whose matches change, or a new prompt version, gets a new key, so
+    a stored pitch is never served for data it was not written for. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = PITCH_STORE_FILE):
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable pitch store {path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, venue_name: str, product_matches: Sequence[str]) -> Optional[str]:
+        """
+        Get the stored pitch of a venue.
+
+        Args:
+            venue_name (str): Name of the venue.
+            product_matches (Sequence[str]): Products currently matched to the venue.
+
+        Returns:
+            Optional[str]: The pitch, or None if none was generated for these matches.
+        """
+        with self._lock:
+            entry = self._entries.get(pitch_key(venue_name, product_matches))
+        return entry['pitch'] if entry else None
+
+    def put(self, venue_name: str, product_matches: Sequence[str], pitch: str) -> None:
+        """
+        Store a generated pitch.
+
+        Args:
+            venue_name (str): Name of the venue.
+            product_matches (Sequence[str]): Products the pitch was generated for.
+            pitch (str): The pitch.
+        """
+        with self._lock:
+            self._entries[pitch_key(venue_name, product_matches)] = {
+                'venue': venue_name, 'prompt_version': PROMPT_VERSION,
+                'pitch': pitch, 'created_at': time.time()}
+
+    def save(self) -> None:
+        """Write the store to disk atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._entries, indent=2, ensure_ascii=False)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save pitch store {self.path}: {e}")
+
+
+def pregenerate_pitches(product_matches: Dict[str, List[str]], store: PitchStore,
+                        max_in_flight: int = 8, regenerate: bool = False) -> int:
+    """
+    Generate the pitch of every venue that has none yet, concurrently.
+
+    Args:
+        product_matches (Dict[str, List[str]]): Matched products per venue.
+        store (PitchStore): Store the pitches are read from and written to.
+        max_in_flight (int): Maximum number of concurrent ChatGPT requests.
+        regenerate (bool): Replace stored pitches, bypassing the LLM response cache.
+
+    Returns:
+        int: Number of pitches generated.
+    """
+    pending = [(name, matches) for name, matches in product_matches.items()
+               if matches and (regenerate or store.get(name, matches) is None)]
+    logger.info(f"Generating {len(pending)} pitches "
+                f"({len(product_matches) - len(pending)} venues already have one)")
+    if not pending:
+        return 0
+
+    messages = [build_pitch_message(name, matches) for name, matches in pending]
+    responses = parse_many_with_chatgpt(messages, max_in_flight=max_in_flight,
+                                        use_cache=not regenerate)
+    generated = 0
+    for (name, matches), pitch in zip(pending, responses):
+        if isinstance(pitch, str) and pitch:
+            store.put(name, matches, pitch)
+            generated += 1
+        else:
+            logger.warning(f"No pitch generated for {name}")
+    store.save()
+    return generated
+
+
+if __name__ == "__main__":
+    from src.app_data import load_product_matches
+
+    parser = argparse.ArgumentParser(description="Pre-generate the sales pitch of every matched venue.")
+    parser.add_argument('--matches', default='../data/product_matches.json',
+                        help="Product matches file, used when no pipeline store is configured")
+    parser.add_argument('--output', default=PITCH_STORE_FILE, help="Pitch store file")
+    parser.add_argument('--max-in-flight', type=int, default=8,
+                        help="Maximum number of concurrent ChatGPT requests")
+    parser.add_argument('--regenerate', action='store_true',
+                        help="Replace pitches that were already generated")
+    args = parser.parse_args()
+
+    db = open_store()
+    product_matches = db.all_matches() if db is not None else load_product_matches(args.matches)
+    count = pregenerate_pitches(product_matches, PitchStore(args.output),
+                                max_in_flight=args.max_in_flight, regenerate=args.regenerate)
+    print(f"Generated {count} pitches into {args.output}")
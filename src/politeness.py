@@ -0,0 +1,61 @@
+import time
+import logging
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def domain_of(url: str) -> str:
+    """
+    Get the host name of a URL, without a leading "www.".
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The lowercase host name, or an empty string if the URL has none.
+    """
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class DomainThrottle:
+    """
+    Per-domain politeness limit shared by all scraping threads.
+
+    Requests to the same domain start at least min_interval seconds apart;
+    requests to different domains are never delayed by each other.
+    """
+
+    def __init__(self, min_interval: float = 2.0, clock=time.monotonic, sleep=time.sleep):
+        self.min_interval = min_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """
+        Block until a request to the URL's domain is allowed, and reserve the slot.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        domain = domain_of(url)
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next_allowed.get(domain, now))
+            self._next_allowed[domain] = start + self.min_interval
+        delay = start - now
+        if delay > 0:
+            logger.debug(f"Waiting {delay:.1f}s before requesting {domain}")
+            self._sleep(delay)
+        return delay
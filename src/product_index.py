@@ -0,0 +1,143 @@
+import os
+import json
+import logging
+import argparse
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PRODUCT_INDEX_FILE = "../data/product_index.json"
+PRODUCT_INDEX_VERSION = 1
+
+# A venue's matches: product names, or (product, score) pairs, best first
+Matches = Sequence[Union[str, Tuple[str, float]]]
+
+
+class ProductIndex:
+    """
+    Inverted index of product matches: each product maps to the venues it was matched to.
+
+    Every entry keeps the venue, the match score (None when the matching
+    method gives no score) and the product's rank in the venue's match list.
+    Entries are sorted when the index is built, best score first and then
+    best rank, so looking up a product is a single dictionary access.
+    """
+
+    def __init__(self, products: Optional[Dict[str, List[Tuple[str, Optional[float], int]]]] = None):
+        self._products = products or {}
+
+    @classmethod
+    def from_matches(cls, all_matches: Dict[str, Matches]) -> 'ProductIndex':
+        """
+        Invert the product matches of every venue.
+
+        Args:
+            all_matches (Dict[str, Matches]): Venue name to its matches, as in
+                product_matches.json or with scores.
+
+        Returns:
+            ProductIndex: The index.
+        """
+        products: Dict[str, List[Tuple[str, Optional[float], int]]] = {}
+        for venue, matches in all_matches.items():
+            for rank, match in enumerate(matches):
+                product, score = (match, None) if isinstance(match, str) else match
+                products.setdefault(product, []).append(
+                    (venue, None if score is None else float(score), rank))
+        for entries in products.values():
+            entries.sort(key=lambda e: (e[1] is None, -(e[1] or 0.0), e[2], e[0]))
+        return cls(products)
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def __contains__(self, product: str) -> bool:
+        return product in self._products
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._products)
+
+    def products(self) -> List[str]:
+        """
+        List the indexed products.
+
+        Returns:
+            List[str]: Product names in alphabetical order.
+        """
+        return sorted(self._products)
+
+    def venues_for(self, product: str, top_k: Optional[int] = None
+                   ) -> List[Tuple[str, Optional[float], int]]:
+        """
+        Get the venues to pitch a product to.
+
+        Args:
+            product (str): Product name.
+            top_k (Optional[int]): Maximum number of venues; all by default.
+
+        Returns:
+            List[Tuple[str, Optional[float], int]]: (venue, score, rank) entries,
+            best first; empty for a product no venue matched.
+        """
+        entries = self._products.get(product, [])
+        return entries[:top_k] if top_k is not None else list(entries)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a JSON file atomically.
+
+        Args:
+            path (str): Output file.
+        """
+        data = {'version': PRODUCT_INDEX_VERSION,
+                'products': {p: [list(e) for e in entries] for p, entries in self._products.items()}}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        logger.info(f"Saved the venues of {len(self)} products to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'ProductIndex':
+        """
+        Read an index written by save.
+
+        Args:
+            path (str): The index file.
+
+        Returns:
+            ProductIndex: The index.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != PRODUCT_INDEX_VERSION:
+            raise ValueError(f"Unsupported product index version in {path}: {data.get('version')}")
+        return cls({p: [tuple(e) for e in entries] for p, entries in data['products'].items()})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the venues matched to a product.")
+    parser.add_argument('product', nargs='?', help="Product name, as in the catalogue")
+    parser.add_argument('--index', default=PRODUCT_INDEX_FILE, help="Product index file")
+    parser.add_argument('--build-from', metavar='MATCHES_FILE',
+                        help="Rebuild the index from a product_matches.json file first")
+    parser.add_argument('--top', type=int, default=None, help="Maximum number of venues listed")
+    args = parser.parse_args()
+
+    if args.build_from:
+        with open(args.build_from, 'r') as f:
+            ProductIndex.from_matches(json.load(f)).save(args.index)
+    if args.product:
+        index = ProductIndex.load(args.index)
+        entries = index.venues_for(args.product, args.top)
+        if not entries:
+            print(f"No venues matched to {args.product}")
+        for venue, score, rank in entries:
+            score_text = f"{score:.3f}" if score is not None else "-"
+            print(f"{venue}\tscore {score_text}\trank {rank + 1}")
@@ -1,8 +1,18 @@
+import os
 import re
 import csv
+import argparse
 import json
 import logging
-from src.utils import parse_with_chatgpt
+import numpy as np
+from src.utils import parse_with_chatgpt, count_message_tokens, count_tokens
+from src.llm_dispatcher import parse_many_with_chatgpt
+from src.matching_index import CatalogueIndex, tokenize, char_ngrams, expand_tokens
+from src.store import open_store
+from src.product_index import PRODUCT_INDEX_FILE, ProductIndex
+from src.ingredient_normalization import (COMPACT_INGREDIENTS_FILE, load_venue_ingredients,
+                                          normalize_ingredient, parse_ingredients,
+                                          preferred_ingredients_file)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -54,50 +64,361 @@ def extract_json_from_response(response):
         return None
 
 
-def match_products_venue(venue, products):
+def build_matching_message(venue, products):
     """
-    Match ingredients for a single venue to potential products using ChatGPT.
+    Build the ChatGPT message that matches a venue's ingredients to products.
 
     :param venue: Dictionary containing venue name and ingredients
     :param products: List of product names
-    :return: Dictionary of matched products for the venue
+    :return: List of chat messages
     """
     prompt = f"Given the following venue names and their ingredients, along with the product catalog, match the ingredients to "\
         f"the products. If there is a match, either by direct match or through synonyms of the ingredients, format the output "\
         f"as a JSON object. The key should be the venue name, and the value should be a list of matched product names based on "\
         f"both exact and synonymous ingredient matches."\
         f"\n\nVenue: {json.dumps(venue)}\n\nProducts: {products}"
-    message = [
+    return [
         {"role": "system", "content": "You are a helpful assistant that matches venue ingredients to suitable products."},
         {"role": "user", "content": prompt}
     ]
+
+
+def parse_matching_response(response):
+    """
+    Parse the ChatGPT product matching response.
+
+    :param response: ChatGPT response string
+    :return: Dictionary of matched products for the venue
+    """
+    if not response:
+        logger.error("Empty product matching response")
+        return {}
+
+    parsed_json = extract_json_from_response(response)
+    if parsed_json:
+        return parsed_json
+    else:
+        logger.error("Failed to extract valid JSON from the response")
+        return {}
+
+
+def match_products_venue(venue, products):
+    """
+    Match ingredients for a single venue to potential products using ChatGPT.
+
+    :param venue: Dictionary containing venue name and ingredients
+    :param products: List of product names
+    :return: Dictionary of matched products for the venue
+    """
+    message = build_matching_message(venue, products)
     try:
         response = parse_with_chatgpt(message)
         # logger.info(f"Matched Products response: {response}")
-
-        parsed_json = extract_json_from_response(response)
-        if parsed_json:
-            return parsed_json
-        else:
-            logger.error("Failed to extract valid JSON from the response")
-            return {}
+        return parse_matching_response(response)
     except Exception as e:
         logger.error(f"Error matching products: {e}")
         return {}
 
 
-def process_product_matching(ingredients_file, catalogue_file, output_file):
+def split_ingredients(venue):
+    """
+    Get the list of ingredients of a venue.
+
+    :param venue: Dictionary containing venue name and ingredients
+    :return: List of ingredient names
+    """
+    return parse_ingredients(venue.get('ingredients', []))
+
+
+def rank_products_for_venue(venue, index, min_score=0.75, top_k_per_ingredient=3):
+    """
+    Rank catalogue products for a venue using the local catalogue index.
+
+    Each ingredient is looked up in the index; a product's score is the best
+    score it achieved for any of the venue's ingredients.
+
+    :param venue: Dictionary containing venue name and ingredients
+    :param index: CatalogueIndex built over the product catalogue
+    :param min_score: Minimum normalized score for a product to count as a match
+    :param top_k_per_ingredient: Number of products considered per ingredient
+    :return: List of (product name, score) tuples, best first
+    """
+    best = {}
+    for ingredient in split_ingredients(venue):
+        for product, score in index.search(ingredient, top_k=top_k_per_ingredient, min_score=min_score):
+            if score > best.get(product, 0.0):
+                best[product] = score
+    return sorted(best.items(), key=lambda item: (-item[1], item[0]))
+
+
+def find_ambiguous_ingredients(venue, index, min_score=0.75, ambiguous_score=0.4, top_k_per_ingredient=3):
+    """
+    Find ingredients whose best local match is too weak to accept but too strong to reject.
+
+    :param venue: Dictionary containing venue name and ingredients
+    :param index: CatalogueIndex built over the product catalogue
+    :param min_score: Score at or above which a match is accepted without review
+    :param ambiguous_score: Score at or above which a weaker match is worth reviewing
+    :param top_k_per_ingredient: Number of candidate products kept per ingredient
+    :return: Dictionary of ambiguous ingredient to its candidate (product name, score) tuples
+    """
+    ambiguous = {}
+    for ingredient in split_ingredients(venue):
+        candidates = index.search(ingredient, top_k=top_k_per_ingredient, min_score=ambiguous_score)
+        if candidates and candidates[0][1] < min_score:
+            ambiguous[ingredient] = candidates
+    return ambiguous
+
+
+def match_products_venue_local(venue, index, min_score=0.75, llm_fallback=False, ambiguous_score=0.4):
+    """
+    Match ingredients for a single venue to products without calling ChatGPT.
+
+    With llm_fallback, ingredients whose best match falls between ambiguous_score
+    and min_score are sent to ChatGPT together with their candidate products only.
+
+    :param venue: Dictionary containing venue name and ingredients
+    :param index: CatalogueIndex built over the product catalogue
+    :param min_score: Minimum normalized score for a product to count as a match
+    :param llm_fallback: Whether to escalate ambiguous ingredients to ChatGPT
+    :param ambiguous_score: Lower score bound of ingredients escalated to ChatGPT
+    :return: Dictionary of the venue's (product name, score) tuples, ranked by score;
+        products confirmed by ChatGPT follow with their index score
+    """
+    name = venue.get('name', 'Unknown')
+    matches = rank_products_for_venue(venue, index, min_score)
+
+    if llm_fallback:
+        ambiguous = find_ambiguous_ingredients(venue, index, min_score, ambiguous_score)
+        if ambiguous:
+            candidate_scores = {}
+            for candidates in ambiguous.values():
+                for product, score in candidates:
+                    candidate_scores[product] = max(score, candidate_scores.get(product, 0.0))
+            candidates = sorted(candidate_scores)
+            reviewed = match_products_venue(
+                {"name": name, "ingredients": ", ".join(ambiguous)}, candidates)
+            matched = {product for product, _ in matches}
+            for product in reviewed.get(name, []):
+                if product in candidate_scores and product not in matched:
+                    matches.append((product, candidate_scores[product]))
+                    matched.add(product)
+
+    return {name: matches}
+
+
+def prefilter_products(venue, index, max_candidates=150, min_score=0.3, top_k_per_ingredient=5):
+    """
+    Select the catalogue products plausibly related to a venue's ingredients.
+
+    :param venue: Dictionary containing venue name and ingredients
+    :param index: CatalogueIndex built over the product catalogue
+    :param max_candidates: Maximum number of candidate products to keep
+    :param min_score: Minimum normalized score for a product to be a candidate
+    :param top_k_per_ingredient: Number of candidate products kept per ingredient
+    :return: List of candidate product names, most relevant first
+    """
+    ranked = rank_products_for_venue(venue, index, min_score, top_k_per_ingredient)
+    return [product for product, _ in ranked[:max_candidates]]
+
+
+def build_prefiltered_messages(venue_ingredients, products, index=None, max_candidates=150):
+    """
+    Build one ChatGPT matching message per venue listing only its candidate products.
+
+    Venues without any candidate product get no message, since ChatGPT could not
+    match them to anything in the catalogue anyway.
+
+    :param venue_ingredients: List of dictionaries containing venue name and ingredients
+    :param products: List of product names
+    :param index: Optional CatalogueIndex already built over products
+    :param max_candidates: Maximum number of candidate products per venue
+    :return: Tuple of (list of message lists or None per venue, token savings report)
+    """
+    index = index or CatalogueIndex(products)
+    # Sending the full catalogue costs the product list once per venue
+    catalogue_tokens = count_tokens(str(products))
+
+    messages = []
+    full_tokens = 0
+    prompt_tokens = 0
+    for venue in venue_ingredients:
+        full_tokens += count_message_tokens(build_matching_message(venue, [])) + catalogue_tokens
+        candidates = prefilter_products(venue, index, max_candidates)
+        if not candidates:
+            messages.append(None)
+            continue
+        message = build_matching_message(venue, candidates)
+        prompt_tokens += count_message_tokens(message)
+        messages.append(message)
+
+    saved_tokens = full_tokens - prompt_tokens
+    report = {
+        "full_catalogue_tokens": full_tokens,
+        "prompt_tokens": prompt_tokens,
+        "saved_tokens": saved_tokens,
+        "saved_ratio": round(saved_tokens / full_tokens, 4) if full_tokens else 0.0,
+    }
+    return messages, report
+
+
+def build_feature_matrix(token_lists, index, ngram_weight=0.3, expand_synonyms=False):
+    """
+    Build L2-normalized TF-IDF feature rows over the catalogue index vocabulary.
+
+    Word and character trigram features form two blocks, each normalized on its
+    own and scaled so that the dot product of two rows is a weighted mix of the
+    word and trigram cosine similarities. Features the catalogue does not
+    contain still count towards a row's norm, so unmatched words lower the
+    similarity instead of being ignored.
+
+    :param token_lists: List of token lists, one per row (see matching_index.tokenize)
+    :param index: CatalogueIndex providing the vocabulary and idf weights
+    :param ngram_weight: Share of the similarity contributed by character trigrams
+    :param expand_synonyms: Whether to add synonym words of each token as features
+    :return: NumPy float32 array of shape (len(token_lists), vocabulary size)
+    """
+    words = {term: i for i, term in enumerate(index.words.idf)}
+    grams = {gram: i + len(words) for i, gram in enumerate(index.ngrams.idf)}
+    unseen_word_idf = max(index.words.idf.values(), default=1.0)
+    unseen_gram_idf = max(index.ngrams.idf.values(), default=1.0)
+
+    matrix = np.zeros((len(token_lists), len(words) + len(grams)), dtype=np.float32)
+    word_norms = np.zeros(len(token_lists), dtype=np.float32)
+    gram_norms = np.zeros(len(token_lists), dtype=np.float32)
+
+    for row, tokens in enumerate(token_lists):
+        word_terms = set(tokens)
+        if expand_synonyms:
+            word_terms.update(term for group in expand_tokens(tokens, index.synonyms)
+                              for phrase in group[1:] for term in phrase)
+        squared = 0.0
+        for term in word_terms:
+            if term in words:
+                weight = index.words.idf[term]
+                matrix[row, words[term]] = weight
+                squared += weight ** 2
+            elif term in tokens:
+                squared += unseen_word_idf ** 2
+        word_norms[row] = np.sqrt(squared)
+
+        squared = 0.0
+        for gram in set(char_ngrams(tokens)):
+            weight = index.ngrams.idf.get(gram)
+            if weight is not None:
+                matrix[row, grams[gram]] = weight
+                squared += weight ** 2
+            else:
+                squared += unseen_gram_idf ** 2
+        gram_norms[row] = np.sqrt(squared)
+
+    word_norms[word_norms == 0] = 1.0
+    gram_norms[gram_norms == 0] = 1.0
+    matrix[:, :len(words)] *= (np.sqrt(1 - ngram_weight) / word_norms)[:, None]
+    matrix[:, len(words):] *= (np.sqrt(ngram_weight) / gram_norms)[:, None]
+    return matrix
+
+
+def match_all_venues_vectorized(venue_ingredients, products, min_score=0.6, top_k=50, index=None):
+    """
+    Match every venue to products in one batch using a dense similarity matrix.
+
+    Feature matrices are built once for all distinct ingredients and all
+    products, their full similarity matrix is computed with a single matrix
+    product, per-venue product scores are the maximum over the venue's
+    ingredients of the pairs above min_score, and the top_k products of each
+    venue are extracted with argpartition.
+
+    :param venue_ingredients: List of dictionaries containing venue name and ingredients
+    :param products: List of product names
+    :param min_score: Minimum cosine similarity for a product to count as a match
+    :param top_k: Maximum number of products returned per venue
+    :param index: Optional CatalogueIndex already built over products
+    :return: Dictionary of venue name to a list of (product name, score) tuples, best first
+    """
+    index = index or CatalogueIndex(products)
+    names = [venue.get('name', 'Unknown') for venue in venue_ingredients]
+    if not index.products or not venue_ingredients:
+        return {name: [] for name in names}
+
+    ingredient_ids = {}
+    rows = []
+    lengths = []
+    for venue in venue_ingredients:
+        venue_rows = {ingredient_ids.setdefault(normalize_ingredient(i) or i.casefold(), len(ingredient_ids))
+                      for i in split_ingredients(venue)}
+        rows.extend(venue_rows)
+        lengths.append(len(venue_rows))
+    unique_ingredients = sorted(ingredient_ids, key=ingredient_ids.get)
+
+    ingredient_matrix = build_feature_matrix(
+        [tokenize(i) for i in unique_ingredients], index, expand_synonyms=True)
+    product_matrix = build_feature_matrix(index.product_tokens, index)
+    # (ingredients x products) cosine similarities in one operation
+    similarity = ingredient_matrix @ product_matrix.T
+
+    # Keep only matching (ingredient, product) pairs, grouped by ingredient
+    match_rows, match_cols = np.nonzero(similarity >= min_score)
+    match_scores = similarity[match_rows, match_cols]
+    counts = np.bincount(match_rows, minlength=len(unique_ingredients))
+    starts = np.cumsum(counts) - counts
+
+    # Expand every (venue, ingredient) pair into that ingredient's matches and
+    # take the maximum per (venue, product)
+    pair_rows = np.array(rows, dtype=np.int64)
+    pair_venues = np.repeat(np.arange(len(venue_ingredients)), lengths)
+    repeats = counts[pair_rows]
+    match_index = (np.arange(repeats.sum())
+                   - np.repeat(np.cumsum(repeats) - repeats, repeats)
+                   + np.repeat(starts[pair_rows], repeats))
+    scores = np.zeros((len(venue_ingredients), len(index.products)), dtype=np.float32)
+    np.maximum.at(scores, (np.repeat(pair_venues, repeats), match_cols[match_index]),
+                  match_scores[match_index])
+
+    k = min(top_k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    # Best score first, ties in catalogue order
+    order = np.lexsort((top, -top_scores), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    results = {}
+    for venue_row, name in enumerate(names):
+        results[name] = [
+            (index.products[col], round(float(score), 4))
+            for col, score in zip(top[venue_row], top_scores[venue_row])
+            if score >= min_score
+        ]
+    return results
+
+
+def process_product_matching(ingredients_file, catalogue_file, output_file, max_in_flight=8,
+                             method="llm", llm_fallback=False, prefilter=True, db=None,
+                             index_file=None):
     """
     Process ingredient lists and match them to products from the catalogue.
 
-    :param ingredients_file: JSON file containing derived ingredients
+    With method="llm" venues are matched by ChatGPT concurrently, with up to
+    max_in_flight requests awaiting a response at once; with prefilter, each
+    prompt lists only the products lexically related to the venue's
+    ingredients instead of the whole catalogue. With method="local"
+    they are matched offline against a BM25 index of the catalogue, and with
+    method="vectorized" all venues are matched in one NumPy batch.
+
+    :param ingredients_file: JSON file containing derived ingredients, or their compact ID format
     :param catalogue_file: CSV file containing the catalogue
     :param output_file: Output file to save product matches
+    :param max_in_flight: Maximum number of concurrent ChatGPT requests
+    :param method: Matching method, "llm", "local" or "vectorized"
+    :param llm_fallback: With the local method, escalate ambiguous ingredients to ChatGPT
+    :param prefilter: With the llm method, send only candidate products in each prompt
+    :param db: Optional PipelineStore that the matches are also written to
+    :param index_file: Optional file to save the product -> venues index to
     """
     try:
-        with open(ingredients_file, 'r') as f:
-            venue_ingredients = json.load(f)
-    except json.JSONDecodeError as e:
+        venue_ingredients = load_venue_ingredients(ingredients_file)
+    except ValueError as e:
         logger.error(f"Error parsing ingredients file: {e}")
         return
     except FileNotFoundError:
@@ -112,10 +433,38 @@ def process_product_matching(ingredients_file, catalogue_file, output_file):
         return
 
     all_matches = {}
+    scores = {}
 
-    for venue in venue_ingredients:
-        matches = match_products_venue(venue, products)
-        all_matches.update(matches)
+    if method == "local":
+        index = CatalogueIndex(products)
+        for venue in venue_ingredients:
+            for name, ranked in match_products_venue_local(venue, index, llm_fallback=llm_fallback).items():
+                all_matches[name] = [product for product, _ in ranked]
+                scores[name] = ranked
+    elif method == "vectorized":
+        for name, ranked in match_all_venues_vectorized(venue_ingredients, products).items():
+            all_matches[name] = [product for product, _ in ranked]
+            scores[name] = ranked
+    elif method == "llm":
+        if prefilter:
+            messages, report = build_prefiltered_messages(venue_ingredients, products)
+            logger.info(
+                f"Prefiltering cut prompt tokens from {report['full_catalogue_tokens']} to "
+                f"{report['prompt_tokens']} ({report['saved_ratio']:.1%} saved)")
+        else:
+            messages = [build_matching_message(venue, products)
+                        for venue in venue_ingredients]
+
+        for venue, message in zip(venue_ingredients, messages):
+            if message is None:
+                all_matches[venue.get('name', 'Unknown')] = []
+        pending = [message for message in messages if message is not None]
+        responses = parse_many_with_chatgpt(pending, max_in_flight=max_in_flight)
+        for response in responses:
+            all_matches.update(parse_matching_response(response))
+    else:
+        logger.error(f"Unknown matching method: {method}")
+        return
 
     try:
         with open(output_file, 'w') as f:
@@ -125,9 +474,47 @@ def process_product_matching(ingredients_file, catalogue_file, output_file):
     except IOError as e:
         logger.error(f"Error writing to output file: {e}")
 
+    if index_file:
+        scored_matches = {name: scores.get(name, matches) for name, matches in all_matches.items()}
+        try:
+            ProductIndex.from_matches(scored_matches).save(index_file)
+        except OSError as e:
+            logger.error(f"Error writing product index: {e}")
+
+    if db is not None:
+        for name, matches in all_matches.items():
+            db.set_matches(name, scores.get(name, matches))
+        logger.info(f"Product matches of {len(all_matches)} venues saved to {db.path}")
+
 
 if __name__ == "__main__":
-    ingredients_file = '../data/ingredients.json'
+    parser = argparse.ArgumentParser(description="Match venue ingredients to catalogue products.")
+    parser.add_argument('--method', choices=['llm', 'local', 'vectorized'], default='llm',
+                        help="Match with ChatGPT, the offline catalogue index, or one vectorized batch")
+    parser.add_argument('--llm-fallback', action='store_true',
+                        help="With --method local, send ambiguous ingredients to ChatGPT")
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help="With --method llm, send the full catalogue in every prompt")
+    parser.add_argument('--pregenerate-pitches', action='store_true',
+                        help="Generate the sales pitch of every matched venue for the app afterwards")
+    args = parser.parse_args()
+
+    # The compact file holds the same venues with normalized, deduplicated ingredients
+    ingredients_file = preferred_ingredients_file('../data/ingredients.json', COMPACT_INGREDIENTS_FILE)
     catalogue_file = '../data/catalogue.csv'
     output_file = '../data/product_matches.json'
-    process_product_matching(ingredients_file, catalogue_file, output_file)
+    db = open_store()
+    try:
+        process_product_matching(ingredients_file, catalogue_file, output_file,
+                                 method=args.method, llm_fallback=args.llm_fallback,
+                                 prefilter=not args.no_prefilter, db=db,
+                                 index_file=PRODUCT_INDEX_FILE)
+    finally:
+        if db is not None:
+            db.close()
+
+    if args.pregenerate_pitches and os.path.exists(output_file):
+        from src.pitch_store import PitchStore, pregenerate_pitches
+
+        with open(output_file, 'r') as f:
+            pregenerate_pitches(json.load(f), PitchStore())
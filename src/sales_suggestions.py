@@ -1,106 +1,147 @@
-import streamlit as st
-import json
-import math
-from src.utils import parse_with_chatgpt
+import os
 import pandas as pd
+import streamlit as st
+from src.utils import parse_with_chatgpt, stream_with_chatgpt
+from src.app_data import (create_two_column_table, load_app_data,  # noqa: F401
+                          load_pitch_store, load_product_matches)
+from src.pitch_store import build_pitch_message
+from src.venue_index import filter_venues, paginate
 
-
-def load_product_matches(file_path):
-    """
-    Load product matches from a JSON file.
-
-    :param file_path: Path to the JSON file containing product matches
-    :return: Dictionary of venue names and their product matches
-    """
-    with open(file_path, 'r') as f:
-        product_matches = json.load(f)
-
-    # Check if the loaded data is already in the correct format
-    if isinstance(product_matches, dict):
-        return product_matches
-
-    # If it's a list of dictionaries, convert it to the desired format
-    elif isinstance(product_matches, list):
-        return {venue.get('name', venue.get('venue_name', 'Unknown')): venue.get('product_matches', []) for venue in product_matches}
-
-    # If it's neither a dict nor a list, raise an error
-    else:
-        raise ValueError(f"Unexpected data structure in {file_path}")
+# Venues listed per page of search results
+VENUES_PER_PAGE = 50
 
 
-def generate_sales_suggestion(venue_name, product_matches):
+def generate_sales_suggestion(venue_name, product_matches, use_cache=True):
     """
     Generate a sales suggestion using ChatGPT based on the product matches for a venue.
 
     :param venue_name: Name of the venue
     :param product_matches: Product matches for the venue
+    :param use_cache: Whether an identical earlier request may be answered from the LLM response cache
     :return: Generated sales suggestion
     """
-    prompt = f"Create a short sales pitch to a restaurant,bar or cafe such as {venue_name} to sell the following product :\n\n{json.dumps(product_matches, indent=2)}\n\nProvide a conversational suggestion in a professional manner, on which products to pitch and why they would be suitable for this venue."
-    message = [
-        {"role": "system", "content": "You are a helpful sales assistant providing product sales pitch for food distributors."},
-        {"role": "user", "content": prompt}
-    ]
+    message = build_pitch_message(venue_name, product_matches)
 
-    response = parse_with_chatgpt(message)
+    response = parse_with_chatgpt(message, use_cache=use_cache)
 
     # The response is now a string, so we can return it directly
     return response
 
 
-def create_two_column_table(matches):
+def stream_sales_suggestion(venue_name, product_matches, use_cache=True):
     """
-    Create a two-column table from the list of matches.
+    Stream a sales suggestion from ChatGPT as it is generated.
 
-    :param matches: List of product matches
-    :return: Pandas DataFrame with two columns
+    :param venue_name: Name of the venue
+    :param product_matches: Product matches for the venue
+    :param use_cache: Whether an identical earlier request may be answered from the LLM response cache
+    :return: ChatStream over pieces of the suggestion text; check its completed flag before keeping the text
     """
-    # Calculate the number of rows needed
-    num_rows = math.ceil(len(matches) / 2)
+    return stream_with_chatgpt(build_pitch_message(venue_name, product_matches), use_cache=use_cache)
 
-    # Create two columns
-    col1 = matches[:num_rows]
-    col2 = matches[num_rows:] + [''] * (num_rows - len(matches[num_rows:]))
 
-    # Create DataFrame
-    df = pd.DataFrame({
-        "Product Matches 1": col1,
-        "Product Matches 2": col2
-    })
+def show_product_venues(data):
+    """
+    Render the distributor view: the venues to pitch a chosen product to.
 
-    return df
+    :param data: AppData of the app
+    """
+    product = st.selectbox("Select a product:", [""] + data.products)
+    if not product:
+        return
 
+    venues = data.venue_scores(product)
+    st.subheader(f"Venues matched to {product}")
+    st.caption(f"{len(venues)} venues")
+    page_count = paginate(venues, 1, VENUES_PER_PAGE)[1]
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Venues page (of {page_count}):", min_value=1,
+                               max_value=page_count, value=1)
+    rows, _ = paginate(venues, page, VENUES_PER_PAGE)
+    st.table(pd.DataFrame({
+        "Venue": [venue for venue, _ in rows],
+        "Match score": ["" if score is None else f"{score:.2f}" for _, score in rows],
+    }))
+
+
+def main(data_dir='../data'):
+    """
+    Render the app.
 
-def main():
+    :param data_dir: Directory holding product_matches.json and ingredients.compact.json
+    """
     st.title("Smart Product Match & Sales Pitch for Food Distributors")
 
+    # Cached per file version, so widget interactions do not reload the data.
+    # The pipeline store is queried instead of the JSON file when configured.
     try:
-        product_matches = load_product_matches('../data/product_matches.json')
+        data = load_app_data(os.path.join(data_dir, 'product_matches.json'),
+                             os.path.join(data_dir, 'ingredients.compact.json'),
+                             db_path=os.getenv('PIPELINE_DB'),
+                             index_file=os.path.join(data_dir, 'product_index.json'))
     except Exception as e:
         st.error(f"Error loading product matches: {str(e)}")
         return
 
+    if st.sidebar.radio("Browse by:", ["Venue", "Product"]) == "Product":
+        show_product_venues(data)
+        return
+
+    # Search venue names by prefix or fuzzily, optionally among the venues matched to a product
+    query = st.text_input("Search venues:", placeholder="Type part of a venue name")
+    product = st.selectbox("Only venues matched to:", [""] + data.products)
+    if query.strip():
+        candidates = data.index.search(query, limit=len(data.index))
+        if product:
+            candidates = filter_venues(candidates, set(data.venues_with_product(product)))
+    else:
+        candidates = data.venues_with_product(product) if product else data.venue_names
+
+    page_count = paginate(candidates, 1, VENUES_PER_PAGE)[1]
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Results page (of {page_count}):", min_value=1,
+                               max_value=page_count, value=1)
+    venue_names, _ = paginate(candidates, page, VENUES_PER_PAGE)
+    st.caption(f"{len(candidates)} of {len(data.venue_names)} venues")
+
     # Create a dropdown menu for venue selection
-    venue_names = list(product_matches.keys())
     selected_venue = st.selectbox("Select a venue:", [""] + venue_names)
 
     if selected_venue:
+        view = data.view(selected_venue)
         st.subheader(f"Product Matches for {selected_venue}")
 
-        # Display product matches in a table
-        matches = product_matches[selected_venue]
-        df = create_two_column_table(matches)
-        st.table(df)
+        # Display the product matches table one page at a time
+        match_page = 1
+        if view.page_count > 1:
+            match_page = st.number_input(f"Matches page (of {view.page_count}):", min_value=1,
+                                         max_value=view.page_count, value=1)
+        st.table(view.page(match_page))
 
-        st.subheader("Sales Pitch")
+        if view.ingredients:
+            with st.expander("Menu ingredients"):
+                st.write(", ".join(view.ingredients))
 
-        # Add a spinner while generating the suggestion
-        with st.spinner('Generating sales pitch...'):
-            suggestion = generate_sales_suggestion(
-                selected_venue, matches)
+        st.subheader("Sales Pitch")
 
-        # Display the suggestion after it's generated
-        st.write(suggestion)
+        # Serve the stored pitch; generate one only if the venue has none yet
+        pitches = load_pitch_store(os.path.join(data_dir, 'pitches.json'))
+        regenerate = st.button("Regenerate pitch")
+        suggestion = None if regenerate else pitches.get(selected_venue, view.matches)
+        if suggestion is None:
+            # Render the suggestion token by token while it is generated
+            stream = stream_sales_suggestion(selected_venue, view.matches, use_cache=not regenerate)
+            st.write_stream(stream)
+            # Only keep pitches the model finished; a broken stream is shown but not stored
+            if stream.completed:
+                pitches.put(selected_venue, view.matches, stream.text)
+                pitches.save()
+            else:
+                st.warning("The sales pitch could not be generated in full. Please try again.")
+        else:
+            st.write(suggestion)
 
 
 if __name__ == "__main__":
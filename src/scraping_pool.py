@@ -0,0 +1,184 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from src.ingredient_retrieval import Scraper, create_session
+from src.politeness import DomainThrottle
+from src.page_readiness import AdaptiveTimeout
+from src.http_cache import FetchStore
+from src.menu_dedupe import MenuDeduplicator
+from src.journal import Journal
+from src.async_fetch import BackgroundFetcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class ScrapeProgress:
+    """Thread-safe progress and throughput counters for a scraping run."""
+
+    def __init__(self, total: int, clock=time.monotonic):
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str) -> None:
+        """
+        Count one finished venue.
+
+        Args:
+            outcome (str): "succeeded", "failed" or "skipped".
+        """
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @property
+    def finished(self) -> int:
+        return self.succeeded + self.failed + self.skipped
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize progress and throughput.
+
+        Returns:
+            Dict[str, float]: Venue counts, elapsed seconds, venues scraped per
+            minute and the estimated seconds remaining.
+        """
+        with self._lock:
+            elapsed = self._clock() - self._started
+            scraped = self.succeeded + self.failed
+            rate = scraped / elapsed * 60 if elapsed > 0 else 0.0
+            remaining = self.total - self.finished
+            return {
+                "total": self.total,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "elapsed_seconds": round(elapsed, 1),
+                "venues_per_minute": round(rate, 2),
+                "eta_seconds": round(remaining / rate * 60, 1) if rate else None,
+            }
+
+    def report(self) -> str:
+        """
+        Format the summary as a one-line progress report.
+
+        Returns:
+            str: Human-readable progress report.
+        """
+        s = self.summary()
+        eta = f", ~{s['eta_seconds']:.0f}s left" if s['eta_seconds'] else ""
+        return (f"{self.finished}/{s['total']} venues ({s['succeeded']} scraped, {s['failed']} failed, "
+                f"{s['skipped']} skipped) in {s['elapsed_seconds']:.0f}s, "
+                f"{s['venues_per_minute']:.1f} venues/min{eta}")
+
+
+class ScraperPool:
+    """
+    Scrape venues concurrently with a pool of worker threads.
+
+    Each worker owns a Scraper, and so its own browser when use_browser is
+    set, which is started on the worker's first browser request. All workers
+    share one DomainThrottle, so politeness is enforced per domain instead of
+    by sleeping between venues, as well as a pooled HTTP session and the
+    memory of which fetch tier and how much render time each domain needs,
+    and one PDF downloader whose connection pool lasts for the whole run.
+    Menus already processed by any worker are not sent to the LLM again.
+    """
+
+    def __init__(self, workers: int = 4, use_browser: bool = True,
+                 throttle: Optional[DomainThrottle] = None,
+                 fetch_store: Optional[FetchStore] = None,
+                 scraper_factory: Optional[Callable[[], Scraper]] = None):
+        self.workers = workers
+        self.throttle = throttle or DomainThrottle()
+        self.domain_tiers: Dict[str, str] = {}
+        self.session = create_session(pool_size=max(10, workers * 2))
+        self.readiness_timeout = AdaptiveTimeout()
+        self.deduplicator = MenuDeduplicator()
+        self.pdf_fetcher = BackgroundFetcher(throttle=self.throttle, store=fetch_store)
+        self.scraper_factory = scraper_factory or (
+            lambda: Scraper(use_browser=use_browser, throttle=self.throttle, existing_ingredients={},
+                            domain_tiers=self.domain_tiers, session=self.session,
+                            readiness_timeout=self.readiness_timeout, fetch_store=fetch_store,
+                            deduplicator=self.deduplicator, pdf_fetcher=self.pdf_fetcher))
+        self.progress = ScrapeProgress(0)
+        self._local = threading.local()
+        self._scrapers: List[Scraper] = []
+        self._lock = threading.Lock()
+
+    def _scraper(self) -> Scraper:
+        scraper = getattr(self._local, 'scraper', None)
+        if scraper is None:
+            scraper = self.scraper_factory()
+            self._local.scraper = scraper
+            with self._lock:
+                self._scrapers.append(scraper)
+        return scraper
+
+    def _scrape(self, venue: Dict[str, str], journal: Optional[Journal] = None) -> Optional[Dict[str, str]]:
+        result = self._scraper().scrape_venue(venue)
+        if result and journal is not None:
+            journal.append(result)
+        self.progress.record("succeeded" if result else "failed")
+        logger.info(self.progress.report())
+        return result
+
+    def scrape_venue_ingredients(self, venues: List[Dict[str, str]],
+                                 existing_names: Optional[set] = None,
+                                 journal: Optional[Journal] = None) -> List[Dict[str, str]]:
+        """
+        Scrape ingredients for every venue not already scraped.
+
+        Args:
+            venues (List[Dict[str, str]]): Venues with 'name' and 'website' keys.
+            existing_names (Optional[set]): Names of venues to skip; defaults to the
+                venues already in ../data/ingredients.json.
+            journal (Optional[Journal]): Checkpoint each result is appended to as soon
+                as it is scraped; venues already in it are skipped.
+
+        Returns:
+            List[Dict[str, str]]: New ingredient entries, in the order of venues.
+        """
+        if existing_names is None:
+            existing_names = set(Scraper.load_existing_ingredients())
+
+        self.progress = ScrapeProgress(len(venues))
+        pending = []
+        for venue in venues:
+            if venue['name'] in existing_names or (journal is not None and venue['name'] in journal):
+                self.progress.record("skipped")
+            else:
+                pending.append(venue)
+        logger.info(f"Scraping {len(pending)} venues with {self.workers} workers "
+                    f"({self.progress.skipped} already scraped)")
+
+        results: Dict[int, Dict[str, str]] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self._scrape, venue, journal): i for i, venue in enumerate(pending)}
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result:
+                        results[futures[future]] = result
+        finally:
+            self.close()
+
+        logger.info(f"Scraping finished: {self.progress.report()}")
+        return [results[i] for i in sorted(results)]
+
+    def close(self) -> None:
+        """Shut down the browsers of all workers and the shared PDF downloader."""
+        with self._lock:
+            for scraper in self._scrapers:
+                scraper.close()
+            self._scrapers.clear()
+        self.pdf_fetcher.close()
+        self._local = threading.local()
@@ -0,0 +1,479 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_DB_PATH = os.path.join(PROJECT_ROOT, 'data', 'pipeline.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venues (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    place_id TEXT UNIQUE,
+    website TEXT,
+    menu_url TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingredients (
+    venue_id INTEGER PRIMARY KEY REFERENCES venues(id) ON DELETE CASCADE,
+    ingredients TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    -- Catalogue order; NULL for products only known from matches
+    position INTEGER
+);
+CREATE TABLE IF NOT EXISTS matches (
+    venue_id INTEGER NOT NULL REFERENCES venues(id) ON DELETE CASCADE,
+    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    score REAL,
+    PRIMARY KEY (venue_id, product_id)
+);
+CREATE INDEX IF NOT EXISTS matches_by_product ON matches(product_id, score DESC);
+"""
+
+# A match is a product name, or a (product name, score) pair
+Match = Union[str, Tuple[str, Optional[float]]]
+
+
+def open_store(path: Optional[str] = None) -> Optional['PipelineStore']:
+    """
+    Open the pipeline store if one is configured.
+
+    Args:
+        path (Optional[str]): Database file; defaults to the PIPELINE_DB environment variable.
+
+    Returns:
+        Optional[PipelineStore]: The store, or None when no database is configured,
+        in which case stages only use their JSON and CSV files.
+    """
+    path = path or os.getenv('PIPELINE_DB')
+    return PipelineStore(path) if path else None
+
+
+class PipelineStore:
+    """
+    SQLite store of venues, ingredients, the catalogue and product matches.
+
+    The database runs in WAL mode, so the Streamlit app and other readers can
+    query it while a pipeline stage writes. Venues are indexed by name and
+    Google place id, and every stage updates only the rows it touched instead
+    of rewriting a whole file. Each thread gets its own connection; those of
+    finished threads, such as the script thread of each Streamlit rerun, are
+    closed when the next thread connects.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, timeout: float = 30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        # Connection of each thread that used the store
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            with self._lock:
+                live = []
+                for thread, other in self._connections:
+                    if thread.is_alive():
+                        live.append((thread, other))
+                    else:
+                        other.close()
+                live.append((threading.current_thread(), conn))
+                self._connections = live
+        return conn
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _venue_id(self, conn: sqlite3.Connection, name: str) -> int:
+        """Get the id of a venue, creating a bare venue row if needed."""
+        conn.execute("INSERT OR IGNORE INTO venues (name, updated_at) VALUES (?, ?)", (name, time.time()))
+        return conn.execute("SELECT id FROM venues WHERE name = ?", (name,)).fetchone()[0]
+
+    # Venues
+
+    def upsert_venues(self, venues: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert venues or update the ones already stored.
+
+        Args:
+            venues (Iterable[Dict[str, Any]]): Venues with 'name' and optionally
+                'website' and 'place_id'.
+
+        Returns:
+            int: Number of venues written.
+        """
+        now = time.time()
+        rows = [(v['name'], v.get('place_id'), v.get('website'), now) for v in venues]
+        with self._connection() as conn:
+            conn.executemany("""
+                INSERT INTO venues (name, place_id, website, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    place_id = COALESCE(excluded.place_id, place_id),
+                    website = COALESCE(excluded.website, website),
+                    updated_at = excluded.updated_at
+            """, rows)
+        return len(rows)
+
+    def set_menu_url(self, name: str, menu_url: str) -> None:
+        """
+        Record the menu page found for a venue.
+
+        Args:
+            name (str): Venue name.
+            menu_url (str): URL of the venue's menu.
+        """
+        with self._connection() as conn:
+            venue_id = self._venue_id(conn, name)
+            conn.execute("UPDATE venues SET menu_url = ?, updated_at = ? WHERE id = ?",
+                         (menu_url, time.time(), venue_id))
+
+    def get_venue(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a venue by name.
+
+        Args:
+            name (str): Venue name.
+
+        Returns:
+            Optional[Dict[str, Any]]: The venue, or None if it is not stored.
+        """
+        row = self._connection().execute(
+            "SELECT name, place_id, website, menu_url FROM venues WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def get_venue_by_place_id(self, place_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a venue by its Google place id.
+
+        Args:
+            place_id (str): Google Places id.
+
+        Returns:
+            Optional[Dict[str, Any]]: The venue, or None if it is not stored.
+        """
+        row = self._connection().execute(
+            "SELECT name, place_id, website, menu_url FROM venues WHERE place_id = ?",
+            (place_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_venues(self, with_menu_url: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        List stored venues in insertion order.
+
+        Args:
+            with_menu_url (Optional[bool]): Only venues whose menu URL has (True) or
+                has not (False) been looked up; all venues when None.
+
+        Returns:
+            List[Dict[str, Any]]: Venues with 'name', 'place_id', 'website' and 'menu_url'.
+        """
+        query = "SELECT name, place_id, website, menu_url FROM venues"
+        if with_menu_url is True:
+            query += " WHERE menu_url IS NOT NULL"
+        elif with_menu_url is False:
+            query += " WHERE menu_url IS NULL"
+        return [dict(row) for row in self._connection().execute(query + " ORDER BY id")]
+
+    # Ingredients
+
+    def set_ingredients(self, name: str, ingredients: str) -> None:
+        """
+        Store the ingredients scraped for a venue.
+
+        Args:
+            name (str): Venue name.
+            ingredients (str): Comma-separated ingredients.
+        """
+        self.upsert_ingredients([{'name': name, 'ingredients': ingredients}])
+
+    def upsert_ingredients(self, records: Iterable[Dict[str, str]]) -> int:
+        """
+        Store the ingredients of several venues.
+
+        Args:
+            records (Iterable[Dict[str, str]]): Records with 'name' and 'ingredients',
+                as in ingredients.json.
+
+        Returns:
+            int: Number of venues written.
+        """
+        count = 0
+        now = time.time()
+        with self._connection() as conn:
+            for record in records:
+                venue_id = self._venue_id(conn, record['name'])
+                conn.execute("""
+                    INSERT INTO ingredients (venue_id, ingredients, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(venue_id) DO UPDATE SET
+                        ingredients = excluded.ingredients, updated_at = excluded.updated_at
+                """, (venue_id, record['ingredients'], now))
+                count += 1
+        return count
+
+    def get_ingredients(self, name: str) -> Optional[str]:
+        """
+        Get the ingredients of a venue.
+
+        Args:
+            name (str): Venue name.
+
+        Returns:
+            Optional[str]: Comma-separated ingredients, or None if not scraped yet.
+        """
+        row = self._connection().execute("""
+            SELECT i.ingredients FROM ingredients i JOIN venues v ON v.id = i.venue_id
+            WHERE v.name = ?
+        """, (name,)).fetchone()
+        return row[0] if row else None
+
+    def list_ingredients(self) -> List[Dict[str, str]]:
+        """
+        List the ingredients of every scraped venue.
+
+        Returns:
+            List[Dict[str, str]]: Records with 'name' and 'ingredients', as in ingredients.json.
+        """
+        rows = self._connection().execute("""
+            SELECT v.name, i.ingredients FROM ingredients i JOIN venues v ON v.id = i.venue_id
+            ORDER BY v.id
+        """)
+        return [{'name': name, 'ingredients': ingredients} for name, ingredients in rows]
+
+    def venues_with_ingredients(self) -> set:
+        """
+        Get the names of all venues whose ingredients have been scraped.
+
+        Returns:
+            set: Venue names.
+        """
+        rows = self._connection().execute(
+            "SELECT v.name FROM ingredients i JOIN venues v ON v.id = i.venue_id")
+        return {row[0] for row in rows}
+
+    # Catalogue
+
+    def replace_catalogue(self, products: Sequence[str]) -> int:
+        """
+        Replace the catalogue.
+
+        Products no longer listed are taken out of the catalogue but keep their
+        matches, which stay visible until the venues are matched again.
+
+        Args:
+            products (Sequence[str]): Product names in catalogue order.
+
+        Returns:
+            int: Number of products stored.
+        """
+        products = list(dict.fromkeys(p.strip() for p in products if p and p.strip()))
+        with self._connection() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS new_products (name TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM new_products")
+            conn.executemany("INSERT INTO new_products (name) VALUES (?)", [(p,) for p in products])
+            conn.execute("UPDATE products SET position = NULL WHERE name NOT IN (SELECT name FROM new_products)")
+            conn.executemany("""
+                INSERT INTO products (name, position) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET position = excluded.position
+            """, [(p, i) for i, p in enumerate(products)])
+        return len(products)
+
+    def list_products(self) -> List[str]:
+        """
+        List the catalogue.
+
+        Returns:
+            List[str]: Product names in catalogue order.
+        """
+        rows = self._connection().execute(
+            "SELECT name FROM products WHERE position IS NOT NULL ORDER BY position")
+        return [row[0] for row in rows]
+
+    # Matches
+
+    def set_matches(self, name: str, matches: Sequence[Match]) -> None:
+        """
+        Replace the product matches of a venue.
+
+        Args:
+            name (str): Venue name.
+            matches (Sequence[Match]): Product names, or (product, score) pairs, best first.
+                Products missing from the catalogue are stored outside of it.
+        """
+        with self._connection() as conn:
+            venue_id = self._venue_id(conn, name)
+            conn.execute("DELETE FROM matches WHERE venue_id = ?", (venue_id,))
+            for rank, match in enumerate(matches):
+                product, score = (match, None) if isinstance(match, str) else match
+                conn.execute("INSERT OR IGNORE INTO products (name) VALUES (?)", (product,))
+                conn.execute("""
+                    INSERT OR IGNORE INTO matches (venue_id, product_id, rank, score)
+                    SELECT ?, id, ?, ? FROM products WHERE name = ?
+                """, (venue_id, rank, score, product))
+
+    def get_matches(self, name: str) -> List[str]:
+        """
+        Get the products matched to a venue.
+
+        Args:
+            name (str): Venue name.
+
+        Returns:
+            List[str]: Product names, best first.
+        """
+        rows = self._connection().execute("""
+            SELECT p.name FROM matches m
+            JOIN venues v ON v.id = m.venue_id JOIN products p ON p.id = m.product_id
+            WHERE v.name = ? ORDER BY m.rank
+        """, (name,))
+        return [row[0] for row in rows]
+
+    def all_matches(self) -> Dict[str, List[str]]:
+        """
+        Get the product matches of every matched venue.
+
+        Returns:
+            Dict[str, List[str]]: Venue name to product names, as in product_matches.json.
+        """
+        matches: Dict[str, List[str]] = {}
+        rows = self._connection().execute("""
+            SELECT v.name, p.name FROM matches m
+            JOIN venues v ON v.id = m.venue_id JOIN products p ON p.id = m.product_id
+            ORDER BY v.id, m.rank
+        """)
+        for venue, product in rows:
+            matches.setdefault(venue, []).append(product)
+        return matches
+
+    def matched_venues(self) -> List[str]:
+        """
+        List the venues that have product matches.
+
+        Returns:
+            List[str]: Venue names in insertion order.
+        """
+        rows = self._connection().execute(
+            "SELECT name FROM venues WHERE id IN (SELECT venue_id FROM matches) ORDER BY id")
+        return [row[0] for row in rows]
+
+    def matched_products(self) -> List[str]:
+        """
+        List the products matched to at least one venue.
+
+        Returns:
+            List[str]: Product names in alphabetical order.
+        """
+        rows = self._connection().execute(
+            "SELECT name FROM products WHERE id IN (SELECT product_id FROM matches) ORDER BY name")
+        return [row[0] for row in rows]
+
+    def venues_for_product(self, product: str) -> List[Tuple[str, Optional[float]]]:
+        """
+        Find the venues a product was matched to.
+
+        Args:
+            product (str): Product name.
+
+        Returns:
+            List[Tuple[str, Optional[float]]]: (venue name, score) pairs, best score first;
+            unscored matches follow, by their rank in the venue's match list.
+        """
+        rows = self._connection().execute("""
+            SELECT v.name, m.score FROM matches m
+            JOIN products p ON p.id = m.product_id JOIN venues v ON v.id = m.venue_id
+            WHERE p.name = ? ORDER BY m.score IS NULL, m.score DESC, m.rank, v.name
+        """, (product,))
+        return [(name, score) for name, score in rows]
+
+    # Files
+
+    def import_files(self, data_dir: str) -> Dict[str, int]:
+        """
+        Load the pipeline's JSON and CSV files into the store.
+
+        Args:
+            data_dir (str): Directory holding venues.json, venues_with_menu_urls.json,
+                ingredients.json, catalogue.csv and product_matches.json; missing
+                files are skipped.
+
+        Returns:
+            Dict[str, int]: Number of records imported per file.
+        """
+        imported = {}
+
+        def load(filename):
+            path = os.path.join(data_dir, filename)
+            if not os.path.exists(path):
+                return None
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                if filename.endswith('.csv'):
+                    return [product for row in csv.reader(f) for product in row]
+                return json.load(f)
+
+        venues = load('venues.json')
+        if venues is not None:
+            imported['venues.json'] = self.upsert_venues(venues)
+        with_menus = load('venues_with_menu_urls.json')
+        if with_menus is not None:
+            for venue in with_menus:
+                self.set_menu_url(venue['name'], venue['website'])
+            imported['venues_with_menu_urls.json'] = len(with_menus)
+        ingredients = load('ingredients.json')
+        if ingredients is not None:
+            imported['ingredients.json'] = self.upsert_ingredients(ingredients)
+        catalogue = load('catalogue.csv')
+        if catalogue is not None:
+            imported['catalogue.csv'] = self.replace_catalogue(catalogue)
+        matches = load('product_matches.json')
+        if matches is not None:
+            for name, products in matches.items():
+                self.set_matches(name, products)
+            imported['product_matches.json'] = len(matches)
+        return imported
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load the pipeline's data files into the SQLite store.")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Database file")
+    parser.add_argument('--data-dir', default=os.path.join(PROJECT_ROOT, 'data'),
+                        help="Directory of the pipeline's JSON and CSV files")
+    args = parser.parse_args()
+
+    store = PipelineStore(args.db)
+    for filename, count in store.import_files(args.data_dir).items():
+        print(f"Imported {count} records from {filename}")
+    store.close()
@@ -1,10 +1,16 @@
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 import json
 import re
 from openai import OpenAI
 from dotenv import load_dotenv
 import logging
+from src.llm_cache import default_cache
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
 
 # Load environment variables
 load_dotenv()
@@ -17,20 +23,35 @@ logger = logging.getLogger(__name__)
 # Initialize OpenAI client
 client = OpenAI(api_key=os.getenv('openai_api_key'))
 
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
 
-def parse_with_chatgpt(message: List[Dict[str, str]]) -> List[str]:
+def parse_with_chatgpt(message: List[Dict[str, str]],
+                       model: str = DEFAULT_MODEL,
+                       use_cache: bool = True) -> List[str]:
     """
     Parse a message using ChatGPT and return the response as a list of ingredients.
 
+    Responses are served from the on-disk response cache when an identical
+    (model, message) request has been answered before. Pass use_cache=False,
+    or set LLM_CACHE_DISABLED=1, to always call the API.
+
     Args:
         message (List[Dict[str, str]]): The message to be sent to ChatGPT.
+        model (str): The model to use for the completion.
+        use_cache (bool): Whether to read from and write to the response cache.
 
     Returns:
         List[str]: The list of extracted ingredients or an empty list if an error occurs.
     """
+    if use_cache:
+        cached = default_cache.get(model, message)
+        if cached is not None:
+            return cached
+
     try:
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=model,
             messages=message
         )
 
@@ -39,6 +60,8 @@ def parse_with_chatgpt(message: List[Dict[str, str]]) -> List[str]:
             return []
 
         content = response.choices[0].message.content
+        if use_cache:
+            default_cache.set(model, message, content)
         return content
 
     except Exception as e:
@@ -46,6 +69,137 @@ def parse_with_chatgpt(message: List[Dict[str, str]]) -> List[str]:
         return []
 
 
+class ChatStream:
+    """
+    Iterator over the text of a streamed ChatGPT completion.
+
+    A cached response is yielded whole. A streamed response is added to the
+    response cache only if the model finished it (finish_reason "stop"), so
+    parse_with_chatgpt and later streams of the same message are served from
+    the cache. On an error the iteration ends early and completed stays
+    False; a partial response is never cached. Check completed after
+    iterating before keeping the text.
+    """
+
+    def __init__(self, message: List[Dict[str, str]], model: str = DEFAULT_MODEL,
+                 use_cache: bool = True, openai_client: Optional[OpenAI] = None):
+        self.message = message
+        self.model = model
+        self.use_cache = use_cache
+        self.openai_client = openai_client
+        self.parts: List[str] = []
+        self.finish_reason: Optional[str] = None
+        self.completed = False
+        self._iterator = self._stream()
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        return next(self._iterator)
+
+    @property
+    def text(self) -> str:
+        """The text received so far."""
+        return ''.join(self.parts)
+
+    def _stream(self) -> Iterator[str]:
+        if self.use_cache:
+            cached = default_cache.get(self.model, self.message)
+            if cached is not None:
+                self.parts.append(cached)
+                self.finish_reason = 'stop'
+                self.completed = True
+                yield cached
+                return
+
+        try:
+            stream = (self.openai_client or client).chat.completions.create(
+                model=self.model,
+                messages=self.message,
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    self.finish_reason = choice.finish_reason
+                delta = choice.delta.content if choice.delta else None
+                if delta:
+                    self.parts.append(delta)
+                    yield delta
+        except Exception as e:
+            logger.error(f"Error in stream_with_chatgpt: {str(e)}")
+            return
+
+        if self.finish_reason != 'stop':
+            logger.warning(f"Streamed response ended without finishing (finish_reason={self.finish_reason})")
+            return
+        self.completed = bool(self.parts)
+        if self.use_cache and self.completed:
+            default_cache.set(self.model, self.message, self.text)
+
+
+def stream_with_chatgpt(message: List[Dict[str, str]],
+                        model: str = DEFAULT_MODEL,
+                        use_cache: bool = True,
+                        openai_client: Optional[OpenAI] = None) -> ChatStream:
+    """
+    Stream a ChatGPT completion, yielding text as the tokens arrive.
+
+    Args:
+        message (List[Dict[str, str]]): The message to be sent to ChatGPT.
+        model (str): The model to use for the completion.
+        use_cache (bool): Whether to read from and write to the response cache.
+        openai_client (Optional[OpenAI]): Client to use instead of the module's default one.
+
+    Returns:
+        ChatStream: Iterator over pieces of the response text, in order; its
+        completed flag tells whether the model finished the response.
+    """
+    return ChatStream(message, model, use_cache, openai_client)
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """
+    Count the model tokens in a piece of text.
+
+    Uses tiktoken when it is installed and otherwise estimates roughly four
+    characters per token.
+
+    Args:
+        text (str): The text to measure.
+        model (str): The model whose tokenizer should be used.
+
+    Returns:
+        int: The number of tokens in the text.
+    """
+    if not text:
+        return 0
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return len(encoding.encode(text))
+    return max(1, (len(text) + 3) // 4)
+
+
+def count_message_tokens(message: List[Dict[str, str]], model: str = DEFAULT_MODEL) -> int:
+    """
+    Count the prompt tokens of a chat message list.
+
+    Args:
+        message (List[Dict[str, str]]): The chat messages.
+        model (str): The model whose tokenizer should be used.
+
+    Returns:
+        int: The approximate number of prompt tokens, including per-message overhead.
+    """
+    return sum(count_tokens(str(m.get('content', '')), model) + 4 for m in message) + 2
+
+
 def save_json(data: Dict[str, Any], filename: str) -> None:
     """
     Save data to a JSON file.
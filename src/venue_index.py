@@ -0,0 +1,154 @@
+import math
+import bisect
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+from src.matching_index import char_ngrams, normalize_text
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class VenueIndex:
+    """
+    Search index over venue names for the app's venue browser.
+
+    Prefix search runs a binary search over the sorted names, then over the
+    sorted name suffixes that start at a later word, so "loc" finds "Local
+    Heroes" first and then "The Local", in O(log n) plus the number of hits.
+    Fuzzy search looks up the character trigrams of the query in an inverted
+    index and ranks the venues sharing the most trigrams, which tolerates
+    typos; its cost depends on how many venues share the query's trigrams,
+    not on the total number of venues.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(names))
+        # Whole names, then the suffixes starting at each later word
+        self._keys: List[Tuple[str, int]] = []
+        self._suffixes: List[Tuple[str, int]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._gram_counts: List[int] = []
+        for i, name in enumerate(self.names):
+            words = normalize_text(name).split()
+            self._keys.append((' '.join(words), i))
+            for start in range(1, len(words)):
+                self._suffixes.append((' '.join(words[start:]), i))
+            grams = set(char_ngrams(words))
+            for gram in grams:
+                self._postings[gram].append(i)
+            self._gram_counts.append(len(grams))
+        self._keys.sort()
+        self._suffixes.sort()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def prefix(self, query: str, limit: int = 50) -> List[str]:
+        """
+        Find venues with a word sequence starting with the query.
+
+        Args:
+            query (str): The beginning of a venue name, or of any word in it.
+            limit (int): Maximum number of venues returned.
+
+        Returns:
+            List[str]: Venue names starting with the query first, each group in
+            alphabetical order of the matched text.
+        """
+        key = normalize_text(query)
+        if not key:
+            return []
+        found: Dict[int, None] = {}
+        for entries in (self._keys, self._suffixes):
+            position = bisect.bisect_left(entries, (key,))
+            while position < len(entries) and len(found) < limit:
+                text, i = entries[position]
+                if not text.startswith(key):
+                    break
+                found.setdefault(i, None)
+                position += 1
+        return [self.names[i] for i in found]
+
+    def fuzzy(self, query: str, limit: int = 20, min_similarity: float = 0.3) -> List[str]:
+        """
+        Find venues whose names look like the query.
+
+        Args:
+            query (str): A venue name, possibly misspelled.
+            limit (int): Maximum number of venues returned.
+            min_similarity (float): Minimum Jaccard similarity of the trigram sets.
+
+        Returns:
+            List[str]: Venue names, most similar first.
+        """
+        grams = set(char_ngrams(normalize_text(query).split()))
+        if not grams:
+            return []
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for i, overlap in shared.items():
+            similarity = overlap / (len(grams) + self._gram_counts[i] - overlap)
+            if similarity >= min_similarity:
+                scored.append((-similarity, self.names[i]))
+        scored.sort()
+        return [name for _, name in scored[:limit]]
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """
+        Find venues by prefix, topped up with fuzzy matches.
+
+        Args:
+            query (str): Search text; an empty query lists venues in order.
+            limit (int): Maximum number of venues returned.
+
+        Returns:
+            List[str]: Prefix matches first, then fuzzy matches.
+        """
+        if not normalize_text(query):
+            return self.names[:limit]
+        results = dict.fromkeys(self.prefix(query, limit))
+        if len(results) < limit:
+            for name in self.fuzzy(query, limit):
+                results.setdefault(name, None)
+        return list(results)[:limit]
+
+
+def filter_venues(names: Sequence[str], allowed: Optional[Set[str]]) -> List[str]:
+    """
+    Keep only the venues in an allowed set, e.g. the venues matched to a product.
+
+    Args:
+        names (Sequence[str]): Venue names.
+        allowed (Optional[Set[str]]): Venues to keep; None keeps all.
+
+    Returns:
+        List[str]: The kept names, in the same order.
+    """
+    if allowed is None:
+        return list(names)
+    return [name for name in names if name in allowed]
+
+
+def paginate(items: Sequence[T], page: int, page_size: int) -> Tuple[List[T], int]:
+    """
+    Get one page of a sequence.
+
+    Args:
+        items (Sequence[T]): All items.
+        page (int): Page number, starting at 1; clamped to the valid range.
+        page_size (int): Items per page.
+
+    Returns:
+        Tuple[List[T], int]: The items on the page and the number of pages (at least 1).
+    """
+    page_count = max(1, math.ceil(len(items) / page_size))
+    page = min(max(page, 1), page_count)
+    start = (page - 1) * page_size
+    return list(items[start:start + page_size]), page_count
@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 import json
 import requests
 import os
+from src.store import open_store
 
 # Load configuration
 load_dotenv()
@@ -25,7 +26,7 @@ def get_venues(query, location):
     headers = {
         'Content-Type': 'application/json',
         'X-Goog-Api-Key': GOOGLE_PLACES_API_KEY,
-        'X-Goog-FieldMask': 'places.displayName,places.websiteUri'
+        'X-Goog-FieldMask': 'places.id,places.displayName,places.websiteUri'
     }
 
     data = {
@@ -57,6 +58,9 @@ def get_venues(query, location):
                 'name': place['displayName']['text'],
                 'website': place['websiteUri']
             }
+            # The place id identifies the venue in the pipeline store
+            if 'id' in place:
+                venue['place_id'] = place['id']
             venues.append(venue)
 
     # Return the list of venues
@@ -104,6 +108,12 @@ def main():
 
     # Save the combined results to a JSON file
     save_venues(all_venues, output_file)
+
+    # Also record the venues in the pipeline store, if one is configured
+    db = open_store()
+    if db is not None:
+        db.upsert_venues(all_venues)
+        db.close()
     # Print a message indicating how many venues were retrieved and saved
     print(f"Retrieved and saved {len(all_venues)} venues.")
 
@@ -0,0 +1,69 @@
+import os
+import json
+from src.app_data import load_app_data
+from src.ingredient_normalization import build_compact_ingredients, save_compact_ingredients
+from src.store import PipelineStore
+
+
+def write_matches(path, matches, mtime):
+    path.write_text(json.dumps(matches))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_data_is_reloaded_only_when_the_file_changes(tmp_path):
+    matches_file = tmp_path / "product_matches.json"
+    ingredients_file = tmp_path / "ingredients.compact.json"
+    write_matches(matches_file, {"Cafe A": ["Eggs", "Bacon", "Milk"]}, 1_000_000_000)
+    save_compact_ingredients(ingredients_file, *build_compact_ingredients(
+        [{"name": "Cafe A", "ingredients": "Egg whites, Bacon"}]))
+
+    data = load_app_data(str(matches_file), str(ingredients_file))
+    assert load_app_data(str(matches_file), str(ingredients_file)) is data
+    view = data.view("Cafe A")
+    assert view.page(1).shape == (2, 2)
+    assert view.page_count == 1
+    assert view.ingredients == ["egg white", "bacon"]
+
+    write_matches(matches_file, {"Cafe A": ["Eggs"], "Cafe B": ["Milk"]}, 2_000_000_000)
+    reloaded = load_app_data(str(matches_file), str(ingredients_file))
+    assert reloaded is not data
+    assert reloaded.venue_names == ["Cafe A", "Cafe B"]
+    assert reloaded.view("Missing") is None
+
+
+def test_store_views_are_built_on_first_selection(tmp_path):
+    db_path = str(tmp_path / "pipeline.db")
+    db = PipelineStore(db_path)
+    db.set_matches("Cafe A", ["Eggs", "Bacon"])
+
+    data = load_app_data(str(tmp_path / "missing.json"), str(tmp_path / "missing.compact.json"),
+                         db_path=db_path)
+    assert data.venue_names == ["Cafe A"]
+    assert data.view("Cafe A") is data.view("Cafe A")
+    assert data.view("Cafe A").matches == ["Eggs", "Bacon"]
+
+    db.set_matches("Cafe B", ["Milk"])
+    updated = load_app_data(str(tmp_path / "missing.json"), str(tmp_path / "missing.compact.json"),
+                            db_path=db_path)
+    assert updated.venue_names == ["Cafe A", "Cafe B"]
+    # The database is opened once; only the venue list is rebuilt
+    assert updated.store is data.store
+    db.close()
+    data.store.close()
+
+
+def test_venue_search_product_filter_and_match_pages(tmp_path):
+    matches_file = tmp_path / "product_matches.json"
+    products = [f"Product {i}" for i in range(45)]
+    write_matches(matches_file, {"The Local": products, "Local Heroes": ["Eggs"],
+                                 "Cafe Bondi": ["Eggs", "Milk"]}, 3_000_000_000)
+
+    data = load_app_data(str(matches_file), str(tmp_path / "missing.compact.json"))
+    assert data.index.search("loc") == ["Local Heroes", "The Local"]
+    assert data.venues_with_product("Eggs") == ["Cafe Bondi", "Local Heroes"]
+    assert "Eggs" in data.products
+
+    view = data.view("The Local")
+    assert view.page_count == 2
+    assert view.page(2).shape == (3, 2)
+    assert view.page(5) is view.page(2)
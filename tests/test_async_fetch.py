@@ -0,0 +1,144 @@
+import os
+import time
+import asyncio
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.async_fetch import AsyncFetcher, BackgroundFetcher, fetch_pages, fetch_pdfs
+from src.politeness import DomainThrottle
+
+SMALL_PDF = b"%PDF-1.4 small" + b"0" * 100
+LARGE_PDF = b"%PDF-1.4 large" + b"1" * 200_000
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    ports = set()
+
+    def do_GET(self):
+        with FixtureHandler.lock:
+            FixtureHandler.active += 1
+            FixtureHandler.peak = max(FixtureHandler.peak, FixtureHandler.active)
+            FixtureHandler.ports.add(self.client_address[1])
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(0.1)
+            body = {
+                '/small.pdf': SMALL_PDF,
+                '/large.pdf': LARGE_PDF,
+            }.get(self.path, f"<html><body>{self.path}</body></html>".encode('utf-8'))
+            if self.path == '/missing':
+                self.send_response(404)
+                body = b''
+            elif self.path == '/latin1':
+                self.send_response(200)
+                body = "<p>Crème brûlée</p>".encode('latin-1')
+                self.send_header('Content-Type', 'text/html; charset=ISO-8859-1')
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with FixtureHandler.lock:
+                FixtureHandler.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    FixtureHandler.active = FixtureHandler.peak = 0
+    FixtureHandler.ports = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_fetch_pages_returns_text_and_none_for_failures(fixture_server):
+    urls = [f"{fixture_server}/a", f"{fixture_server}/missing", f"{fixture_server}/b"]
+
+    pages = fetch_pages(urls)
+
+    assert pages[urls[0]] == "<html><body>/a</body></html>"
+    assert pages[urls[1]] is None
+    assert "/b" in pages[urls[2]]
+
+
+def test_concurrency_is_capped_per_host_and_connections_reused(fixture_server):
+    urls = [f"{fixture_server}/slow/{i}" for i in range(8)]
+
+    async def run():
+        async with AsyncFetcher(limit_per_host=2) as fetcher:
+            return await fetcher.fetch_many(urls)
+
+    results = asyncio.run(run())
+
+    assert all(results)
+    assert FixtureHandler.peak == 2
+    # Keep-alive: eight requests over no more than two connections
+    assert len(FixtureHandler.ports) <= 2
+
+
+def test_large_pdfs_are_streamed_to_disk(fixture_server, tmp_path):
+    urls = [f"{fixture_server}/small.pdf", f"{fixture_server}/large.pdf"]
+
+    small, large = fetch_pdfs(urls, stream_threshold=100_000, download_dir=str(tmp_path))
+
+    assert small == SMALL_PDF
+    assert isinstance(large, str) and os.path.dirname(large) == str(tmp_path)
+    with open(large, 'rb') as f:
+        assert f.read() == LARGE_PDF
+
+
+def test_responses_over_the_size_limit_are_rejected(fixture_server, tmp_path):
+    small, large = fetch_pdfs([f"{fixture_server}/small.pdf", f"{fixture_server}/large.pdf"],
+                              max_bytes=100_000, stream_threshold=50_000,
+                              download_dir=str(tmp_path))
+
+    assert small == SMALL_PDF
+    assert large is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_a_burst_takes_one_politeness_slot_per_domain(fixture_server):
+    urls = [f"{fixture_server}/{i}.pdf" for i in range(3)]
+
+    def sleeps(burst):
+        slept = []
+        throttle = DomainThrottle(min_interval=2.0, clock=lambda: 0.0, sleep=slept.append)
+
+        async def run():
+            async with AsyncFetcher(throttle=throttle) as fetcher:
+                return await fetcher.fetch_many(urls, kind='pdf', burst=burst)
+
+        assert all(asyncio.run(run()))
+        return slept
+
+    assert sleeps(burst=True) == []
+    # One slot per PDF: the second and third wait behind the first
+    assert sorted(sleeps(burst=False)) == [2.0, 4.0]
+
+
+def test_background_fetcher_reuses_its_connections(fixture_server):
+    fetcher = BackgroundFetcher(limit_per_host=1)
+    assert fetcher.fetch_pdfs([f"{fixture_server}/small.pdf"]) == [SMALL_PDF]
+    assert fetcher.fetch_pdfs([f"{fixture_server}/small.pdf"]) == [SMALL_PDF]
+    assert len(FixtureHandler.ports) == 1
+
+    # A closed fetcher starts again on its next request
+    fetcher.close()
+    assert fetcher.fetch_pdfs([f"{fixture_server}/small.pdf"]) == [SMALL_PDF]
+    fetcher.close()
+
+
+def test_pages_are_decoded_with_their_charset(fixture_server):
+    pages = fetch_pages([f"{fixture_server}/latin1", f"{fixture_server}/a"])
+
+    assert pages[f"{fixture_server}/latin1"] == "<p>Crème brûlée</p>"
+    assert pages[f"{fixture_server}/a"] == "<html><body>/a</body></html>"
@@ -1,5 +1,10 @@
 import pytest
-from src.catalogue_parsing import chunk_text, extract_products_from_response
+import json
+import asyncio
+import threading
+import src.catalogue_parsing as catalogue_parsing
+from src.catalogue_parsing import (chunk_text, extract_products_from_response, dedupe_products,
+                                   parse_products_response)
 import sys
 import os
 
@@ -27,3 +32,108 @@ def test_extract_products_from_response():
     ```'''
     products = extract_products_from_response(response)
     assert products == ["Product A", "Product B", "Product C"]
+
+
+def test_parse_products_response_tells_failures_from_empty_lists():
+    assert parse_products_response("[]") == []
+    assert parse_products_response('{"product name": " Eggs "}') == ["Eggs"]
+    assert parse_products_response("I'm sorry, I can't help with that.") is None
+    assert parse_products_response("") is None
+    assert parse_products_response([]) is None
+    assert parse_products_response(None) is None
+    assert extract_products_from_response([]) == []
+
+
+def test_dedupe_products():
+    products = ["Brioche Buns", "brioche  buns", "Halloumi", "BRIOCHE BUNS!"]
+    assert dedupe_products(products) == ["Brioche Buns", "Halloumi"]
+
+
+def test_parse_pdf_catalogue_overlaps_extraction_and_requests(monkeypatch):
+    first_request_sent = threading.Event()
+
+    def fake_pages(pdf_file):
+        yield "Brioche Buns\nHalloumi\nPlain Flour"
+        # The first chunk must reach the LLM stage before the PDF is fully extracted
+        assert first_request_sent.wait(timeout=5)
+        yield "Halloumi\nEggs"
+
+    async def fake_dispatch(requests, max_in_flight):
+        responses = {}
+        while True:
+            item = await asyncio.get_running_loop().run_in_executor(None, requests.get)
+            if item is None:
+                return responses
+            key, message = item
+            first_request_sent.set()
+            chunk = message[-1]["content"].split("Text for extraction:")[1]
+            names = [line.strip() for line in chunk.splitlines() if line.strip()]
+            responses[key] = json.dumps([{"product name": name} for name in names])
+
+    monkeypatch.setattr(catalogue_parsing, "iter_pdf_pages", fake_pages)
+    monkeypatch.setattr(catalogue_parsing, "dispatch_chat_queue", fake_dispatch)
+
+    products = catalogue_parsing.parse_pdf_catalogue("catalogue.pdf", max_tokens=8, overlap_tokens=0)
+    assert products == ["Brioche Buns", "Eggs", "Halloumi", "Plain Flour"]
+
+
+def test_parse_pdf_catalogue_incremental(tmp_path, monkeypatch):
+    pages = ["Brioche Buns\nHalloumi", "Plain Flour"]
+    sent = []
+
+    def fake_parse_many(messages, max_in_flight):
+        sent.extend(messages)
+        responses = []
+        for message in messages:
+            chunk = message[-1]["content"].split("Text for extraction:")[1]
+            names = [line.strip() for line in chunk.splitlines() if line.strip()]
+            responses.append(json.dumps([{"product name": name} for name in names]))
+        return responses
+
+    monkeypatch.setattr(catalogue_parsing, "iter_pdf_pages", lambda pdf_file: iter(pages))
+    monkeypatch.setattr(catalogue_parsing, "parse_many_with_chatgpt", fake_parse_many)
+    index_file = catalogue_parsing.catalogue_index_path(str(tmp_path / "catalogue.csv"))
+
+    products, diff = catalogue_parsing.parse_pdf_catalogue_incremental("catalogue.pdf", index_file)
+    assert products == ["Brioche Buns", "Halloumi", "Plain Flour"]
+    assert diff["added"] == products
+    assert len(sent) == 2
+
+    sent.clear()
+    pages[1] = "Plain Flour\nEggs"
+    products, diff = catalogue_parsing.parse_pdf_catalogue_incremental("catalogue.pdf", index_file)
+    assert len(sent) == 1  # Only the changed page went to the LLM
+    assert diff == {"added": ["Eggs"], "removed": []}
+
+    pages[0] = "Brioche Buns"
+    products, diff = catalogue_parsing.parse_pdf_catalogue_incremental("catalogue.pdf", index_file)
+    assert diff == {"added": [], "removed": ["Halloumi"]}
+
+
+@pytest.mark.parametrize("failure", [None, "", "Sorry, I cannot read this catalogue.", '"not a list"'])
+def test_incremental_parse_retries_chunks_without_a_product_list(tmp_path, monkeypatch, failure):
+    pages = ["Brioche Buns", "Cover page"]
+    responses = {"Brioche Buns": json.dumps([{"product name": "Brioche Buns"}]),
+                 "Cover page": "[]"}
+    sent = []
+
+    def fake_parse_many(messages, max_in_flight):
+        chunks = [message[-1]["content"].split("Text for extraction:")[1].strip() for message in messages]
+        sent.extend(chunks)
+        return [responses[chunk] for chunk in chunks]
+
+    monkeypatch.setattr(catalogue_parsing, "iter_pdf_pages", lambda pdf_file: iter(pages))
+    monkeypatch.setattr(catalogue_parsing, "parse_many_with_chatgpt", fake_parse_many)
+    index_file = catalogue_parsing.catalogue_index_path(str(tmp_path / "catalogue.csv"))
+
+    responses["Brioche Buns"], good = failure, responses["Brioche Buns"]
+    products, _ = catalogue_parsing.parse_pdf_catalogue_incremental("catalogue.pdf", index_file)
+    assert products == []
+    assert sorted(sent) == ["Brioche Buns", "Cover page"]
+
+    # The failed chunk is sent again; the parsed, empty one is not
+    sent.clear()
+    responses["Brioche Buns"] = good
+    products, _ = catalogue_parsing.parse_pdf_catalogue_incremental("catalogue.pdf", index_file)
+    assert products == ["Brioche Buns"]
+    assert sent == ["Brioche Buns"]
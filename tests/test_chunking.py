@@ -0,0 +1,28 @@
+import pytest
+from src.chunking import iter_token_chunks
+from src.utils import count_tokens
+
+
+def test_chunks_respect_token_budget_and_keep_lines_whole():
+    pages = ["\n".join(f"Product number {i} premium" for i in range(50))] * 3
+    chunks = list(iter_token_chunks(pages, max_tokens=40, overlap_tokens=0))
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 40 for chunk in chunks)
+    lines = [line for chunk in chunks for line in chunk.split("\n")]
+    assert lines == [f"Product number {i} premium" for i in range(50)] * 3
+
+
+def test_chunks_overlap():
+    page = "\n".join(f"Line {i}" for i in range(20))
+    chunks = list(iter_token_chunks([page], max_tokens=12, overlap_tokens=4))
+
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split("\n")[0] in previous.split("\n")
+    assert chunks[-1].endswith("Line 19")
+
+
+def test_long_line_is_split_by_words():
+    chunks = list(iter_token_chunks(["word " * 100], max_tokens=20, overlap_tokens=0))
+    assert len(chunks) > 1
+    assert " ".join(chunks).split() == ["word"] * 100
@@ -0,0 +1,92 @@
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.http_cache import FetchStore, content_hash
+from src.ingredient_retrieval import Scraper
+
+MENU_PAGE = ("<html><body><h1>Menu</h1><a href='/drinks.pdf'>Drinks</a>"
+             + "".join(f"<p>Dish {i}: halloumi, tomato, basil</p>" for i in range(20))
+             + "</body></html>")
+DRINKS_PDF = b"%PDF-1.4 not really a pdf"
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    """Serves a menu page with an ETag and a PDF with Last-Modified, honouring both."""
+    served = {}
+
+    def do_GET(self):
+        if self.path == '/menu':
+            body, validator = MENU_PAGE.encode('utf-8'), ('ETag', '"v1"')
+            fresh = self.headers.get('If-None-Match') == '"v1"'
+        elif self.path == '/drinks.pdf':
+            body, validator = DRINKS_PDF, ('Last-Modified', 'Mon, 06 Oct 2025 10:00:00 GMT')
+            fresh = self.headers.get('If-Modified-Since') == validator[1]
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        if fresh:
+            self.send_response(304)
+            self.end_headers()
+            return
+        ConditionalHandler.served[self.path] = ConditionalHandler.served.get(self.path, 0) + 1
+        self.send_response(200)
+        self.send_header(*validator)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def conditional_server():
+    ConditionalHandler.served = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ConditionalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_store_tracks_validators_hashes_and_savings(tmp_path):
+    path = tmp_path / "http_cache.json"
+    store = FetchStore(str(path))
+    store.remember_validators("https://a.example/menu", {'ETag': '"abc"'})
+    store.update("https://a.example/menu", content_hash("menu"), 2048, ["halloumi"])
+
+    assert store.conditional_headers("https://a.example/menu") == {'If-None-Match': '"abc"'}
+    assert store.unchanged("https://a.example/menu", content_hash("other")) is None
+    assert store.unchanged("https://a.example/menu", content_hash("menu")) == ["halloumi"]
+    assert store.not_modified("https://a.example/menu") == ["halloumi"]
+    assert store.stats['bytes_saved'] == 2048
+    assert store.stats['llm_calls_saved'] == 2
+
+    store.save()
+    reloaded = FetchStore(str(path))
+    assert reloaded.get("https://a.example/menu")['result'] == ["halloumi"]
+
+
+def test_rescrape_skips_llm_for_unchanged_menus(conditional_server, tmp_path, monkeypatch):
+    store = FetchStore(str(tmp_path / "http_cache.json"))
+    scraper = Scraper(use_browser=False, existing_ingredients={}, fetch_store=store)
+    llm_calls = []
+
+    def fake_extract(text):
+        llm_calls.append(text)
+        return ["halloumi", "tomato"] if "halloumi" in text else ["gin"]
+
+    monkeypatch.setattr(scraper, "extract_ingredients", fake_extract)
+    monkeypatch.setattr(scraper, "extract_text_from_pdf", lambda pdf: "gin and tonic")
+
+    first = scraper.scrape_menu(f"{conditional_server}/menu")
+    second = scraper.scrape_menu(f"{conditional_server}/menu")
+
+    assert sorted(first) == sorted(second) == ["gin", "halloumi", "tomato"]
+    # Only the first scrape called the LLM, once for the page and once for the PDF
+    assert len(llm_calls) == 2
+    assert ConditionalHandler.served == {'/menu': 1, '/drinks.pdf': 1}
+    assert store.stats['not_modified'] == 2
+    assert store.stats['llm_calls_saved'] == 2
+    assert store.stats['bytes_saved'] == len(MENU_PAGE) + len(DRINKS_PDF)
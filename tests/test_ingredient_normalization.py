@@ -0,0 +1,78 @@
+import json
+import os
+from src.ingredient_normalization import (IngredientVocabulary, build_compact_ingredients,
+                                          load_compact_ingredients, load_venue_ingredients,
+                                          normalize_ingredient, preferred_ingredients_file,
+                                          save_compact_ingredients)
+
+
+def test_normalize_ingredient():
+    assert normalize_ingredient("Egg whites") == normalize_ingredient("egg white") == "egg white"
+    assert normalize_ingredient("Fresh Tomatoes (500g)") == "tomato"
+    assert normalize_ingredient("Four Pillars ‘Rare Dry’ Gin") == "gin"
+    assert normalize_ingredient("Kiwami Wagyu rump cap 9+") == "wagyu rump cap"
+    assert normalize_ingredient("Bay Leaves") == "bay leaf"
+    # Nothing but descriptors: keep them instead of returning nothing
+    assert normalize_ingredient("Organic") == "organic"
+    assert normalize_ingredient("500g") == ""
+
+
+def test_free_from_phrases_keep_their_meaning():
+    assert normalize_ingredient("Gluten free bread") == "gluten-free bread"
+    assert normalize_ingredient("Dairy-free cheese") == "dairy-free cheese"
+    assert normalize_ingredient("Sugar free syrup") == "sugar-free syrup"
+    assert normalize_ingredient("gluten-free bread") != normalize_ingredient("bread")
+    # Multi-word descriptors are only dropped as a whole phrase
+    assert normalize_ingredient("Free range eggs") == "egg"
+    assert normalize_ingredient("Organic free range eggs") == "egg"
+    assert normalize_ingredient("Rangers Valley brisket") == "brisket"
+    assert normalize_ingredient("House made ricotta") == "ricotta"
+
+
+def test_vocabulary_interns_duplicates():
+    vocabulary = IngredientVocabulary()
+    ids = vocabulary.encode("Egg whites, egg white, Basil, basil leaves, Eggs")
+    assert vocabulary.decode(ids) == ["egg white", "basil", "basil leaf", "egg"]
+    assert vocabulary.encode(["EGG WHITES"]) == [ids[0]]
+    assert vocabulary.id_of("Truffle") is None
+
+
+def test_compact_round_trip(tmp_path):
+    records = [{"name": "Cafe A", "ingredients": "Eggs, Bacon, egg"},
+               {"name": "Cafe B", "ingredients": "Bacon, Sourdough"}]
+    vocabulary, venues = build_compact_ingredients(records)
+    assert len(vocabulary) == 3
+    assert venues == {"Cafe A": [0, 1], "Cafe B": [1, 2]}
+
+    path = tmp_path / "ingredients.compact.json"
+    save_compact_ingredients(path, vocabulary, venues)
+    loaded_vocabulary, loaded_venues = load_compact_ingredients(path)
+    assert loaded_vocabulary.terms == vocabulary.terms
+    assert loaded_venues == venues
+    assert load_venue_ingredients(path) == [
+        {"name": "Cafe A", "ingredients": ["egg", "bacon"]},
+        {"name": "Cafe B", "ingredients": ["bacon", "sourdough"]},
+    ]
+
+
+def test_load_venue_ingredients_reads_plain_json(tmp_path):
+    path = tmp_path / "ingredients.json"
+    records = [{"name": "Cafe A", "ingredients": "Eggs, Bacon"}]
+    path.write_text(json.dumps(records))
+    assert load_venue_ingredients(path) == records
+
+
+def test_stale_compact_file_is_not_preferred(tmp_path):
+    ingredients_file = tmp_path / "ingredients.json"
+    compact_file = tmp_path / "ingredients.compact.json"
+    ingredients_file.write_text("[]")
+    assert preferred_ingredients_file(ingredients_file, compact_file) == ingredients_file
+
+    compact_file.write_text("{}")
+    os.utime(ingredients_file, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(compact_file, ns=(2_000_000_000, 2_000_000_000))
+    assert preferred_ingredients_file(ingredients_file, compact_file) == compact_file
+
+    # ingredients.json rewritten after the compact file
+    os.utime(ingredients_file, ns=(3_000_000_000, 3_000_000_000))
+    assert preferred_ingredients_file(ingredients_file, compact_file) == ingredients_file
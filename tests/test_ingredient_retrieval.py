@@ -1,9 +1,13 @@
 import pytest
-from src.ingredient_retrieval import Scraper
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.ingredient_retrieval import Scraper, merge_ingredients, needs_javascript
+from src.politeness import DomainThrottle
+from src.pdf_extraction import PageTextCache
 
 
-def test_extract_text_from_pdf():
-    scraper = Scraper()
+def test_extract_text_from_pdf(tmp_path):
+    scraper = Scraper(page_cache=PageTextCache(tmp_path))
     pdf_content = b'%PDF-1.3\n%\xc4\xe5\xf2\xe5\xeb\xa7\xf3\xa0\xd0\xc4\xc6\n2 0 obj\n<<\n/Type /Page\n/Parent 1 0 R\n/Resources <<\n/Font <<\n/F1 4 0 R \n>>\n>>\n/Contents 3 0 R\n>>\nendobj\n3 0 obj\n<< /Length 72 >>\nstream\nBT\n/F1 24 Tf\n100 100 Td\n(Hello, World!) Tj\nET\nendstream\nendobj\n4 0 obj\n<<\n/Type /Font\n/Subtype /Type1\n/Name /F1\n/BaseFont /Helvetica\n/Encoding /WinAnsiEncoding\n>>\nendobj\n1 0 obj\n<<\n/Type /Pages\n/Kids [2 0 R]\n/Count 1\n>>\nendobj\n5 0 obj\n<<\n/Type /Catalog\n/Pages 1 0 R\n>>\nendobj\nxref\n0 6\n0000000000 65535 f \n0000000301 00000 n \n0000000009 00000 n \n0000000087 00000 n \n0000000210 00000 n \n0000000358 00000 n \ntrailer\n<<\n/Size 6\n/Root 5 0 R\n>>\nstartxref\n407\n%%EOF'
     text = scraper.extract_text_from_pdf(pdf_content)
     assert "Hello, World!" in text
@@ -15,3 +19,116 @@ def test_extract_text_from_html():
     text = scraper.extract_text_from_html(html)
     assert "Test Header" in text
     assert "Test paragraph" in text
+
+
+STATIC_MENU = "<html><body><nav>Home</nav><h1>Menu</h1>" + "".join(
+    f"<p>Dish {i}: grilled haloumi, heirloom tomato, basil and olive oil</p>" for i in range(20)
+) + "</body></html>"
+SPA_SHELL = '<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    pages = {"/menu": STATIC_MENU, "/spa": SPA_SHELL}
+
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        self.send_response(200 if body else 404)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write((body or "").encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+
+
+def test_needs_javascript():
+    assert needs_javascript(SPA_SHELL)
+    assert needs_javascript("")
+    assert not needs_javascript(STATIC_MENU)
+
+
+def test_fetch_html_uses_static_tier_and_escalates_per_domain(fixture_server, monkeypatch):
+    scraper = Scraper(existing_ingredients={})
+    rendered = []
+
+    def fake_browser(url):
+        rendered.append(url)
+        return STATIC_MENU
+
+    monkeypatch.setattr(scraper, "fetch_with_browser", fake_browser)
+    static_url = f"http://127.0.0.1:{fixture_server}/menu"
+    spa_url = f"http://localhost:{fixture_server}/spa"
+
+    assert "grilled haloumi" in scraper.fetch_html(static_url)
+    assert rendered == []
+
+    scraper.fetch_html(spa_url)
+    assert rendered == [spa_url]
+    assert scraper.domain_tiers == {"127.0.0.1": "static", "localhost": "browser"}
+
+    # The domain is remembered as needing the browser, so the static fetch is skipped
+    scraper.fetch_html(f"http://localhost:{fixture_server}/menu")
+    assert len(rendered) == 2
+    assert scraper.tier_counts == {"static": 1, "browser": 2}
+
+
+def test_escalated_fetch_takes_one_politeness_slot(fixture_server, monkeypatch):
+    slept = []
+    throttle = DomainThrottle(min_interval=2.0, clock=lambda: 0.0, sleep=slept.append)
+    scraper = Scraper(existing_ingredients={}, throttle=throttle)
+    monkeypatch.setattr(scraper, "fetch_with_browser", lambda url: STATIC_MENU)
+
+    # Static fetch, then the browser, for the same URL
+    scraper.fetch_html(f"http://localhost:{fixture_server}/spa")
+    assert slept == []
+    scraper.fetch_html(f"http://localhost:{fixture_server}/menu")
+    assert slept == [2.0]
+
+
+def test_merge_ingredients_normalizes_duplicates():
+    merged = merge_ingredients(["Tomatoes", " basil", "tomato", "BASIL.", "Olive  oil", "olive oil", ""])
+    assert merged == ["Tomatoes", "basil", "Olive oil"]
+
+
+def test_long_menus_are_extracted_in_parallel_chunks(monkeypatch):
+    import src.ingredient_retrieval as ingredient_retrieval
+
+    dispatched = {}
+
+    def fake_parse_many(messages, max_in_flight):
+        dispatched['chunks'] = len(messages)
+        dispatched['max_in_flight'] = max_in_flight
+        # Every chunk reports a shared ingredient plus one of its own
+        return ["Garlic, herb%d" % i for i in range(len(messages) - 1)] + [[]]
+
+    def fail_single(message):
+        raise AssertionError("long menus must not be sent in one prompt")
+
+    monkeypatch.setattr(ingredient_retrieval, "parse_many_with_chatgpt", fake_parse_many)
+    monkeypatch.setattr(ingredient_retrieval, "parse_with_chatgpt", fail_single)
+    scraper = Scraper(existing_ingredients={}, max_prompt_tokens=200, max_chunks_in_flight=2)
+    text = "\n".join(f"Dish {i}: garlic prawns with chilli, lemon and parsley" for i in range(100))
+
+    ingredients = scraper.extract_ingredients(text)
+
+    assert dispatched['chunks'] > 1
+    assert dispatched['max_in_flight'] == 2
+    # The failed last chunk is skipped and the shared ingredient appears once
+    assert ingredients == ["Garlic"] + [f"herb{i}" for i in range(dispatched['chunks'] - 1)]
+
+
+def test_short_menus_use_a_single_prompt(monkeypatch):
+    import src.ingredient_retrieval as ingredient_retrieval
+
+    monkeypatch.setattr(ingredient_retrieval, "parse_with_chatgpt", lambda message: "Garlic, prawns, garlic")
+    scraper = Scraper(existing_ingredients={})
+
+    assert scraper.extract_ingredients("Garlic prawns") == ["Garlic", "prawns"]
@@ -0,0 +1,86 @@
+import json
+from src.journal import Journal, journal_path
+
+
+def test_journal_path_sits_next_to_the_output():
+    assert journal_path("data/ingredients.json") == "data/ingredients.journal.jsonl"
+
+
+def test_append_and_resume(tmp_path):
+    path = tmp_path / "venues.journal.jsonl"
+    journal = Journal(str(path))
+    journal.append({"name": "Cafe A", "website": "https://a.example"})
+    journal.append({"name": "Cafe B", "website": "https://b.example"})
+    journal.append({"name": "Cafe A", "website": "https://a.example/menu"})
+    journal.close()
+
+    resumed = Journal(str(path))
+    assert "Cafe A" in resumed and "Cafe C" not in resumed
+    assert resumed.get("Cafe A")["website"] == "https://a.example/menu"
+    assert [r["name"] for r in resumed.records()] == ["Cafe A", "Cafe B"]
+    resumed.close()
+
+
+def test_torn_tail_is_dropped_on_resume(tmp_path):
+    path = tmp_path / "venues.journal.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"name": "Cafe A"}) + "\n")
+        # A crash in the middle of writing the second record
+        f.write('{"name": "Caf')
+
+    journal = Journal(str(path))
+    assert len(journal) == 1
+    journal.append({"name": "Cafe B"})
+    journal.close()
+
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["name"] for line in f] == ["Cafe A", "Cafe B"]
+
+
+def test_compact_merges_into_json_and_empties_the_journal(tmp_path):
+    output = tmp_path / "ingredients.json"
+    output.write_text(json.dumps([{"name": "Old", "ingredients": "salt"},
+                                  {"name": "Cafe A", "ingredients": "stale"}]))
+    journal = Journal(journal_path(str(output)))
+    journal.append({"name": "Cafe A", "ingredients": "eggs, bacon"})
+    journal.append({"name": "Cafe B", "ingredients": "coffee"})
+
+    kept = journal.compact(str(output), replace=False)
+    assert [item["ingredients"] for item in kept] == ["salt", "stale", "coffee"]
+
+    journal.append({"name": "Cafe A", "ingredients": "eggs, bacon"})
+    journal.compact(str(output))
+    journal.close()
+
+    assert json.loads(output.read_text()) == [
+        {"name": "Old", "ingredients": "salt"},
+        {"name": "Cafe A", "ingredients": "eggs, bacon"},
+        {"name": "Cafe B", "ingredients": "coffee"},
+    ]
+    assert len(Journal(journal_path(str(output)))) == 0
+
+
+def test_records_without_the_key_are_skipped_on_resume(tmp_path):
+    path = tmp_path / "venues.journal.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"name": "Cafe A"}) + "\n")
+        f.write(json.dumps({"website": "https://nameless.example"}) + "\n")
+        f.write(json.dumps(["not", "a", "record"]) + "\n")
+        f.write(json.dumps({"name": "Cafe B"}) + "\n")
+
+    journal = Journal(str(path))
+    assert [r["name"] for r in journal.records()] == ["Cafe A", "Cafe B"]
+    journal.close()
+
+
+def test_compact_moves_a_corrupt_output_file_aside(tmp_path):
+    output = tmp_path / "ingredients.json"
+    output.write_text('[{"name": "Old", "ingredients": "sa')
+    journal = Journal(journal_path(str(output)))
+    journal.append({"name": "Cafe A", "ingredients": "eggs"})
+
+    journal.compact(str(output))
+    journal.close()
+
+    assert json.loads(output.read_text()) == [{"name": "Cafe A", "ingredients": "eggs"}]
+    assert (tmp_path / "ingredients.json.corrupt").read_text() == '[{"name": "Old", "ingredients": "sa'
@@ -0,0 +1,60 @@
+import pytest
+from types import SimpleNamespace
+from src.llm_cache import ResponseCache
+import src.utils as utils
+
+MESSAGES = [{"role": "user", "content": "Extract ingredients from: Egg & bacon roll"}]
+
+
+def test_cache_hit_and_miss(tmp_path):
+    cache = ResponseCache(cache_dir=tmp_path)
+    assert cache.get("gpt-3.5-turbo", MESSAGES) is None
+
+    cache.set("gpt-3.5-turbo", MESSAGES, "Egg, Bacon, Bread roll")
+    assert cache.get("gpt-3.5-turbo", MESSAGES) == "Egg, Bacon, Bread roll"
+    # A different model is a different request
+    assert cache.get("gpt-4o", MESSAGES) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+
+
+def test_cache_expiry_and_eviction(tmp_path):
+    cache = ResponseCache(cache_dir=tmp_path, max_entries=2, max_age_seconds=0)
+    for i in range(3):
+        cache.set("gpt-3.5-turbo", [{"role": "user", "content": str(i)}], str(i))
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    # max_age_seconds=0 expires entries immediately
+    assert cache.get("gpt-3.5-turbo", [{"role": "user", "content": "2"}]) is None
+
+
+def test_disabled_cache_is_bypassed(tmp_path):
+    cache = ResponseCache(cache_dir=tmp_path, enabled=False)
+    cache.set("gpt-3.5-turbo", MESSAGES, "Egg")
+    assert cache.get("gpt-3.5-turbo", MESSAGES) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_parse_with_chatgpt_uses_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def create(model, messages):
+        calls.append(model)
+        message = SimpleNamespace(content="Egg, Bacon")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    fake_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(utils, "client", fake_client)
+    monkeypatch.setattr(utils, "default_cache", ResponseCache(cache_dir=tmp_path))
+
+    assert utils.parse_with_chatgpt(MESSAGES) == "Egg, Bacon"
+    assert utils.parse_with_chatgpt(MESSAGES) == "Egg, Bacon"
+    assert len(calls) == 1
+
+    utils.parse_with_chatgpt(MESSAGES, use_cache=False)
+    assert len(calls) == 2
@@ -0,0 +1,80 @@
+import pytest
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import AsyncOpenAI
+from src.llm_dispatcher import RateLimiter, dispatch_chat_requests, parse_many_with_chatgpt
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    """Emulates the chat completions endpoint, rate limiting the first request."""
+    lock = threading.Lock()
+    requests_seen = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with StubChatHandler.lock:
+            StubChatHandler.requests_seen += 1
+            first = StubChatHandler.requests_seen == 1
+
+        if first:
+            payload = json.dumps({"error": {"message": "Rate limit", "type": "rate_limit"}})
+            self.send_response(429)
+            self.send_header('retry-after', '0')
+        else:
+            content = body["messages"][-1]["content"]
+            # Answer later requests sooner so responses complete out of order
+            time.sleep(0.05 / (1 + int(content)))
+            payload = json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"echo {content}"}}],
+            })
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(payload.encode('utf-8'))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubChatHandler.requests_seen = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+
+def test_dispatch_preserves_order_and_retries_429(stub_server):
+    messages = [[{"role": "user", "content": str(i)}] for i in range(6)]
+    client = AsyncOpenAI(api_key="test", base_url=stub_server, max_retries=0)
+
+    results = parse_many_with_chatgpt(messages, client=client, max_in_flight=3,
+                                      use_cache=False)
+
+    assert results == [f"echo {i}" for i in range(6)]
+    # One request was rate limited and retried
+    assert StubChatHandler.requests_seen == 7
+
+
+def test_rate_limiter_enforces_requests_per_minute():
+    now = [0.0]
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=10000,
+                          clock=lambda: now[0])
+
+    async def run():
+        await limiter.acquire(10)
+        await limiter.acquire(10)
+        # The bucket is drained: the next slot opens after 60 / 2 seconds
+        return limiter._wait_time(10)
+
+    assert asyncio.run(run()) == pytest.approx(30.0)
@@ -0,0 +1,63 @@
+import pytest
+from src.matching_index import CatalogueIndex, build_synonym_map, expand_tokens, stem, tokenize
+
+PRODUCTS = ["Halloumi", "Fanta Lemon Cans", "Lemons", "Glenmyr Prawns 1kg",
+            "Brioche Buns", "Beef Dripping", "Smoked Back Bacon"]
+
+
+def test_tokenize_drops_units_and_stems():
+    assert tokenize("King Prawns 16/20 'Uncooked' 1kg") == ["king", "prawn", "uncooked"]
+    assert tokenize("Crème Brûlée & Berries") == ["creme", "brulee", "berry"]
+
+
+def test_search_exact_and_synonym_matches():
+    index = CatalogueIndex(PRODUCTS)
+    assert index.search("brioche bun", top_k=1) == [("Brioche Buns", 1.0)]
+    # Spelling variant resolved through the synonym table
+    assert index.search("Hand-stretched haloumi", top_k=1)[0][0] == "Halloumi"
+    assert index.search("shrimp", top_k=1)[0][0] == "Glenmyr Prawns 1kg"
+
+
+def test_search_prefers_products_fully_covered_by_query():
+    index = CatalogueIndex(PRODUCTS)
+    results = dict(index.search("lemon"))
+    assert results["Lemons"] > results["Fanta Lemon Cans"]
+    assert index.search("sea urchin", min_score=0.5) == []
+
+
+def test_synonyms_are_expanded_as_whole_phrases():
+    synonyms = build_synonym_map({'scallion': ['spring onion'], 'soda': ['soft drink']},
+                                 {'wagyu': ['beef']})
+    assert synonyms[("scallion",)] == [("spring", "onion")]
+    assert synonyms[("spring", "onion")] == [("scallion",)]
+    # Words of a phrase are not synonyms on their own, and hyponyms only go one way
+    assert ("onion",) not in synonyms and ("drink",) not in synonyms
+    assert ("beef",) not in synonyms
+    assert expand_tokens(["spring", "onion", "soda"], synonyms) == [
+        [("spring", "onion"), ("scallion",)], [("soda",), ("soft", "drink")]]
+
+
+def test_phrase_synonyms_do_not_leak_into_single_words():
+    index = CatalogueIndex(["Spring Onions", "Spring Water", "Soft Drink Cans", "Wagyu Rump", "Beef Mince"])
+    assert index.search("scallion", top_k=1)[0][0] == "Spring Onions"
+    assert "Soft Drink Cans" not in dict(index.search("spring water", min_score=0.1))
+    assert "Spring Onions" not in dict(index.search("soda", min_score=0.1))
+    # Wagyu may be served by beef, but beef is not wagyu
+    assert "Beef Mince" in dict(index.search("wagyu"))
+    assert "Wagyu Rump" not in dict(index.search("beef", min_score=0.1))
+
+
+def test_plurals_of_ie_words_stem_to_their_singular():
+    assert stem("cookies") == stem("cookie") == "cookie"
+    assert stem("pies") == "pie"
+    assert stem("berries") == stem("berry") == "berry"
+
+
+def test_broad_words_are_not_synonyms():
+    index = CatalogueIndex(["Choc Chip Cookies", "Red Capsicum", "Beef Mince 1kg", "Black Pepper Ground",
+                            "Ground Coffee Beans"])
+    assert index.search("choc chip biscuits", top_k=1)[0][0] == "Choc Chip Cookies"
+    assert "Red Capsicum" in dict(index.search("bell pepper", min_score=0.5))
+    assert index.search("ground beef", top_k=1)[0][0] == "Beef Mince 1kg"
+    assert "Red Capsicum" not in dict(index.search("black pepper", min_score=0.1))
+    assert "Beef Mince 1kg" not in dict(index.search("ground coffee", min_score=0.1))
@@ -0,0 +1,88 @@
+from src.menu_content import compact_text, compaction_report, extract_menu_text, food_density
+
+MENU_PAGE = """
+<html>
+<head><title>The Local</title><script>var tracking = 1;</script></head>
+<body>
+  <header><a href="/">Home</a><a href="/about">About</a><a href="/book">Book a table</a></header>
+  <div class="cookie-banner">We use cookies to improve your experience. Accept all cookies?</div>
+  <main>
+    <h2>Mains</h2>
+    <ul>
+      <li>Grilled halloumi, heirloom tomato, basil $24</li>
+      <li>Wagyu beef burger, smoked cheddar, pickles, brioche bun $28</li>
+      <li>Salt and pepper calamari, lemon aioli $22</li>
+    </ul>
+    <h2>Desserts</h2>
+    <ul>
+      <li>Sticky date pudding, butterscotch sauce, vanilla ice cream $16</li>
+    </ul>
+    <p>Open seven days from 11am. Call us to find out about functions and events.</p>
+  </main>
+  <div id="booking-widget">Select a date and number of guests to reserve online</div>
+  <footer>Copyright 2025 The Local Pty Ltd. Follow us on Instagram.</footer>
+</body>
+</html>
+"""
+
+
+def test_extract_menu_text_keeps_menu_and_drops_boilerplate():
+    text = extract_menu_text(MENU_PAGE)
+
+    assert "Grilled halloumi, heirloom tomato, basil $24" in text
+    assert "Sticky date pudding" in text
+    assert "Mains" in text and "Desserts" in text
+    for boilerplate in ["cookies", "Book a table", "guests", "Copyright", "tracking", "functions"]:
+        assert boilerplate not in text
+
+
+def test_extract_menu_text_falls_back_to_page_text_without_food_terms():
+    html = "<html><body><p>Kumara rosti</p><p>Kawakawa sorbet</p></body></html>"
+    assert extract_menu_text(html) == "Kumara rosti\nKawakawa sorbet"
+
+
+def test_compact_text_collapses_whitespace_and_repeated_lines():
+    text = "Mains\n\n  Fish   and chips \nMAINS\nFish and chips\nDesserts"
+    assert compact_text(text) == "Mains\nFish and chips\nDesserts"
+
+
+def test_food_density_and_compaction_report():
+    assert food_density("Grilled chicken, garlic butter") == 1.0
+    assert food_density("Call us to book your event") == 0.0
+
+    report = compaction_report("word " * 400, "word " * 100)
+    assert report['tokens_after'] < report['tokens_before']
+    assert report['reduction_pct'] > 50
+
+
+def test_menu_sections_with_lookalike_class_names_are_kept():
+    html = """
+    <html><body>
+      <div class="a-la-carte"><h3>A la carte</h3><p>Wagyu rump, chips</p></div>
+      <div class="reserve-list"><p>Reserve Shiraz</p></div>
+      <section><header><h3>Starters</h3></header><p>Burrata</p></section>
+      <div class="cookie_banner">Accept all cookies?</div>
+      <nav>Home About</nav>
+    </body></html>
+    """
+    text = extract_menu_text(html)
+    assert "Wagyu rump, chips" in text
+    assert "Reserve Shiraz" in text
+    assert "Starters" in text
+    assert "Burrata" in text
+    assert "cookies" not in text
+    assert "Home About" not in text
+
+
+def test_text_outside_child_blocks_is_kept():
+    dishes = [("Smashed avocado", "$18"), ("Chilli scrambled eggs", "$21"), ("Pork belly bao", "$19"),
+              ("Kingfish crudo", "$24"), ("Mushroom risotto", "$26"), ("Sticky date pudding", "$15")]
+    items = "".join(
+        f'<div class="item"><span class="name">{name}</span><span class="price">{price}</span>'
+        f'<p>Served with house sourdough, seasonal herbs and a lemon and garlic dressing</p></div>'
+        for name, price in dishes)
+    text = extract_menu_text(f"<html><body><main>{items}</main></body></html>")
+
+    for name, price in dishes:
+        assert f"{name} {price}" in text
+    assert "seasonal herbs" in text
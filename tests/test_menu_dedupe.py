@@ -0,0 +1,76 @@
+from src.menu_dedupe import MenuDeduplicator, normalize_menu_text
+
+DISHES = [
+    "Grilled halloumi with heirloom tomato, basil and aged balsamic",
+    "Wagyu beef burger with smoked cheddar, pickles and brioche bun",
+    "Salt and pepper calamari with lemon aioli and rocket",
+    "Pumpkin risotto with sage butter, pepitas and parmesan",
+    "Fish and chips with tartare sauce and charred lemon",
+    "Chicken schnitzel with slaw, chips and gravy",
+    "Sticky date pudding with butterscotch sauce and vanilla ice cream",
+    "Pavlova with passionfruit, whipped cream and seasonal berries",
+    "Prawn linguine with chilli, garlic, cherry tomato and parsley",
+    "Lamb shoulder with roasted root vegetables and rosemary jus",
+]
+
+
+def menu(prices, venue="The Local"):
+    lines = [f"{venue} - Lunch Menu"]
+    lines += [f"{dish} ${price}" for dish, price in zip(DISHES, prices)]
+    return "\n".join(lines)
+
+
+def test_normalize_menu_text_drops_prices_and_layout():
+    assert normalize_menu_text("Fish & Chips  $24.50\nCalamari - 19") == "fish chips calamari"
+
+
+def test_identical_and_near_identical_menus_reuse_results():
+    dedupe = MenuDeduplicator()
+    calls = []
+
+    def extract(text):
+        calls.append(text)
+        return [f"result {len(calls)}"]
+
+    original = menu(range(20, 30))
+    # Same menu at another location of the chain: different prices and venue name
+    branch = menu(range(22, 32), venue="The Local Bondi")
+    reformatted = original.replace("\n", "   \n\n")
+    different = "\n".join(reversed(["Sushi platter with salmon, tuna and kingfish",
+                                    "Miso soup with tofu and wakame",
+                                    "Chicken katsu curry with rice and pickled ginger",
+                                    "Edamame with sea salt"]))
+
+    assert dedupe.get_or_compute(original, extract) == ["result 1"]
+    assert dedupe.get_or_compute(reformatted, extract) == ["result 1"]
+    assert dedupe.get_or_compute(branch, extract) == ["result 1"]
+    assert dedupe.get_or_compute(different, extract) == ["result 2"]
+    assert len(calls) == 2
+    assert dedupe.stats == {'exact': 1, 'near': 1, 'unique': 2}
+
+
+def test_partially_overlapping_menus_are_not_merged():
+    dedupe = MenuDeduplicator(threshold=0.8)
+    dedupe.add("\n".join(DISHES), ["full menu"])
+
+    # Only half of the dishes in common
+    half = "\n".join(DISHES[:5] + ["Beef pho with rice noodles, basil and bean sprouts",
+                                   "Pork belly bao with hoisin and cucumber",
+                                   "Green papaya salad with peanuts and lime",
+                                   "Pad thai with tamarind, egg and crushed peanuts",
+                                   "Mango sticky rice with coconut cream"])
+    assert dedupe.lookup(half) is None
+    assert dedupe.lookup("\n".join(DISHES)) == ["full menu"]
+
+
+def test_empty_results_are_not_remembered():
+    dedupe = MenuDeduplicator()
+    calls = []
+
+    def failing(text):
+        calls.append(text)
+        return []
+
+    dedupe.get_or_compute(menu(range(10)), failing)
+    dedupe.get_or_compute(menu(range(10)), failing)
+    assert len(calls) == 2
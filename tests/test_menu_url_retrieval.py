@@ -1,5 +1,5 @@
 import pytest
-from src.menu_url_retrieval import find_menu_link, load_processed_venues, save_processed_venue
+from src.menu_url_retrieval import find_menu_link, find_menu_link_in_html, load_processed_venues
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 import json
@@ -35,11 +35,39 @@ def test_load_processed_venues(tmp_path):
     assert loaded_data == test_data
 
 
-def test_save_processed_venue(tmp_path):
-    file_path = tmp_path / "test_processed_venues.json"
-    venue = {"name": "New Venue", "website": "http://new.com"}
-    save_processed_venue(venue, file_path)
+def test_find_menu_link_in_html():
+    html = """
+    <html><body>
+      <a href="/about">About us</a>
+      <a href="/drinks">Drinks</a>
+      <a href="/our-menu">View our Menu</a>
+    </body></html>
+    """
+    assert find_menu_link_in_html(html, "https://venue.example/") == "https://venue.example/our-menu"
+    assert find_menu_link_in_html("<a href='/about'>About</a>", "https://venue.example/") is None
+
+
+def test_failed_page_fetch_still_saves_the_store(tmp_path, monkeypatch):
+    import src.menu_url_retrieval as menu_url_retrieval
+
+    class FakeStore:
+        saved = False
+
+        def save(self):
+            self.saved = True
+
+        def report(self):
+            return {}
+
+    def failing_fetch(urls, **kwargs):
+        raise RuntimeError("network down")
+
+    input_file = tmp_path / "venues.json"
+    input_file.write_text(json.dumps([{"name": "Cafe A", "website": "http://a.example"}]))
+    monkeypatch.setattr(menu_url_retrieval, "fetch_pages", failing_fetch)
+    store = FakeStore()
 
-    with open(file_path, 'r') as f:
-        saved_data = json.load(f)
-    assert venue in saved_data
+    with pytest.raises(RuntimeError):
+        menu_url_retrieval.update_venues_with_menu_urls(
+            str(input_file), str(tmp_path / "venues_with_menu_urls.json"), store=store)
+    assert store.saved
@@ -0,0 +1,78 @@
+import pytest
+from src.page_readiness import AdaptiveTimeout, RetryPolicy, wait_for_page_ready
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeDriver:
+    """Replays a list of (time, snapshot) pairs: the page state from each time on."""
+
+    def __init__(self, clock, timeline):
+        self.clock = clock
+        self.timeline = timeline
+
+    def execute_script(self, script):
+        current = self.timeline[0][1]
+        for at, snapshot in self.timeline:
+            if self.clock() >= at:
+                current = snapshot
+        return list(current)
+
+
+def test_ready_once_dom_and_network_settle():
+    clock = FakeClock()
+    driver = FakeDriver(clock, [
+        (0.0, ['loading', 10, 0, 1]),
+        (0.5, ['complete', 200, 900, 12]),
+        # Lazy content arrives and changes the DOM once more
+        (1.0, ['complete', 260, 1400, 15]),
+    ])
+
+    elapsed = wait_for_page_ready(driver, timeout=20, quiet_period=0.75,
+                                  poll_interval=0.25, clock=clock, sleep=clock.sleep)
+
+    assert elapsed == pytest.approx(1.75)
+
+
+def test_gives_up_after_timeout_on_a_page_that_never_settles():
+    clock = FakeClock()
+
+    class BusyDriver:
+        def execute_script(self, script):
+            return ['complete', int(clock() * 100), 0, 0]
+
+    elapsed = wait_for_page_ready(BusyDriver(), timeout=2.0, clock=clock, sleep=clock.sleep)
+
+    assert 2.0 <= elapsed < 2.5
+
+
+def test_adaptive_timeout_follows_render_times_per_domain():
+    timeout = AdaptiveTimeout(initial=20, minimum=3, maximum=30, multiplier=3, smoothing=0.5)
+
+    assert timeout.timeout_for("https://fast.example/menu") == 20
+    timeout.record("https://fast.example/menu", 0.5)
+    timeout.record("https://slow.example/menu", 8.0)
+
+    assert timeout.timeout_for("https://www.fast.example/drinks") == 3
+    assert timeout.timeout_for("https://slow.example/") == 24
+    timeout.record("https://slow.example/menu", 16.0)
+    assert timeout.timeout_for("https://slow.example/") == 30
+
+
+def test_retry_policy_backs_off_exponentially():
+    slept = []
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0.0, sleep=slept.append)
+
+    for attempt in range(4):
+        policy.backoff(attempt)
+
+    assert slept == [1.0, 2.0, 4.0, 5.0]
@@ -0,0 +1,41 @@
+import io
+import pytest
+import PyPDF2
+import src.pdf_extraction as pdf_extraction
+from src.pdf_extraction import PageTextCache, iter_pdf_pages, extract_pdf_text
+
+HELLO_PDF = b'%PDF-1.3\n%\xc4\xe5\xf2\xe5\xeb\xa7\xf3\xa0\xd0\xc4\xc6\n2 0 obj\n<<\n/Type /Page\n/Parent 1 0 R\n/Resources <<\n/Font <<\n/F1 4 0 R \n>>\n>>\n/Contents 3 0 R\n>>\nendobj\n3 0 obj\n<< /Length 72 >>\nstream\nBT\n/F1 24 Tf\n100 100 Td\n(Hello, World!) Tj\nET\nendstream\nendobj\n4 0 obj\n<<\n/Type /Font\n/Subtype /Type1\n/Name /F1\n/BaseFont /Helvetica\n/Encoding /WinAnsiEncoding\n>>\nendobj\n1 0 obj\n<<\n/Type /Pages\n/Kids [2 0 R]\n/Count 1\n>>\nendobj\n5 0 obj\n<<\n/Type /Catalog\n/Pages 1 0 R\n>>\nendobj\nxref\n0 6\n0000000000 65535 f \n0000000301 00000 n \n0000000009 00000 n \n0000000087 00000 n \n0000000210 00000 n \n0000000358 00000 n \ntrailer\n<<\n/Size 6\n/Root 5 0 R\n>>\nstartxref\n407\n%%EOF'
+
+
+def make_pdf(page_count):
+    page = PyPDF2.PdfReader(io.BytesIO(HELLO_PDF)).pages[0]
+    writer = PyPDF2.PdfWriter()
+    for _ in range(page_count):
+        writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_iter_pdf_pages_with_process_pool(tmp_path):
+    pdf = make_pdf(20)
+    pages = list(iter_pdf_pages(pdf, workers=2, cache=PageTextCache(tmp_path)))
+    assert len(pages) == 20
+    assert all("Hello, World!" in page for page in pages)
+
+
+def test_pages_are_cached_by_file_hash(tmp_path, monkeypatch):
+    cache = PageTextCache(tmp_path)
+    pdf_file = tmp_path / "menu.pdf"
+    pdf_file.write_bytes(HELLO_PDF)
+    assert "Hello, World!" in extract_pdf_text(str(pdf_file), cache=cache)
+
+    def fail(*args):
+        raise AssertionError("PDF parsed again")
+
+    monkeypatch.setattr(pdf_extraction, "_extract_page_range", fail)
+    assert extract_pdf_text(HELLO_PDF, cache=cache) == "Hello, World!\n"
+
+
+def test_unreadable_pdf_yields_nothing(tmp_path):
+    assert extract_pdf_text(b"not a pdf", cache=PageTextCache(tmp_path)) == ""
@@ -0,0 +1,44 @@
+import src.pitch_store as pitch_store
+from src.pitch_store import PitchStore, pitch_key, pregenerate_pitches
+
+
+def test_pitch_key_ignores_match_order_but_not_prompt_version():
+    assert pitch_key("Cafe A", ["Eggs", "Bacon"]) == pitch_key("Cafe A", ["Bacon", "Eggs"])
+    assert pitch_key("Cafe A", ["Eggs"]) != pitch_key("Cafe A", ["Eggs", "Bacon"])
+    assert pitch_key("Cafe A", ["Eggs"], prompt_version=1) != pitch_key("Cafe A", ["Eggs"], prompt_version=2)
+
+
+def test_store_round_trip(tmp_path):
+    path = tmp_path / "pitches.json"
+    store = PitchStore(path)
+    store.put("Cafe A", ["Eggs", "Bacon"], "Pitch A")
+    store.save()
+
+    reloaded = PitchStore(path)
+    assert reloaded.get("Cafe A", ["Bacon", "Eggs"]) == "Pitch A"
+    # New matches need a new pitch
+    assert reloaded.get("Cafe A", ["Eggs"]) is None
+
+
+def test_pregenerate_pitches_only_generates_missing_ones(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_parse_many(messages, max_in_flight, use_cache):
+        calls.append((len(messages), use_cache))
+        # The second request fails
+        return ["Pitch", []][:len(messages)]
+
+    monkeypatch.setattr(pitch_store, 'parse_many_with_chatgpt', fake_parse_many)
+    store = PitchStore(tmp_path / "pitches.json")
+    store.put("Cafe A", ["Eggs"], "Stored pitch")
+    matches = {"Cafe A": ["Eggs"], "Cafe B": ["Milk"], "Cafe C": ["Bacon"], "Cafe D": []}
+
+    assert pregenerate_pitches(matches, store) == 1
+    assert calls == [(2, True)]
+    assert store.get("Cafe B", ["Milk"]) == "Pitch"
+    assert store.get("Cafe C", ["Bacon"]) is None
+    assert PitchStore(tmp_path / "pitches.json").get("Cafe A", ["Eggs"]) == "Stored pitch"
+
+    pregenerate_pitches({"Cafe A": ["Eggs"]}, store, regenerate=True)
+    assert calls[-1] == (1, False)
+    assert store.get("Cafe A", ["Eggs"]) == "Pitch"
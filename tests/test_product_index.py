@@ -0,0 +1,24 @@
+from src.product_index import ProductIndex
+
+
+def test_index_ranks_venues_by_score_then_rank(tmp_path):
+    index = ProductIndex.from_matches({
+        "Cafe A": [("Eggs", 0.5), ("Bacon", 0.9)],
+        "Cafe B": [("Eggs", 0.8)],
+        "Cafe C": ["Milk", "Eggs"],
+    })
+    assert index.venues_for("Eggs") == [("Cafe B", 0.8, 0), ("Cafe A", 0.5, 0), ("Cafe C", None, 1)]
+    assert index.venues_for("Eggs", top_k=1) == [("Cafe B", 0.8, 0)]
+    assert index.venues_for("Truffle") == []
+    assert index.products() == ["Bacon", "Eggs", "Milk"]
+
+    path = tmp_path / "product_index.json"
+    index.save(path)
+    loaded = ProductIndex.load(path)
+    assert loaded.venues_for("Eggs") == index.venues_for("Eggs")
+    assert "Milk" in loaded and len(loaded) == 3
+
+
+def test_unscored_matches_keep_venue_order_of_preference():
+    index = ProductIndex.from_matches({"Cafe A": ["Milk", "Eggs"], "Cafe B": ["Eggs"]})
+    assert [venue for venue, _, _ in index.venues_for("Eggs")] == ["Cafe B", "Cafe A"]
@@ -1,5 +1,8 @@
 import pytest
-from src.product_matching import load_catalogue, extract_json_from_response
+import json
+from src.product_matching import (load_catalogue, extract_json_from_response, match_products_venue_local,
+                                  match_all_venues_vectorized, build_prefiltered_messages)
+from src.matching_index import CatalogueIndex
 import sys
 import os
 
@@ -29,3 +32,60 @@ def test_extract_json_from_response():
         "Venue 1": ["Product A", "Product B"],
         "Venue 2": ["Product C"]
     }
+
+
+def test_match_products_venue_local():
+    index = CatalogueIndex(["Halloumi", "Brioche Buns", "Plain Flour"])
+    venue = {"name": "Venue 1", "ingredients": "haloumi, Brioche bun, sea urchin"}
+    matches = match_products_venue_local(venue, index)
+    assert [product for product, _ in matches["Venue 1"]] == ["Halloumi", "Brioche Buns"]
+    assert all(score >= 0.75 for _, score in matches["Venue 1"])
+
+
+def test_match_all_venues_vectorized():
+    products = ["Halloumi", "Brioche Buns", "Plain Flour", "Lemons"]
+    venues = [
+        {"name": "Venue 1", "ingredients": "haloumi, Brioche bun"},
+        {"name": "Venue 2", "ingredients": "lemon, sea urchin"},
+        {"name": "Venue 3", "ingredients": ""},
+    ]
+    matches = match_all_venues_vectorized(venues, products, top_k=2)
+    assert sorted(p for p, _ in matches["Venue 1"]) == ["Brioche Buns", "Halloumi"]
+    assert [p for p, _ in matches["Venue 2"]] == ["Lemons"]
+    assert matches["Venue 3"] == []
+
+
+def test_build_prefiltered_messages():
+    products = ["Halloumi", "Brioche Buns", "Plain Flour"] + [f"Paper Cup {i}oz" for i in range(50)]
+    venues = [
+        {"name": "Venue 1", "ingredients": "haloumi, flour"},
+        {"name": "Venue 2", "ingredients": "sea urchin"},
+    ]
+    messages, report = build_prefiltered_messages(venues, products)
+    prompt = messages[0][-1]["content"]
+    assert "Halloumi" in prompt and "Plain Flour" in prompt
+    assert "Paper Cup" not in prompt
+    assert messages[1] is None
+    assert report["saved_tokens"] > 0
+
+
+@pytest.mark.parametrize("method", ["vectorized", "local"])
+def test_process_product_matching_writes_product_index(tmp_path, method):
+    from src.product_index import ProductIndex
+    from src.product_matching import process_product_matching
+
+    ingredients_file = tmp_path / "ingredients.json"
+    ingredients_file.write_text(json.dumps([
+        {"name": "Cafe A", "ingredients": "free range eggs, sourdough"},
+        {"name": "Cafe B", "ingredients": "eggs"},
+    ]))
+    catalogue_file = tmp_path / "catalogue.csv"
+    catalogue_file.write_text("Free Range Eggs 700g,Sourdough Loaf,Olive Oil 4L\n")
+    index_file = tmp_path / "product_index.json"
+
+    process_product_matching(ingredients_file, catalogue_file, tmp_path / "matches.json",
+                             method=method, index_file=index_file)
+
+    venues = ProductIndex.load(index_file).venues_for("Free Range Eggs 700g")
+    assert {venue for venue, _, _ in venues} == {"Cafe A", "Cafe B"}
+    assert all(score is not None for _, score, _ in venues)
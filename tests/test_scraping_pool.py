@@ -0,0 +1,64 @@
+import pytest
+import time
+import threading
+from src.politeness import DomainThrottle, domain_of
+from src.scraping_pool import ScraperPool
+from src.journal import Journal
+
+
+class FakeScraper:
+    """Stands in for a browser-backed Scraper, taking a fixed time per venue."""
+    threads = set()
+
+    def scrape_venue(self, venue):
+        FakeScraper.threads.add(threading.get_ident())
+        time.sleep(0.05)
+        if venue['website'].endswith('broken'):
+            return None
+        return {"name": venue['name'], "ingredients": "Egg, Bacon"}
+
+    def close(self):
+        pass
+
+
+def test_domain_throttle_spaces_requests_per_domain():
+    now = [0.0]
+    slept = []
+    throttle = DomainThrottle(min_interval=2.0, clock=lambda: now[0], sleep=slept.append)
+
+    assert throttle.wait("https://www.cafe.com/menu") == 0
+    assert throttle.wait("https://cafe.com/drinks.pdf") == 2.0
+    assert throttle.wait("https://bar.com/") == 0
+    assert slept == [2.0]
+    assert domain_of("https://WWW.Cafe.com:8080/menu") == "cafe.com"
+
+
+def test_scraper_pool_scrapes_concurrently_and_reports_progress():
+    venues = [{"name": f"Venue {i}", "website": f"https://venue{i}.com"} for i in range(8)]
+    venues.append({"name": "Broken", "website": "https://venue.com/broken"})
+    venues.append({"name": "Done", "website": "https://done.com"})
+
+    pool = ScraperPool(workers=4, scraper_factory=FakeScraper)
+    started = time.monotonic()
+    results = pool.scrape_venue_ingredients(venues, existing_names={"Done"})
+
+    assert time.monotonic() - started < 0.05 * 9
+    assert [r["name"] for r in results] == [f"Venue {i}" for i in range(8)]
+    assert len(FakeScraper.threads) > 1
+    summary = pool.progress.summary()
+    assert (summary["succeeded"], summary["failed"], summary["skipped"]) == (8, 1, 1)
+
+
+def test_scraper_pool_checkpoints_results_and_resumes(tmp_path):
+    venues = [{"name": f"Venue {i}", "website": f"https://venue{i}.com"} for i in range(4)]
+    journal = Journal(str(tmp_path / "ingredients.journal.jsonl"))
+    journal.append({"name": "Venue 0", "ingredients": "Egg, Bacon"})
+
+    pool = ScraperPool(workers=2, scraper_factory=FakeScraper)
+    results = pool.scrape_venue_ingredients(venues, existing_names=set(), journal=journal)
+    journal.close()
+
+    assert [r["name"] for r in results] == ["Venue 1", "Venue 2", "Venue 3"]
+    assert pool.progress.summary()["skipped"] == 1
+    resumed = Journal(str(tmp_path / "ingredients.journal.jsonl"))
+    assert sorted(r["name"] for r in resumed.records()) == [f"Venue {i}" for i in range(4)]
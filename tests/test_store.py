@@ -0,0 +1,124 @@
+import json
+import sqlite3
+import threading
+import pytest
+from src.store import PipelineStore, open_store
+
+
+def test_venues_are_upserted_and_indexed(tmp_path):
+    db = PipelineStore(tmp_path / "pipeline.db")
+    db.upsert_venues([{'name': "Cafe A", 'place_id': "p1", 'website': "http://a.com"},
+                      {'name': "Cafe B", 'website': "http://b.com"}])
+    # A later run without place id keeps the stored one
+    db.upsert_venues([{'name': "Cafe A", 'website': "http://a.com.au"}])
+    db.set_menu_url("Cafe B", "http://b.com/menu")
+
+    assert db.get_venue_by_place_id("p1")['website'] == "http://a.com.au"
+    assert db.get_venue("Cafe B")['menu_url'] == "http://b.com/menu"
+    assert [v['name'] for v in db.list_venues(with_menu_url=False)] == ["Cafe A"]
+    assert db.get_venue("Missing") is None
+    db.close()
+
+
+def test_ingredients_and_matches(tmp_path):
+    db = PipelineStore(tmp_path / "pipeline.db")
+    db.upsert_ingredients([{'name': "Cafe A", 'ingredients': "eggs, bacon"}])
+    db.set_ingredients("Cafe A", "eggs, bacon, avocado")
+    assert db.get_ingredients("Cafe A") == "eggs, bacon, avocado"
+    assert db.venues_with_ingredients() == {"Cafe A"}
+
+    db.replace_catalogue(["Free Range Eggs", "Bacon Rashers", "Avocado"])
+    db.set_matches("Cafe A", [("Bacon Rashers", 0.9), ("Free Range Eggs", 0.5)])
+    db.set_matches("Cafe B", [("Free Range Eggs", 0.8)])
+
+    assert db.get_matches("Cafe A") == ["Bacon Rashers", "Free Range Eggs"]
+    assert db.matched_venues() == ["Cafe A", "Cafe B"]
+    assert db.matched_products() == ["Bacon Rashers", "Free Range Eggs"]
+    assert db.venues_for_product("Free Range Eggs") == [("Cafe B", 0.8), ("Cafe A", 0.5)]
+    db.close()
+
+
+def test_unscored_venues_for_product_follow_match_rank(tmp_path):
+    db = PipelineStore(tmp_path / "pipeline.db")
+    db.set_matches("Alpha Cafe", ["Bacon", "Eggs"])
+    db.set_matches("Zeta Bar", ["Eggs", "Bacon"])
+    db.set_matches("Mid Bistro", [("Eggs", 0.4)])
+
+    assert db.venues_for_product("Eggs") == [("Mid Bistro", 0.4), ("Zeta Bar", None), ("Alpha Cafe", None)]
+    db.close()
+
+
+def test_replace_catalogue_keeps_existing_matches(tmp_path):
+    db = PipelineStore(tmp_path / "pipeline.db")
+    db.replace_catalogue(["Eggs", "Bacon"])
+    db.set_matches("Cafe A", ["Bacon", "Truffle Oil"])
+
+    db.replace_catalogue(["Eggs", "Milk"])
+    assert db.list_products() == ["Eggs", "Milk"]
+    assert db.get_matches("Cafe A") == ["Bacon", "Truffle Oil"]
+    db.close()
+
+
+def test_import_files(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "venues.json").write_text(json.dumps(
+        [{'name': "Cafe A", 'website': "http://a.com"}]))
+    (data_dir / "ingredients.json").write_text(json.dumps(
+        [{'name': "Cafe A", 'ingredients': "eggs"}]))
+    (data_dir / "catalogue.csv").write_text("Eggs,Bacon\nMilk\n")
+    (data_dir / "product_matches.json").write_text(json.dumps({"Cafe A": ["Eggs"]}))
+
+    db = PipelineStore(tmp_path / "pipeline.db")
+    imported = db.import_files(str(data_dir))
+    assert imported == {'venues.json': 1, 'ingredients.json': 1,
+                        'catalogue.csv': 3, 'product_matches.json': 1}
+    assert db.all_matches() == {"Cafe A": ["Eggs"]}
+    db.close()
+
+
+def test_readers_see_writes_from_other_threads(tmp_path):
+    db = PipelineStore(tmp_path / "pipeline.db")
+    reader = PipelineStore(tmp_path / "pipeline.db")
+
+    def write(i):
+        db.set_ingredients(f"Venue {i}", "eggs")
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(reader.venues_with_ingredients()) == 8
+    db.close()
+    reader.close()
+
+
+def test_connections_of_finished_threads_are_closed(tmp_path):
+    db = PipelineStore(tmp_path / "pipeline.db")
+    connections = []
+
+    def query():
+        db.matched_venues()
+        connections.append(db._local.conn)
+
+    for _ in range(3):
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+
+    # The main thread's and the last thread's connections are left
+    assert len(db._connections) == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+    db.close()
+
+
+def test_open_store_is_optional(tmp_path, monkeypatch):
+    monkeypatch.delenv('PIPELINE_DB', raising=False)
+    assert open_store() is None
+    monkeypatch.setenv('PIPELINE_DB', str(tmp_path / "pipeline.db"))
+    db = open_store()
+    assert isinstance(db, PipelineStore)
+    db.close()
@@ -0,0 +1,106 @@
+import json
+import time
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import OpenAI
+from src.llm_cache import ResponseCache
+import src.utils as utils
+
+MESSAGES = [{"role": "user", "content": "Pitch eggs to Cafe A"}]
+TOKENS = ["Fresh ", "eggs ", "for ", "your ", "brunch."]
+
+
+class StubStreamHandler(BaseHTTPRequestHandler):
+    """Emulates the streaming chat completions endpoint with server-sent events."""
+    requests_seen = 0
+    # Delay before each chunk, so tests can tell streaming from buffering
+    delay = 0.0
+    # Reason sent with the last chunk; None drops the connection before it
+    finish_reason = "stop"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        StubStreamHandler.requests_seen += 1
+        assert body["stream"] is True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for token in TOKENS + [None]:
+            time.sleep(self.delay)
+            if token is None and self.finish_reason is None:
+                return
+            chunk = {
+                "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": token} if token else {},
+                             "finish_reason": None if token else self.finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stream_client():
+    StubStreamHandler.requests_seen = 0
+    StubStreamHandler.delay = 0.0
+    StubStreamHandler.finish_reason = "stop"
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubStreamHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                 max_retries=0)
+    server.shutdown()
+
+
+def test_stream_yields_tokens_as_they_arrive(stream_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "default_cache", ResponseCache(cache_dir=tmp_path))
+    StubStreamHandler.delay = 0.1
+
+    start = time.monotonic()
+    stream = utils.stream_with_chatgpt(MESSAGES, openai_client=stream_client)
+    first = next(stream)
+    first_token_time = time.monotonic() - start
+    rest = list(stream)
+    total_time = time.monotonic() - start
+
+    assert [first] + rest == TOKENS
+    # The first token is shown well before the completion ends
+    assert first_token_time < total_time / 2
+
+
+def test_completed_stream_is_cached(stream_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "default_cache", ResponseCache(cache_dir=tmp_path))
+
+    stream = utils.stream_with_chatgpt(MESSAGES, openai_client=stream_client)
+    assert "".join(stream) == stream.text == "".join(TOKENS)
+    assert stream.completed
+    assert list(utils.stream_with_chatgpt(MESSAGES, openai_client=stream_client)) == ["".join(TOKENS)]
+    assert StubStreamHandler.requests_seen == 1
+
+    list(utils.stream_with_chatgpt(MESSAGES, openai_client=stream_client, use_cache=False))
+    assert StubStreamHandler.requests_seen == 2
+
+
+def test_stream_ends_quietly_on_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "default_cache", ResponseCache(cache_dir=tmp_path))
+    client = OpenAI(api_key="test", base_url="http://127.0.0.1:9/v1", max_retries=0)
+    stream = utils.stream_with_chatgpt(MESSAGES, openai_client=client)
+    assert list(stream) == []
+    assert not stream.completed
+
+
+@pytest.mark.parametrize("finish_reason", ["length", None])
+def test_unfinished_stream_is_not_cached(stream_client, tmp_path, monkeypatch, finish_reason):
+    monkeypatch.setattr(utils, "default_cache", ResponseCache(cache_dir=tmp_path))
+    StubStreamHandler.finish_reason = finish_reason
+
+    stream = utils.stream_with_chatgpt(MESSAGES, openai_client=stream_client)
+    list(stream)
+    assert not stream.completed
+    assert stream.finish_reason == finish_reason
+    assert utils.default_cache.get(utils.DEFAULT_MODEL, MESSAGES) is None
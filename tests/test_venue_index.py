@@ -0,0 +1,36 @@
+from src.venue_index import VenueIndex, filter_venues, paginate
+
+VENUES = ["The Local Taphouse", "Local Heroes Cafe", "Bondi Icebergs", "Cafe Sydney",
+          "Icebergs Dining Room", "Mr Wong"]
+
+
+def test_prefix_search_matches_any_word_start():
+    index = VenueIndex(VENUES)
+    assert index.prefix("local") == ["Local Heroes Cafe", "The Local Taphouse"]
+    assert index.prefix("Ice") == ["Icebergs Dining Room", "Bondi Icebergs"]
+    assert index.prefix("cafe s") == ["Cafe Sydney"]
+    assert index.prefix("xyz") == []
+    assert index.prefix("caf", limit=1) == ["Cafe Sydney"]
+
+
+def test_fuzzy_search_tolerates_typos():
+    index = VenueIndex(VENUES)
+    assert index.fuzzy("Mister Wong")[0] == "Mr Wong"
+    assert index.fuzzy("Icebergs Dinning")[0] == "Icebergs Dining Room"
+    assert index.fuzzy("zzzz") == []
+
+
+def test_search_puts_prefix_matches_first():
+    index = VenueIndex(VENUES)
+    results = index.search("bondi icebrg")
+    assert results[0] == "Bondi Icebergs"
+    assert index.search("") == VENUES
+    assert index.search("", limit=2) == VENUES[:2]
+
+
+def test_filter_and_paginate():
+    assert filter_venues(VENUES, {"Mr Wong", "Cafe Sydney"}) == ["Cafe Sydney", "Mr Wong"]
+    assert filter_venues(VENUES, None) == VENUES
+    assert paginate(VENUES, 2, 4) == (VENUES[4:], 2)
+    assert paginate(VENUES, 9, 4) == (VENUES[4:], 2)
+    assert paginate([], 1, 4) == ([], 1)